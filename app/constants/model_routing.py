@@ -0,0 +1,34 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from app.schemas import ModelTier
+
+
+class StageRoute(BaseModel):
+    """Where one kind of LLM call goes. Unset fields fall back to the request's choice."""
+    provider: Optional[str] = None  # None: the provider the article was requested with
+    model: Optional[str] = None  # None: the provider's default model for the tier
+    tier: Optional[ModelTier] = None  # None: the request's tier (see pipeline presets)
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+
+
+# Mechanical stages (structuring, script extraction, forbidden-word repairs,
+# image prompts) run on each provider's FAST models. A JSON file named by
+# MODEL_ROUTING_FILE is merged over this table at startup, field by field.
+MODEL_ROUTES: Dict[str, StageRoute] = {
+    "plan": StageRoute(),
+    "outline": StageRoute(tier=ModelTier.FAST),
+    "critique": StageRoute(),
+    "critique_restructure": StageRoute(),
+    "critique_section": StageRoute(),
+    "critique_reduce": StageRoute(),
+    "scene_draft": StageRoute(max_tokens=50),
+    "scene_script": StageRoute(),
+    "style_transfer": StageRoute(max_tokens=50),
+    "style_repair": StageRoute(tier=ModelTier.FAST, max_tokens=50),
+    "script_extraction": StageRoute(tier=ModelTier.FAST),
+    "image_prompt": StageRoute(tier=ModelTier.FAST),
+    "image_prompts": StageRoute(tier=ModelTier.FAST),
+}
@@ -0,0 +1,62 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from app.schemas import CritiqueMode, DraftFormat, ImageMode, ModelTier, StyleMode
+
+
+class PipelinePreset(BaseModel):
+    """
+    Which stages an article runs and how. Query parameters given explicitly
+    on a request override the matching field.
+    """
+    name: str
+    description: str
+    critique: bool = True  # critique and restructure the plan before writing
+    critique_mode: CritiqueMode = CritiqueMode.TWO_STEP
+    style_mode: StyleMode = StyleMode.TWO_PASS
+    style_attempts: int = 3  # style transfer calls per scene, including forbidden-word retries
+    draft_format: DraftFormat = DraftFormat.PROSE
+    images: bool = True
+    image_mode: ImageMode = ImageMode.PER_SCENE
+    image_concurrency: int = 4  # images generated at once in batched image mode
+    audio: bool = False
+    speculative: bool = False
+    # Seconds the article must finish in; later stages are degraded to fit (see Deadline). None for no deadline.
+    deadline_seconds: Optional[int] = None
+    # Model tier per stage ("plan", "outline", "critique", "write"); unlisted stages use DEFAULT
+    stage_tiers: Dict[str, ModelTier] = {}
+
+    def tier(self, stage: str) -> ModelTier:
+        return self.stage_tiers.get(stage, ModelTier.DEFAULT)
+
+
+PIPELINE_PRESETS = {
+    "draft": PipelinePreset(
+        name="Draft",
+        description="An outline-grade draft fast: no critique, no restyling pass, no images or audio, fast models throughout.",
+        critique=False,
+        style_mode=StyleMode.SINGLE_PASS,
+        style_attempts=1,
+        images=False,
+        stage_tiers={
+            "plan": ModelTier.FAST,
+            "outline": ModelTier.FAST,
+            "critique": ModelTier.FAST,
+            "write": ModelTier.FAST,
+        },
+    ),
+    "standard": PipelinePreset(
+        name="Standard",
+        description="Critiqued and restyled, with an illustration per scene; no audio.",
+    ),
+    "full": PipelinePreset(
+        name="Full",
+        description="Everything: critiqued, restyled, illustrated and narrated, with speaker-tagged scenes for the narration. Degrades to finish inside five minutes.",
+        draft_format=DraftFormat.SCRIPT,
+        audio=True,
+        deadline_seconds=300,
+    ),
+}
+
+DEFAULT_PRESET = "standard"
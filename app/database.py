@@ -1,17 +1,21 @@
 import sqlite3
 from datetime import datetime
 import json
+import os
+import statistics
 from pathlib import Path
-from typing import Optional, Dict, Any
-from app.schemas import ArticleStructure, ShortArticleStructure, MediumArticleStructure, LongArticleStructure
+from typing import Optional, Dict, Any, List
+from app.schemas import (
+    ArticleLength, ArticleStructure, MainHeading, Scene, ShortArticleStructure, MediumArticleStructure,
+    LongArticleStructure, SubHeading, SubSubHeading
+)
 from threading import Lock
 
 class ArticleDB:
     def __init__(self):
-        db_path = Path(__file__).parent / "articles.db"
+        db_path = os.getenv("ARTICLES_DB_PATH") or Path(__file__).parent / "articles.db"
         self.db_path = str(db_path)
         self._lock = Lock()
-        self.create_tables()
 
     def create_connection(self):
         """Create a new SQLite connection."""
@@ -72,6 +76,14 @@ class ArticleDB:
                     )
                 ''')
 
+                # Columns added after the first release
+                self._add_column(conn, "articles", "scenes", "TEXT")
+                self._add_column(conn, "articles", "length", "TEXT")
+                self._add_column(conn, "articles", "plan", "TEXT")
+                self._add_column(conn, "articles", "preset", "TEXT")
+                self._add_column(conn, "articles", "duration_ms", "INTEGER")
+                self._add_column(conn, "articles", "audio_path", "TEXT")
+
                 # LLM call logs table
                 conn.execute('''
                     CREATE TABLE IF NOT EXISTS llm_calls (
@@ -82,59 +94,120 @@ class ArticleDB:
                     )
                 ''')
 
-    def save_article(self, topic: str, style: str, article: ArticleStructure) -> int:
-        """Save an article and return its ID"""
+    @staticmethod
+    def _add_column(conn, table: str, column: str, definition: str):
+        """Add a column to an existing table unless it's already there."""
+        columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def _dump_scenes(scenes: List[Scene]) -> str:
+        """Scenes (with their scripts) as a JSON array for the *paragraphs columns."""
+        return json.dumps([scene.model_dump(mode="json", exclude_none=True) for scene in scenes])
+
+    def save_article(
+        self,
+        topic: str,
+        style: str,
+        article: ArticleStructure,
+        plan: Optional[str] = None,
+        preset: Optional[str] = None,
+        duration_ms: Optional[int] = None,
+        audio_path: Optional[str] = None
+    ) -> int:
+        """
+        Save an article (and the plan it was written from) and return its ID.
+        `preset` and `duration_ms` record the pipeline preset it was written with
+        and how long that took; `audio_path` is its narration, if any.
+        """
         with self._lock:
             with self.create_connection() as conn:
                 # Insert main article
                 cursor = conn.execute(
                     '''INSERT INTO articles 
-                       (topic, style, title, intro_paragraphs, conclusion_paragraphs)
-                       VALUES (?, ?, ?, ?, ?)''',
-                    (topic, style, article.content.title,
-                     json.dumps(article.content.intro_paragraphs) if hasattr(article.content, 'intro_paragraphs') else '[]',
-                     json.dumps(article.content.conclusion_paragraphs) if hasattr(article.content, 'conclusion_paragraphs') else '[]')
+                       (topic, style, title, intro_paragraphs, conclusion_paragraphs, scenes, length, plan, preset, duration_ms, audio_path)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (topic, style, article.content.title, *self._top_level_scenes(article),
+                     article.length.value, plan, preset, duration_ms, audio_path)
                 )
                 article_id = cursor.lastrowid
-
-                # Only process headings for medium and long articles
-                if not isinstance(article.content, ShortArticleStructure):
-                    # Insert main headings
-                    for i, heading in enumerate(article.content.main_headings):
-                        cursor = conn.execute(
-                            '''INSERT INTO main_headings 
-                               (article_id, title, paragraphs, position)
-                               VALUES (?, ?, ?, ?)''',
-                            (article_id, heading.title,
-                             json.dumps(heading.paragraphs), i)
-                        )
-                        main_heading_id = cursor.lastrowid
-
-                        # Insert subheadings
-                        if heading.sub_headings:
-                            for j, sub in enumerate(heading.sub_headings):
-                                cursor = conn.execute(
-                                    '''INSERT INTO sub_headings 
-                                       (main_heading_id, title, paragraphs, position)
-                                       VALUES (?, ?, ?, ?)''',
-                                    (main_heading_id, sub.title,
-                                     json.dumps(sub.paragraphs), j)
-                                )
-                                sub_heading_id = cursor.lastrowid
-
-                                # Insert sub-subheadings
-                                if sub.sub_headings:
-                                    for k, subsub in enumerate(sub.sub_headings):
-                                        conn.execute(
-                                            '''INSERT INTO sub_sub_headings 
-                                               (sub_heading_id, title, paragraphs, position)
-                                               VALUES (?, ?, ?, ?)''',
-                                            (sub_heading_id, subsub.title,
-                                             json.dumps(subsub.paragraphs), k)
-                                        )
+                self._insert_headings(conn, article_id, article)
 
         return article_id
 
+    def update_article(self, article_id: int, article: ArticleStructure):
+        """Replace a saved article's scenes, e.g. after some were regenerated"""
+        with self._lock:
+            with self.create_connection() as conn:
+                conn.execute(
+                    '''UPDATE articles SET title = ?, intro_paragraphs = ?, conclusion_paragraphs = ?, scenes = ?
+                       WHERE id = ?''',
+                    (article.content.title, *self._top_level_scenes(article), article_id)
+                )
+                heading_ids = [row["id"] for row in conn.execute(
+                    'SELECT id FROM main_headings WHERE article_id = ?', (article_id,))]
+                for heading_id in heading_ids:
+                    conn.execute(
+                        '''DELETE FROM sub_sub_headings WHERE sub_heading_id IN
+                           (SELECT id FROM sub_headings WHERE main_heading_id = ?)''', (heading_id,))
+                    conn.execute('DELETE FROM sub_headings WHERE main_heading_id = ?', (heading_id,))
+                conn.execute('DELETE FROM main_headings WHERE article_id = ?', (article_id,))
+                self._insert_headings(conn, article_id, article)
+
+    def set_audio_path(self, article_id: int, audio_path: str):
+        """Attach narration made after the article was saved"""
+        with self._lock:
+            with self.create_connection() as conn:
+                conn.execute('UPDATE articles SET audio_path = ? WHERE id = ?', (audio_path, article_id))
+
+    def _top_level_scenes(self, article: ArticleStructure) -> tuple:
+        """(intro_paragraphs, conclusion_paragraphs, scenes) column values"""
+        content = article.content
+        return (
+            self._dump_scenes(content.intro_paragraphs) if hasattr(content, 'intro_paragraphs') else '[]',
+            self._dump_scenes(content.conclusion_paragraphs) if hasattr(content, 'conclusion_paragraphs') else '[]',
+            self._dump_scenes(content.scenes) if hasattr(content, 'scenes') else '[]',
+        )
+
+    def _insert_headings(self, conn, article_id: int, article: ArticleStructure):
+        # Only process headings for medium and long articles
+        if isinstance(article.content, ShortArticleStructure):
+            return
+        # Insert main headings
+        for i, heading in enumerate(article.content.main_headings):
+            cursor = conn.execute(
+                '''INSERT INTO main_headings 
+                   (article_id, title, paragraphs, position)
+                   VALUES (?, ?, ?, ?)''',
+                (article_id, heading.title,
+                 self._dump_scenes(heading.scenes), i)
+            )
+            main_heading_id = cursor.lastrowid
+
+            # Insert subheadings
+            if heading.sub_headings:
+                for j, sub in enumerate(heading.sub_headings):
+                    cursor = conn.execute(
+                        '''INSERT INTO sub_headings 
+                           (main_heading_id, title, paragraphs, position)
+                           VALUES (?, ?, ?, ?)''',
+                        (main_heading_id, sub.title,
+                         self._dump_scenes(sub.scenes), j)
+                    )
+                    sub_heading_id = cursor.lastrowid
+
+                    # Insert sub-subheadings
+                    if sub.sub_headings:
+                        for k, subsub in enumerate(sub.sub_headings):
+                            conn.execute(
+                                '''INSERT INTO sub_sub_headings 
+                                   (sub_heading_id, title, paragraphs, position)
+                                   VALUES (?, ?, ?, ?)''',
+                                (sub_heading_id, subsub.title,
+                                 self._dump_scenes(subsub.scenes), k)
+                            )
+
     def get_article_list(self):
         """Get a list of all articles with basic info"""
         with self.create_connection() as conn:
@@ -145,6 +218,30 @@ class ArticleDB:
             ''')
             return cursor.fetchall()
 
+    def get_preset_latency(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Articles written and their generation time, per preset and length: {preset: {length: {...}}}"""
+        with self.create_connection() as conn:
+            rows = conn.execute('''
+                SELECT preset, length, duration_ms FROM articles
+                WHERE preset IS NOT NULL AND duration_ms IS NOT NULL
+            ''').fetchall()
+
+        durations: Dict[str, Dict[str, List[int]]] = {}
+        for row in rows:
+            durations.setdefault(row['preset'], {}).setdefault(row['length'] or "unknown", []).append(row['duration_ms'])
+        return {
+            preset: {
+                length: {
+                    "articles": len(times),
+                    "median_ms": round(statistics.median(times)),
+                    "mean_ms": round(statistics.mean(times)),
+                    "max_ms": max(times),
+                }
+                for length, times in by_length.items()
+            }
+            for preset, by_length in durations.items()
+        }
+
     def get_article(self, article_id: int) -> Optional[Dict[str, Any]]:
         """Get a complete article by ID"""
         with self.create_connection() as conn:
@@ -159,6 +256,7 @@ class ArticleDB:
             result = dict(article)
             result['intro_paragraphs'] = json.loads(result['intro_paragraphs'])
             result['conclusion_paragraphs'] = json.loads(result['conclusion_paragraphs'])
+            result['scenes'] = json.loads(result['scenes'] or '[]')
             result['main_headings'] = []
 
             # Get main headings
@@ -193,6 +291,54 @@ class ArticleDB:
 
         return result 
 
+    def get_article_structure(self, article_id: int) -> Optional[Dict[str, Any]]:
+        """
+        A saved article as an ArticleStructure, with its topic, style and plan:
+        {"topic", "style", "plan", "article"}. Articles saved before the length
+        was recorded are classified by their shape.
+        """
+        saved = self.get_article(article_id)
+        if saved is None:
+            return None
+
+        def scenes(dumps: List[Dict[str, Any]]) -> List[Scene]:
+            return [Scene.model_validate(dump) for dump in dumps]
+
+        length = saved.get('length')
+        if not length:
+            if saved['scenes']:
+                length = ArticleLength.SHORT.value
+            elif any(heading['sub_headings'] for heading in saved['main_headings']):
+                length = ArticleLength.LONG.value
+            else:
+                length = ArticleLength.MEDIUM.value
+
+        if length == ArticleLength.SHORT.value:
+            content = ShortArticleStructure(title=saved['title'], scenes=scenes(saved['scenes']))
+        else:
+            structure = MediumArticleStructure if length == ArticleLength.MEDIUM.value else LongArticleStructure
+            content = structure(
+                title=saved['title'],
+                intro_paragraphs=scenes(saved['intro_paragraphs']),
+                main_headings=[
+                    MainHeading(title=heading['title'], scenes=scenes(heading['paragraphs']), sub_headings=[
+                        SubHeading(title=sub['title'], scenes=scenes(sub['paragraphs']), sub_headings=[
+                            SubSubHeading(title=subsub['title'], scenes=scenes(subsub['paragraphs']))
+                            for subsub in sub['sub_headings']
+                        ])
+                        for sub in heading['sub_headings']
+                    ])
+                    for heading in saved['main_headings']
+                ],
+                conclusion_paragraphs=scenes(saved['conclusion_paragraphs']),
+            )
+        return {
+            "topic": saved['topic'],
+            "style": saved['style'],
+            "plan": saved.get('plan') or "",
+            "article": ArticleStructure(length=ArticleLength(length), content=content),
+        }
+
     def save_llm_call_log(self, input_text: str | list, output_text: Any):
         """Save the input and output of an LLM call"""
         with self._lock:
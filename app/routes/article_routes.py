@@ -1,26 +1,64 @@
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import json
 import logging
 import asyncio
+import time
+from typing import Dict, Optional
 
 from app.services.llm_service import (
     generate_article_plan,
     structure_article_plan,
     write_full_article, 
     format_written_content,
+    regenerate_scenes,
     AVAILABLE_STYLES,
-    critique_and_elaborate_article_plan
+    critique_and_elaborate_article_plan,
+    critique_and_restructure_article_plan,
+    critique_article_plan_by_section
 )
-from app.schemas import ArticleLength
+from app.schemas import ArticleLength, CritiqueMode, Degradation, DraftFormat, GenerationStats, ImageMode, SceneScript, StyleMode
 from app.constants.writing_styles import AVAILABLE_STYLES  # Import the styles
-from app.services.audio_service import AudioService
+from app.constants.pipeline_presets import DEFAULT_PRESET, PIPELINE_PRESETS
+from app.services.coalescing_service import COALESCE_REQUESTS, coalescer
+from app.services.deadline_service import Deadline
+from app.services.event_bus_service import END_EVENT, event_bus
+from app.services.provider_service import model_tier
+from app.services.rate_limit_service import rate_limiter
+from app.services.scene_index_service import index_scenes
+from app.services.service_container import services
+from app.services.speculative_service import SpeculativeDrafter, accept as accept_speculative_drafts
+from app.services.tracing_service import tracer, to_otlp_payload
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Narration deferred past the deadline, by article ID, while it runs
+deferred_audio: Dict[int, asyncio.Task] = {}
+deferred_audio_errors: Dict[int, str] = {}
+
+async def narrate_later(article_id: int, scene_script: SceneScript):
+    """Narrate a saved article in the background and attach the audio to it."""
+    try:
+        with tracer.start_trace("deferred_audio", article_id=article_id):
+            with tracer.start_span("stage.audio"):
+                filename = await asyncio.to_thread(services.audio_service.process_article, scene_script)
+            await asyncio.to_thread(services.db.set_audio_path, article_id, f"output/{filename}")
+    except Exception as e:
+        logger.error(f"Error generating deferred audio for article {article_id}: {str(e)}")
+        deferred_audio_errors[article_id] = str(e)
+    finally:
+        deferred_audio.pop(article_id, None)
+
+async def draft_speculatively(drafter: SpeculativeDrafter):
+    """Run a speculative drafter in a worker thread; its failures only cost the drafts."""
+    try:
+        await asyncio.to_thread(drafter.run)
+    except Exception as e:
+        logger.warning(f"Speculative drafting failed: {str(e)}")
+
 @router.get("/api/v1/write-article-stream")
 async def write_article_stream(
     topic: str,
@@ -28,7 +66,15 @@ async def write_article_stream(
     length: str = "long",
     provider: str = "openai",
     includeHeaders: bool = True,
-    includeAudio: bool = False  # new parameter
+    preset: str = DEFAULT_PRESET,
+    # Each of these overrides the preset's choice when given
+    includeAudio: Optional[bool] = None,
+    styleMode: Optional[str] = None,
+    draftFormat: Optional[str] = None,
+    imageMode: Optional[str] = None,
+    speculative: Optional[bool] = None,
+    critiqueMode: Optional[str] = None,
+    deadlineSeconds: Optional[int] = None  # 0 for no deadline
 ):
     # Convert length string to enum
     try:
@@ -36,89 +82,463 @@ async def write_article_stream(
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid length: {length}")
 
-    async def event_generator():
+    if preset.lower() not in PIPELINE_PRESETS:
+        raise HTTPException(status_code=400, detail=f"Invalid preset: {preset}")
+    preset_name = preset.lower()
+    overrides = {}
+
+    if styleMode is not None:
+        try:
+            overrides["style_mode"] = StyleMode(styleMode.lower())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid styleMode: {styleMode}")
+
+    if draftFormat is not None:
         try:
-            # Generate initial plan
-            plan = generate_article_plan(topic, style, article_length, provider)
-            plan_data = json.dumps({"type": "plan", "content": plan})
-            yield f"data: {plan_data}\n\n"
-            
-            await asyncio.sleep(1)
-            
-            # Structure the plan
-            structured_plan = structure_article_plan(plan, article_length, provider)
-            outline_data = json.dumps({
-                "type": "outline",
-                "content": structured_plan.model_dump()
-            })
-            yield f"data: {outline_data}\n\n"
-            
-            await asyncio.sleep(1)
-            
-            # Critique and elaborate on the plan
-            revised_plan = critique_and_elaborate_article_plan(topic, plan, structured_plan, style, article_length, provider)
-            revised_plan_data = json.dumps({"type": "revised_plan", "content": revised_plan})
-            yield f"data: {revised_plan_data}\n\n"
-            
-            await asyncio.sleep(1)
-            
-            # Re-structure the revised plan
-            revised_structured_plan = structure_article_plan(revised_plan, article_length, provider)
-            revised_outline_data = json.dumps({
-                "type": "revised_outline",
-                "content": revised_structured_plan.model_dump()
-            })
-            yield f"data: {revised_outline_data}\n\n"
-            
-            await asyncio.sleep(1)
-            
-            # Write the full article using the revised structured plan
-            written_article, scene_script = write_full_article(
-                topic, 
-                revised_plan, 
-                revised_structured_plan, 
-                style=style, 
-                provider=provider,
-                include_headers=includeHeaders
-            )
-            
-            # Format the article content
-            formatted_content = format_written_content(
-                written_article,
-                include_headers=includeHeaders
-            )
-
-            # Prepare the complete response object
-            complete_response = {
-                "type": "complete_content",
-                "content": {
-                    "article": formatted_content,
-                    "audio_path": None
+            overrides["draft_format"] = DraftFormat(draftFormat.lower())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid draftFormat: {draftFormat}")
+
+    if imageMode is not None:
+        try:
+            overrides["image_mode"] = ImageMode(imageMode.lower())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid imageMode: {imageMode}")
+
+    if critiqueMode is not None:
+        try:
+            overrides["critique_mode"] = CritiqueMode(critiqueMode.lower())
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid critiqueMode: {critiqueMode}")
+
+    if includeAudio is not None:
+        overrides["audio"] = includeAudio
+    if speculative is not None:
+        overrides["speculative"] = speculative
+    if deadlineSeconds is not None:
+        if deadlineSeconds < 0:
+            raise HTTPException(status_code=400, detail=f"Invalid deadlineSeconds: {deadlineSeconds}")
+        overrides["deadline_seconds"] = deadlineSeconds or None
+
+    options = PIPELINE_PRESETS[preset_name].model_copy(update=overrides)
+
+    async def event_generator(job_id: str):
+        started = time.monotonic()
+        deadline = Deadline(options.deadline_seconds) if options.deadline_seconds else None
+        with tracer.start_trace(
+            "write_article",
+            topic=topic,
+            style=style,
+            length=article_length.value,
+            provider=provider,
+            preset=preset_name,
+            include_audio=options.audio,
+            style_mode=options.style_mode.value,
+            draft_format=options.draft_format.value,
+            image_mode=options.image_mode.value if options.images else "off",
+            speculative=options.speculative,
+            critique_mode=options.critique_mode.value if options.critique else "off",
+            deadline_seconds=options.deadline_seconds
+        ) as trace:
+            trace_data = json.dumps({"type": "trace", "content": {"trace_id": trace.trace_id, "job_id": job_id}})
+            yield f"data: {trace_data}\n\n"
+
+            drafter = None
+            drafting: Optional[asyncio.Task] = None
+            try:
+                # The stages make blocking API calls, so run them in worker threads
+                # to keep the event loop free for other concurrent articles.
+                # Each runs on the model tier the preset gives it.
+
+                # Generate initial plan
+                with tracer.start_span("stage.plan"), model_tier(options.tier("plan")):
+                    plan = await asyncio.to_thread(generate_article_plan, topic, style, article_length, provider)
+                plan_data = json.dumps({"type": "plan", "content": plan})
+                yield f"data: {plan_data}\n\n"
+
+                await asyncio.sleep(1)
+
+                # Structure the plan
+                with tracer.start_span("stage.outline"), model_tier(options.tier("outline")):
+                    structured_plan = await asyncio.to_thread(structure_article_plan, plan, article_length, provider)
+                outline_data = json.dumps({
+                    "type": "outline",
+                    "content": structured_plan.model_dump()
+                })
+                yield f"data: {outline_data}\n\n"
+
+                # Draft the opening scenes from this outline while it is critiqued and restructured
+                if options.speculative and options.critique:
+                    drafter = SpeculativeDrafter(
+                        topic, plan, structured_plan,
+                        style=style, provider=provider, style_mode=options.style_mode,
+                        include_audio=options.audio, draft_format=options.draft_format,
+                        style_attempts=options.style_attempts
+                    )
+                    with model_tier(options.tier("write")):
+                        drafting = asyncio.ensure_future(draft_speculatively(drafter))
+
+                await asyncio.sleep(1)
+
+                # Skip the critique when the write would no longer fit after it
+                critique = options.critique
+                if critique and deadline is not None and not deadline.fits_critique(len(index_scenes(structured_plan))):
+                    deadline.record(Degradation.CRITIQUE)
+                    critique = False
+
+                if not critique:
+                    # Write straight from the first outline
+                    revised_plan, revised_structured_plan = plan, structured_plan
+                else:
+                    # Critique and elaborate on the plan, then re-structure the revised plan,
+                    # or get both from one structured call in fused mode
+                    if options.critique_mode == CritiqueMode.FUSED:
+                        with tracer.start_span("stage.critique", fused=True), model_tier(options.tier("critique")):
+                            revised_plan, revised_structured_plan = await asyncio.to_thread(
+                                critique_and_restructure_article_plan, topic, plan, structured_plan, style, article_length, provider
+                            )
+                    elif options.critique_mode == CritiqueMode.MAP_REDUCE:
+                        # One critique per main heading in parallel, reconciled by a short final call
+                        with tracer.start_span("stage.critique", map_reduce=True), model_tier(options.tier("critique")):
+                            revised_plan = await asyncio.to_thread(
+                                critique_article_plan_by_section, topic, plan, structured_plan, style, article_length, provider
+                            )
+                    else:
+                        with tracer.start_span("stage.critique"), model_tier(options.tier("critique")):
+                            revised_plan = await asyncio.to_thread(
+                                critique_and_elaborate_article_plan, topic, plan, structured_plan, style, article_length, provider
+                            )
+                    revised_plan_data = json.dumps({"type": "revised_plan", "content": revised_plan})
+                    yield f"data: {revised_plan_data}\n\n"
+
+                    await asyncio.sleep(1)
+
+                    if options.critique_mode != CritiqueMode.FUSED:
+                        with tracer.start_span("stage.revised_outline"), model_tier(options.tier("outline")):
+                            revised_structured_plan = await asyncio.to_thread(structure_article_plan, revised_plan, article_length, provider)
+                    revised_outline_data = json.dumps({
+                        "type": "revised_outline",
+                        "content": revised_structured_plan.model_dump()
+                    })
+                    yield f"data: {revised_outline_data}\n\n"
+
+                    await asyncio.sleep(1)
+
+                # Keep the drafts the revision left alone
+                stats = GenerationStats()
+                drafts = []
+                if drafter is not None:
+                    drafts = accept_speculative_drafts(drafter.stop(), revised_structured_plan, stats)
+                    trace.set_attribute("speculative_hits", stats.speculative_hits)
+
+                # Write the full article using the revised structured plan
+                with tracer.start_span("stage.write"), model_tier(options.tier("write")):
+                    written_article, scene_script = await asyncio.to_thread(
+                        write_full_article,
+                        topic,
+                        revised_plan,
+                        revised_structured_plan,
+                        style=style,
+                        provider=provider,
+                        include_headers=includeHeaders,
+                        style_mode=options.style_mode,
+                        stats=stats,
+                        include_audio=options.audio,
+                        draft_format=options.draft_format,
+                        image_mode=options.image_mode,
+                        drafts=drafts,
+                        style_attempts=options.style_attempts,
+                        include_images=options.images,
+                        image_concurrency=options.image_concurrency,
+                        deadline=deadline
+                    )
+
+                # Format the article content
+                formatted_content = format_written_content(
+                    written_article,
+                    include_headers=includeHeaders
+                )
+
+                # Prepare the complete response object
+                complete_response = {
+                    "type": "complete_content",
+                    "content": {
+                        "article": formatted_content,
+                        "structure": written_article.model_dump(mode="json", exclude_none=True),
+                        "article_id": None,
+                        "preset": preset_name,
+                        "audio_path": None,
+                        "trace_id": trace.trace_id,
+                        "stats": stats.model_dump()
+                    }
                 }
-            }
-            
-            # Generate audio if requested
-            if includeAudio:
+
+                # Generate audio if requested, or after the response if it wouldn't finish in time
+                audio_deferred = options.audio and deadline is not None and not deadline.fits_audio(scene_script)
+                if audio_deferred:
+                    deadline.record(Degradation.AUDIO)
+                    complete_response["content"]["audio_deferred"] = True
+                elif options.audio:
+                    try:
+                        with tracer.start_span("stage.audio"):
+                            filename = await asyncio.to_thread(services.audio_service.process_article, scene_script)
+                        complete_response["content"]["audio_path"] = f"output/{filename}"
+                    except Exception as audio_error:
+                        logger.error(f"Error generating audio: {str(audio_error)}")
+                        complete_response["content"]["audio_error"] = str(audio_error)
+
+                # Keep the article, with each scene's script, its preset and how long it took, in the database
+                duration_ms = round((time.monotonic() - started) * 1000)
                 try:
-                    audio_service = AudioService()
-                    filename = audio_service.process_article(scene_script)
-                    complete_response["content"]["audio_path"] = f"output/{filename}"
-                except Exception as audio_error:
-                    logger.error(f"Error generating audio: {str(audio_error)}")
-                    complete_response["content"]["audio_error"] = str(audio_error)
-
-            # Send the complete response
-            response_data = json.dumps(complete_response)
-            yield f"data: {response_data}\n\n"
-            yield 'event: end\ndata: \n\n'
-            
+                    complete_response["content"]["article_id"] = await asyncio.to_thread(
+                        services.db.save_article, topic, style, written_article, revised_plan, preset_name, duration_ms,
+                        complete_response["content"]["audio_path"]
+                    )
+                except Exception as db_error:
+                    logger.error(f"Error saving article: {str(db_error)}")
+
+                article_id = complete_response["content"]["article_id"]
+                if audio_deferred and article_id is not None:
+                    # Poll /api/v1/articles/{article_id}/audio for it
+                    deferred_audio[article_id] = asyncio.ensure_future(narrate_later(article_id, scene_script))
+                elif audio_deferred:
+                    complete_response["content"]["audio_error"] = "Audio was deferred but the article could not be saved"
+
+                # Report what was given up to meet the deadline
+                if deadline is not None and deadline.degraded:
+                    summary = deadline.summary()
+                    trace.set_attribute("degraded", ",".join(summary["degraded"]))
+                    degraded_data = json.dumps({"type": "degraded", "content": summary})
+                    yield f"data: {degraded_data}\n\n"
+
+                # Send the complete response
+                response_data = json.dumps(complete_response)
+                yield f"data: {response_data}\n\n"
+                yield END_EVENT
+
+            except Exception as e:
+                logger.error(f"Error in event_generator: {str(e)}", exc_info=True)
+                trace.record_error(e)
+                error_data = json.dumps({"type": "error", "content": str(e)})
+                yield f"data: {error_data}\n\n"
+            finally:
+                if drafter is not None:
+                    drafter.stop()
+                if drafting is not None and not drafting.done():
+                    # Its thread abandons the scene in flight once stopped; don't hold the stream for it
+                    drafting.cancel()
+
+    if COALESCE_REQUESTS:
+        # Identical requests (topic up to case and spacing) share one run, and replay it once finished
+        key = coalescer.key(
+            topic=" ".join(topic.split()).casefold(),
+            style=style,
+            length=article_length.value,
+            provider=provider,
+            include_headers=includeHeaders,
+            options=options.model_dump(mode="json")
+        )
+        role, job = coalescer.job(key, event_generator)
+    else:
+        role, job = "leader", event_bus.start(event_generator)
+    return StreamingResponse(
+        job.subscribe(),
+        media_type='text/event-stream',
+        headers={"X-Coalesced": role, "X-Job-Id": job.job_id}
+    )
+
+@router.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = event_bus.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.status()
+
+@router.get("/api/v1/jobs/{job_id}/events")
+async def follow_job(job_id: str, request: Request, offset: Optional[int] = None):
+    """
+    Another SSE stream of a running or recently finished article job, from
+    `offset` on (or after the Last-Event-ID an EventSource reconnects with).
+    """
+    job = event_bus.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if offset is None:
+        last_event_id = request.headers.get("last-event-id", "")
+        offset = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+    if offset < 0:
+        raise HTTPException(status_code=400, detail=f"Invalid offset: {offset}")
+    return StreamingResponse(job.subscribe(offset), media_type='text/event-stream', headers={"X-Job-Id": job_id})
+
+@router.get("/api/v1/articles/{article_id}/scenes")
+async def list_article_scenes(article_id: int):
+    """Every scene of a saved article in reading order, with the path to regenerate it by."""
+    saved = await asyncio.to_thread(services.db.get_article_structure, article_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
+    return [ref.summary() for ref in index_scenes(saved["article"])]
+
+@router.get("/api/v1/articles/{article_id}/audio")
+async def get_article_audio(article_id: int):
+    """A saved article's narration; "pending" while audio deferred past its deadline is still being made."""
+    saved = await asyncio.to_thread(services.db.get_article, article_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
+    if article_id in deferred_audio:
+        status = "pending"
+    elif saved.get("audio_path"):
+        status = "ready"
+    elif article_id in deferred_audio_errors:
+        status = "failed"
+    else:
+        status = "none"
+    return {
+        "article_id": article_id,
+        "status": status,
+        "audio_path": saved.get("audio_path"),
+        "audio_error": deferred_audio_errors.get(article_id)
+    }
+
+@router.post("/api/v1/articles/{article_id}/regenerate")
+async def regenerate_article_scenes(
+    article_id: int,
+    path: str,
+    provider: str = "openai",
+    includeHeaders: bool = True,
+    includeAudio: bool = False,
+    styleMode: str = "two_pass",
+    draftFormat: str = "prose",
+    imageMode: str = "per_scene",
+    imageConcurrency: int = PIPELINE_PRESETS[DEFAULT_PRESET].image_concurrency
+):
+    """
+    Rewrite one scene, or every scene under a section (e.g. "headings/1"), of a
+    saved article, with new images. With includeAudio the article is narrated
+    again, reusing the cached audio of unchanged lines.
+    """
+    try:
+        style_mode = StyleMode(styleMode.lower())
+        draft_format = DraftFormat(draftFormat.lower())
+        image_mode = ImageMode(imageMode.lower())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid option: {str(e)}")
+    if imageConcurrency < 1:
+        raise HTTPException(status_code=400, detail=f"Invalid imageConcurrency: {imageConcurrency}")
+
+    saved = await asyncio.to_thread(services.db.get_article_structure, article_id)
+    if saved is None:
+        raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
+    article = saved["article"]
+
+    with tracer.start_trace("regenerate_scenes", article_id=article_id, path=path, provider=provider) as trace:
+        stats = GenerationStats()
+        try:
+            with tracer.start_span("stage.write"):
+                regenerated, scene_script = await asyncio.to_thread(
+                    regenerate_scenes,
+                    saved["topic"],
+                    saved["plan"],
+                    article,
+                    path,
+                    style=saved["style"],
+                    provider=provider,
+                    style_mode=style_mode,
+                    stats=stats,
+                    include_audio=includeAudio,
+                    draft_format=draft_format,
+                    image_mode=image_mode,
+                    image_concurrency=imageConcurrency
+                )
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
         except Exception as e:
-            logger.error(f"Error in event_generator: {str(e)}", exc_info=True)
-            error_data = json.dumps({"type": "error", "content": str(e)})
-            yield f"data: {error_data}\n\n"
+            trace.record_error(e)
+            raise HTTPException(status_code=500, detail=str(e))
 
-    return StreamingResponse(event_generator(), media_type='text/event-stream')
+        await asyncio.to_thread(services.db.update_article, article_id, article)
+        response = {
+            "article_id": article_id,
+            "regenerated": regenerated,
+            "article": format_written_content(article, include_headers=includeHeaders),
+            "structure": article.model_dump(mode="json", exclude_none=True),
+            "audio_path": None,
+            "trace_id": trace.trace_id,
+            "stats": stats.model_dump()
+        }
+        if includeAudio:
+            try:
+                with tracer.start_span("stage.audio"):
+                    filename = await asyncio.to_thread(services.audio_service.process_article, scene_script)
+                response["audio_path"] = f"output/{filename}"
+            except Exception as audio_error:
+                logger.error(f"Error generating audio: {str(audio_error)}")
+                response["audio_error"] = str(audio_error)
+        return response
 
 @router.get("/api/v1/styles")
 async def get_styles():
-    return {key: style.model_dump() for key, style in AVAILABLE_STYLES.items()}
\ No newline at end of file
+    return {key: style.model_dump() for key, style in AVAILABLE_STYLES.items()}
+
+@router.get("/api/v1/presets")
+async def get_presets():
+    return {key: preset.model_dump() for key, preset in PIPELINE_PRESETS.items()}
+
+@router.get("/api/v1/debug/rate-limits")
+async def get_rate_limits():
+    """Retry/throttle counters and the current adaptive concurrency limit per provider."""
+    return rate_limiter.snapshot()
+
+@router.get("/api/v1/debug/providers")
+async def get_provider_health():
+    """Per-stage latency percentiles, circuit breaker states and hedging/failover counts."""
+    from app.services.hedging_service import provider_health
+    return provider_health.snapshot()
+
+@router.get("/api/v1/debug/presets")
+async def get_preset_latency():
+    """Articles saved per preset and length, with their generation time from request to save."""
+    return await asyncio.to_thread(services.db.get_preset_latency)
+
+@router.get("/api/v1/debug/coalescing")
+async def get_coalescing():
+    """How many article requests shared another's run, in flight or finished."""
+    return coalescer.snapshot()
+
+@router.get("/api/v1/debug/jobs")
+async def get_jobs():
+    """Jobs on the event bus, their subscribers and how many were dropped for falling behind."""
+    return event_bus.snapshot()
+
+@router.get("/api/v1/debug/model-routing")
+async def get_model_routing():
+    """The stage routing table, and calls, errors, latency and tokens per stage and model."""
+    from app.services.model_routing_service import model_router
+    return model_router.snapshot()
+
+@router.get("/api/v1/debug/image-cache")
+async def get_image_cache():
+    """Image cache hits, misses, evictions and size."""
+    from app.services.image_cache_service import image_cache
+    return image_cache.snapshot()
+
+@router.get("/api/v1/debug/traces")
+async def list_traces():
+    return tracer.list_traces()
+
+@router.get("/api/v1/debug/traces/{trace_id}")
+async def get_trace(trace_id: str, download: bool = False):
+    """Per-article waterfall plus the raw spans in OTLP/JSON format."""
+    spans = tracer.get_trace(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail=f"Trace not found: {trace_id}")
+    headers = {}
+    if download:
+        headers["Content-Disposition"] = f'attachment; filename="trace_{trace_id}.json"'
+    return JSONResponse(
+        content={
+            "trace_id": trace_id,
+            "waterfall": tracer.waterfall(trace_id),
+            "otlp": to_otlp_payload(spans)
+        },
+        headers=headers
+    )
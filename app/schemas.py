@@ -1,5 +1,6 @@
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+from pydantic.json_schema import SkipJsonSchema
 from enum import Enum
 from datetime import datetime
 
@@ -14,11 +15,49 @@ class SceneScript(BaseModel):
     scene_title: str
     paragraphs: List[Paragraph]
 
+    def to_prose(self) -> str:
+        """Join the script's lines back into prose, quoting character dialogue."""
+        formatted_paragraphs = []
+        for paragraph in self.paragraphs:
+            prose_lines = []
+            for line in paragraph.lines:
+                if line.speaker == "Narrator":
+                    prose_lines.append(line.text)
+                else:
+                    # Add quotes around character dialogue
+                    prose_lines.append(f'"{line.text}"')
+            formatted_paragraphs.append(" ".join(prose_lines))
+        return "\n\n".join(formatted_paragraphs)
+
 class Scene(BaseModel):
     scene_description: str
     must_include: str
     text: Optional[str] = None
     image_url: Optional[str] = None  # NEW FIELD FOR IMAGE
+    # The written scene. Left out of the JSON schema so outline requests don't ask the model for it
+    script: SkipJsonSchema[Optional[SceneScript]] = None
+
+    _prose: Optional[str] = PrivateAttr(default=None)
+    _prose_script: Optional[SceneScript] = PrivateAttr(default=None)
+
+    @property
+    def prose(self) -> Optional[str]:
+        """
+        The scene as prose: derived from `script` once and reused until a
+        different script is assigned, else `text` (older JSON-in-text
+        scenes are converted on every call).
+        """
+        if self.script is None:
+            if self.text and self.text.lstrip().startswith("{"):
+                try:
+                    return SceneScript.model_validate_json(self.text).to_prose()
+                except ValueError:
+                    pass
+            return self.text
+        if self._prose is None or self._prose_script is not self.script:
+            self._prose = self.script.to_prose()
+            self._prose_script = self.script
+        return self._prose
 
 # Base content models
 class SubSubHeading(BaseModel):
@@ -54,12 +93,78 @@ class LongArticleStructure(BaseModel):
     main_headings: List[MainHeading]
     conclusion_paragraphs: List[Scene]
 
+# The critique stage's answer in fused mode: the revised plan and its outline in one structured call
+class RevisedShortArticlePlan(BaseModel):
+    revised_plan: str
+    outline: ShortArticleStructure
+
+class RevisedMediumArticlePlan(BaseModel):
+    revised_plan: str
+    outline: MediumArticleStructure
+
+class RevisedLongArticlePlan(BaseModel):
+    revised_plan: str
+    outline: LongArticleStructure
+
+# The reduce step of a map-reduce critique: what joins the separately revised sections
+class PlanReconciliation(BaseModel):
+    opening: str  # revised plan for the introduction
+    section_notes: List[str]  # one continuity note per main heading, in order; "None" when it needs no change
+    closing: str  # revised plan for the conclusion
+
 # Enum for article length
 class ArticleLength(str, Enum):
     SHORT = "short"
     MEDIUM = "medium"
     LONG = "long"
 
+# How each scene's prose gets into the requested style
+class StyleMode(str, Enum):
+    TWO_PASS = "two_pass"  # draft, then rewrite with apply_style_transfer
+    SINGLE_PASS = "single_pass"  # draft in style; rewrite only if forbidden words slip through
+
+# How the critiqued plan is turned into the revised outline
+class CritiqueMode(str, Enum):
+    TWO_STEP = "two_step"  # critique to a free-text plan, then structure_article_plan again
+    FUSED = "fused"  # one structured call returns the revised plan and its outline
+    MAP_REDUCE = "map_reduce"  # each main heading critiqued in parallel, reconciled, then structured again
+
+# Which of a provider's models a stage calls
+class ModelTier(str, Enum):
+    DEFAULT = "default"  # the provider's flagship models
+    FAST = "fast"  # smaller, faster models for draft-grade output
+
+# What the writer returns for each scene
+class DraftFormat(str, Enum):
+    PROSE = "prose"  # plain text; split into a SceneScript afterwards when audio is needed
+    SCRIPT = "script"  # a speaker-tagged SceneScript straight from structured output
+
+# How scene illustrations are prompted
+class ImageMode(str, Enum):
+    PER_SCENE = "per_scene"  # one prompt call per scene, right after it is written
+    BATCHED = "batched"  # one structured call for all scenes, then images in parallel
+
+# What a request with a deadline gives up to finish inside it, in the order it's given up
+class Degradation(str, Enum):
+    CRITIQUE = "critique"  # the first outline is written without a critique pass
+    STYLE_RETRIES = "style_retries"  # no forbidden-word retries after the first style transfer
+    IMAGES = "images"  # no illustrations for the remaining scenes
+    SHORT_SCENES = "short_scenes"  # the remaining scenes are written brief
+    AUDIO = "audio"  # narration runs as a background job after the response
+
+class ImagePromptBatch(BaseModel):
+    prompts: List[str]
+
+# Counters for one article, returned with the complete content
+class GenerationStats(BaseModel):
+    scenes_written: int = 0
+    style_transfer_calls_avoided: int = 0
+    style_transfer_fallbacks: int = 0
+    script_extractions_avoided: int = 0
+    speculative_drafts: int = 0  # opening scenes drafted from the first outline during critique
+    speculative_hits: int = 0  # of those, kept for the revised outline
+    speculative_ms_saved: int = 0  # drafting time of the kept scenes, no longer on the critical path
+
 # Combined article structure that can represent any length
 class ArticleStructure(BaseModel):
     length: ArticleLength
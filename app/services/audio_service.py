@@ -1,16 +1,23 @@
 import base64
-from typing import List, Dict, Set
+import hashlib
+from typing import List, Dict, Optional, Set
 import os
-from elevenlabs import ElevenLabs, VoiceSettings
 from app.schemas import SceneLine, SceneScript
+from app.services.rate_limit_service import rate_limiter
+from app.services.tracing_service import tracer
+from app.static_files import content_digest
 import dotenv
-import uuid
-from datetime import datetime
 import io
 import tempfile
+import threading
 
 dotenv.load_dotenv()
 
+# Synthesized lines are kept here by voice and text, so re-narrating an article
+# after a few scenes change only calls the TTS API for the changed lines
+AUDIO_SEGMENT_CACHE_DIR = os.getenv("AUDIO_SEGMENT_CACHE_DIR", os.path.join(".cache", "audio_segments"))
+AUDIO_SEGMENT_CACHE = os.getenv("AUDIO_SEGMENT_CACHE", "true").lower() == "true"
+
 def normalize_speaker_name(speaker: str) -> str:
     """Normalize speaker names to ensure consistency."""
     # Convert to title case first
@@ -26,13 +33,18 @@ class AudioService:
     def __init__(self):
         print("Initializing AudioService...")
         self.voice_mapping: Dict[str, str] = {}  # Maps speakers to voice IDs
-        self.client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
         # Create frontend/output directory if it doesn't exist
         self.output_dir = os.path.join("frontend", "output")
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
         print("AudioService initialized successfully")
         
+    @property
+    def client(self):
+        """Shared ElevenLabs client, created on first use with a pooled keep-alive connection."""
+        from app.services.service_container import services
+        return services.elevenlabs_client
+
     def extract_unique_speakers(self, script: SceneScript) -> Set[str]:
         """Extract all unique speakers from the script."""
         print("Extracting speakers from script...")
@@ -58,24 +70,35 @@ class AudioService:
             "qNkzaJoHLLdpvgh5tISm"
         ]
         
+        # Build a fresh mapping so concurrent articles sharing this service don't clash
+        voice_mapping: Dict[str, str] = {}
+
         # Always assign first voice to narrator for consistency
-        self.voice_mapping["Narrator"] = available_voices[0]
+        voice_mapping["Narrator"] = available_voices[0]
         print(f"Assigned voice ID '{available_voices[0]}' to Narrator")
         
-        # Assign remaining voices to speakers
-        remaining_speakers = speakers - {"Narrator"}
+        # Assign remaining voices to speakers, in a stable order so regenerated
+        # articles keep their voices (and cached segments)
+        remaining_speakers = sorted(speakers - {"Narrator"})
         for i, speaker in enumerate(remaining_speakers):
             voice_idx = (i % (len(available_voices) - 1)) + 1
-            self.voice_mapping[speaker] = available_voices[voice_idx]
+            voice_mapping[speaker] = available_voices[voice_idx]
             print(f"Assigned voice ID '{available_voices[voice_idx]}' to speaker '{speaker}'")
-            
-        return self.voice_mapping
+
+        self.voice_mapping = voice_mapping
+        return voice_mapping
     
+    @tracer.traced("audio.generate_audio_for_text")
     def generate_audio_for_text(self, text: str, voice_id: str) -> bytes:
         """Generate audio for a single piece of text using ElevenLabs TTS API."""
+        cache_path = self._segment_cache_path(text, voice_id)
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                return f.read()
         print(f"Generating audio for text (length: {len(text)}) with voice ID: {voice_id}")
-        try:
-            # Get the generator from the API
+
+        def convert() -> bytes:
+            # Get the generator from the API; the request is only made once it is read
             audio_generator = self.client.text_to_speech.convert(
                 voice_id=voice_id,
                 model_id="eleven_multilingual_v2",
@@ -88,22 +111,40 @@ class AudioService:
                     "use_speaker_boost": True
                 }
             )
-            
+
             # Convert generator to bytes by reading all chunks
             audio_chunks = []
             for chunk in audio_generator:
                 if chunk:
                     audio_chunks.append(chunk)
-            
+
             # Combine all chunks into a single bytes object
-            audio_data = b''.join(audio_chunks)
+            return b''.join(audio_chunks)
+
+        try:
+            audio_data = rate_limiter.call("elevenlabs", "eleven_multilingual_v2", convert)
             print(f"Successfully generated audio segment of size: {len(audio_data)} bytes")
+            if cache_path and audio_data:
+                os.makedirs(AUDIO_SEGMENT_CACHE_DIR, exist_ok=True)
+                # Per-thread name, so two threads narrating the same segment don't share a temp file
+                tmp_path = f"{cache_path}.tmp{threading.get_ident()}"
+                with open(tmp_path, "wb") as f:
+                    f.write(audio_data)
+                os.replace(tmp_path, cache_path)
             return audio_data
             
         except Exception as e:
             print(f"Error generating audio for text: {e}")
             return b""  # Return empty bytes on error
     
+    @staticmethod
+    def _segment_cache_path(text: str, voice_id: str) -> Optional[str]:
+        if not AUDIO_SEGMENT_CACHE:
+            return None
+        key = hashlib.sha256(f"eleven_multilingual_v2|mp3_44100_128|{voice_id}|{text}".encode("utf-8")).hexdigest()[:32]
+        return os.path.join(AUDIO_SEGMENT_CACHE_DIR, f"{key}.mp3")
+
+    @tracer.traced("audio.stitch_audio_segments")
     def stitch_audio_segments(self, audio_segments: List[bytes]) -> bytes:
         """Combine multiple audio segments into a single MP3 file."""
         print(f"Stitching {len(audio_segments)} audio segments together...")
@@ -132,7 +173,8 @@ class AudioService:
                     f.write(f"file '{temp_file}'\n")
             
             # Run ffmpeg
-            os.system(f'ffmpeg -f concat -safe 0 -i "{concat_list}" -c copy "{output_path}"')
+            with tracer.start_span("audio.ffmpeg_concat", segments=len(temp_files)):
+                os.system(f'ffmpeg -f concat -safe 0 -i "{concat_list}" -c copy "{output_path}"')
             
             # Read the final output
             with open(output_path, "rb") as f:
@@ -141,6 +183,7 @@ class AudioService:
         print(f"Final audio size: {len(combined_audio)} bytes")
         return combined_audio
 
+    @tracer.traced("audio.process_article")
     def process_article(self, script: SceneScript) -> str:
         """Main function to process entire script and generate full audio. Returns the filename."""
         print("Processing script...")
@@ -154,21 +197,21 @@ class AudioService:
         speakers = self.extract_unique_speakers(script)
         
         # 2. Assign voices to speakers
-        self.assign_voices_to_speakers(speakers)
+        voice_mapping = self.assign_voices_to_speakers(speakers)
         
         # 3. Generate audio segments
         print("Starting audio generation...")
         audio_segments = []
         
         # Add title narration
-        title_audio = self.generate_audio_for_text(script.scene_title, self.voice_mapping["Narrator"])
+        title_audio = self.generate_audio_for_text(script.scene_title, voice_mapping["Narrator"])
         if title_audio:
             audio_segments.append(title_audio)
         
         # Process each paragraph
         for paragraph in script.paragraphs:
             for line in paragraph.lines:
-                voice_id = self.voice_mapping[line.speaker]  # Will now use normalized speaker names
+                voice_id = voice_mapping[line.speaker]  # Will now use normalized speaker names
                 print(f"Processing line for speaker '{line.speaker}' with voice '{voice_id}'")
                 audio = self.generate_audio_for_text(line.text, voice_id)
                 if audio:  # Only append if we got valid audio
@@ -178,10 +221,8 @@ class AudioService:
         print("Finalizing audio processing...")
         final_audio = self.stitch_audio_segments(audio_segments)
         
-        # 5. Save to file with unique name
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
-        filename = f"story_{timestamp}_{unique_id}.mp3"
+        # 5. Save to file named by its content hash, so it can be cached as immutable
+        filename = f"story-{content_digest(final_audio)}.mp3"
         filepath = os.path.join(self.output_dir, filename)
         
         with open(filepath, "wb") as f:
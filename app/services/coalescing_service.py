@@ -0,0 +1,85 @@
+import hashlib
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from app.services.event_bus_service import EventBus, JobEvents, event_bus
+
+logger = logging.getLogger(__name__)
+
+# Identical article requests share one pipeline run while it's in flight
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "true").lower() == "true"
+# How long a finished run is replayed to new identical requests (0: only while in flight)
+COALESCE_TTL_SECONDS = float(os.getenv("COALESCE_TTL_SECONDS", "300"))
+
+
+class RequestCoalescer:
+    """
+    Single-flight for article streams. The first request for a key becomes
+    the leader: its pipeline is started as a job on the event bus, so it
+    finishes even if the leader's client goes away. Identical requests
+    arriving while it runs join the job, and for `ttl_seconds` after it
+    succeeds they are replayed its events instead of running the pipeline
+    again. Failed runs are never replayed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = COALESCE_TTL_SECONDS,
+        bus: Optional[EventBus] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.bus = bus or event_bus
+        self.flights: Dict[str, JobEvents] = {}
+        self.counts: Counter = Counter()
+
+    @staticmethod
+    def key(**params: Any) -> str:
+        """A stable key for the request parameters that decide the article."""
+        return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    def job(self, key: str, source: Callable[[str], AsyncIterator[str]]) -> Tuple[str, JobEvents]:
+        """
+        The job for `key`, and whether this request is the "leader" (starts
+        `source`), "joined" a job in flight or "reused" a finished one.
+        """
+        self._expire()
+        self.counts["requests"] += 1
+        job = self.flights.get(key)
+        if job is None:
+            role = "leader"
+            job = self.flights[key] = self.bus.start(source)
+        else:
+            role = "reused" if job.done else "joined"
+        self.counts[role] += 1
+        return role, job
+
+    def _expire(self):
+        now = self.bus.clock()
+        for key, job in list(self.flights.items()):
+            if not job.done:
+                continue
+            expired = self.ttl_seconds <= 0 or now - job.finished_at > self.ttl_seconds
+            # A job the bus no longer keeps can't be replayed either
+            if expired or not job.succeeded or self.bus.get(job.job_id) is not job:
+                del self.flights[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._expire()
+        requests = self.counts["requests"]
+        return {
+            "requests": requests,
+            "leaders": self.counts["leader"],
+            "joined": self.counts["joined"],
+            "reused": self.counts["reused"],
+            # Share of requests served without running the pipeline
+            "coalescing_ratio": round((self.counts["joined"] + self.counts["reused"]) / requests, 3) if requests else 0.0,
+            "in_flight": sum(not job.done for job in self.flights.values()),
+            "cached": sum(job.done for job in self.flights.values()),
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+coalescer = RequestCoalescer()
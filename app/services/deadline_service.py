@@ -0,0 +1,106 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.schemas import Degradation, SceneScript
+
+logger = logging.getLogger(__name__)
+
+# Seconds of the budget held back from the scenes for audio and saving the article
+DEADLINE_RESERVE_SECONDS = float(os.getenv("DEADLINE_RESERVE_SECONDS", "10"))
+# Assumed time to write and illustrate the first scene, before one has been timed
+DEADLINE_SCENE_SECONDS = float(os.getenv("DEADLINE_SCENE_SECONDS", "15"))
+# Assumed time for the critique stage, revised outline included, when deciding whether it still fits
+DEADLINE_CRITIQUE_SECONDS = float(os.getenv("DEADLINE_CRITIQUE_SECONDS", "30"))
+# Assumed narration time per script line, to decide whether audio still fits
+DEADLINE_AUDIO_SECONDS_PER_LINE = float(os.getenv("DEADLINE_AUDIO_SECONDS_PER_LINE", "1.0"))
+# How far projected scene time may exceed what's left before scenes are shortened as well
+DEADLINE_SHORTEN_PRESSURE = float(os.getenv("DEADLINE_SHORTEN_PRESSURE", "1.5"))
+
+
+class Deadline:
+    """
+    A request's time budget, counted from when it is created. The critique
+    stage is skipped unless fits_critique() says the write still fits after
+    it, and the writer asks schedule() before each scene what to give up so
+    the rest of the article fits; what was given up, and for which scenes, is
+    kept for the "degraded" SSE event.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        reserve: float = DEADLINE_RESERVE_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.seconds = seconds
+        # Short budgets still leave most of their time to the scenes
+        self.reserve = min(reserve, seconds / 4)
+        self._clock = clock
+        self.started = clock()
+        self.active: Set[Degradation] = set()
+        self._degraded: Dict[Degradation, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def remaining(self) -> float:
+        return self.seconds - self.elapsed()
+
+    def schedule(self, scenes_left: int, scene_seconds: Optional[float] = None) -> Set[Degradation]:
+        """
+        What to give up for the next scene so that `scenes_left` scenes,
+        including it, at `scene_seconds` each, finish before the reserve.
+        Forbidden-word retries and images go once the projection overruns;
+        scenes are shortened too once it overruns by DEADLINE_SHORTEN_PRESSURE.
+        Until a scene has been timed only the next one is projected, at
+        DEADLINE_SCENE_SECONDS, so fast articles aren't degraded on a guess.
+        A degradation, once started, stays on for the rest of the article.
+        """
+        available = self.remaining() - self.reserve
+        if scene_seconds is None:
+            projected = DEADLINE_SCENE_SECONDS
+        else:
+            projected = scenes_left * scene_seconds
+        with self._lock:
+            if projected > available:
+                self.active |= {Degradation.STYLE_RETRIES, Degradation.IMAGES}
+            if projected > available * DEADLINE_SHORTEN_PRESSURE:
+                self.active.add(Degradation.SHORT_SCENES)
+            return set(self.active)
+
+    def fits_critique(self, scenes: int) -> bool:
+        """
+        Whether critiquing the outline still leaves time to write its `scenes`
+        scenes, at DEADLINE_SCENE_SECONDS each, before the reserve.
+        """
+        return DEADLINE_CRITIQUE_SECONDS + scenes * DEADLINE_SCENE_SECONDS <= self.remaining() - self.reserve
+
+    def fits_audio(self, script: SceneScript) -> bool:
+        """Whether narrating `script` should finish before the deadline."""
+        lines = sum(len(paragraph.lines) for paragraph in script.paragraphs)
+        return lines * DEADLINE_AUDIO_SECONDS_PER_LINE <= self.remaining()
+
+    def record(self, step: Degradation, position: Optional[int] = None):
+        """Note that `step` was given up, for the scene at `position` if it's per scene."""
+        with self._lock:
+            if step not in self._degraded:
+                logger.info(f"{self.remaining():.1f}s of a {self.seconds}s deadline left; degrading {step.value}")
+            positions = self._degraded.setdefault(step, [])
+            if position is not None:
+                positions.append(position)
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self._degraded)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "deadline_seconds": self.seconds,
+                "elapsed_seconds": round(self.elapsed(), 1),
+                "degraded": {step.value: {"scenes": positions} for step, positions in self._degraded.items()},
+            }
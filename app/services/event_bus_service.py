@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# SSE events of a job kept in memory; older ones are read back from its tail on disk
+JOB_EVENT_BUFFER = int(os.getenv("JOB_EVENT_BUFFER", "64"))
+# Where each job's full event log is written ("" to keep only the in-memory buffer)
+JOB_EVENT_DIR = os.getenv("JOB_EVENT_DIR", os.path.join(".cache", "job_events"))
+# How long a finished job can still be subscribed to before it and its log are removed
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "600"))
+
+# The last SSE event of a successful article stream
+END_EVENT = 'event: end\ndata: \n\n'
+
+
+def dropped_event(offset: int) -> str:
+    """Tells a subscriber it was dropped, and the offset to reconnect from."""
+    return f"event: dropped\ndata: {json.dumps({'offset': offset})}\n\n"
+
+
+class JobEvents:
+    """
+    The SSE events of one generation job, numbered from 0. The latest
+    `buffer_size` are kept in memory; every event is also appended to a log
+    file, so a subscriber can catch up from any offset. Log writes are batched
+    into a worker thread, and events still queued for the log are read from
+    the queue. Publishing never waits on the disk or on subscribers: one that
+    has caught up, then falls out of the buffer because it isn't reading the
+    events it was sent, is sent a "dropped" event with the offset to resume
+    from, and its stream ends.
+    """
+
+    def __init__(self, job_id: str, buffer_size: int = JOB_EVENT_BUFFER, path: Optional[str] = None):
+        self.job_id = job_id
+        self.path = path
+        self.published = 0
+        self.done = False
+        self.succeeded = False
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+        self.dropped = 0
+        self._buffer: Deque[str] = deque(maxlen=buffer_size)
+        # Byte position of each event in the log, so reads from an offset can seek to it
+        self._positions: List[int] = []
+        self._log = open(path, "a", encoding="utf-8", newline="") if path else None
+        self._log_end = self._log.tell() if self._log is not None else 0
+        # Events from offset `_written` on that are still queued for (or being written to) the log
+        self._written = 0
+        self._unwritten: List[str] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event: str):
+        if self._log is not None:
+            self._positions.append(self._log_end)
+            self._log_end += len((json.dumps(event) + "\n").encode("utf-8"))
+            self._unwritten.append(event)
+            self._start_writer()
+        self._buffer.append(event)
+        self.published += 1
+        if event == END_EVENT:
+            self.succeeded = True
+        self._notify()
+
+    def finish(self, finished_at: float):
+        self.done = True
+        self.finished_at = finished_at
+        if self._log is not None:
+            # The writer closes the log once the queue is written
+            self._start_writer()
+        self._notify()
+
+    def _start_writer(self):
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_queued())
+
+    async def _write_queued(self):
+        """Writes queued events in batches until the queue is empty, then closes the log if the job is done."""
+        try:
+            while self._unwritten:
+                batch = list(self._unwritten)
+                await asyncio.to_thread(self._append, "".join(json.dumps(event) + "\n" for event in batch))
+                del self._unwritten[:len(batch)]
+                self._written += len(batch)
+        except Exception as e:
+            logger.error(f"Error writing the event log of job {self.job_id}: {str(e)}")
+        finally:
+            if self.done and self._log is not None and not self._unwritten:
+                log, self._log = self._log, None
+                await asyncio.to_thread(log.close)
+
+    def _append(self, lines: str):
+        self._log.write(lines)
+        self._log.flush()
+
+    def remove(self):
+        """Deletes the log, once the job can no longer be subscribed to."""
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _read(self, start: int, stop: int) -> List[str]:
+        """Events `start` up to `stop`, from memory or, for older ones, the log."""
+        first = self.published - len(self._buffer)
+        if start >= first:
+            return list(self._buffer)[start - first:stop - first]
+        events = []
+        if start < self._written:
+            with open(self.path, encoding="utf-8") as log:
+                log.seek(self._positions[start])
+                events = [json.loads(log.readline()) for _ in range(start, min(stop, self._written))]
+        return events + self._unwritten[max(start, self._written) - self._written:stop - self._written]
+
+    async def subscribe(self, offset: int = 0) -> AsyncIterator[str]:
+        """The events from `offset` on, each with its offset as the SSE id."""
+        self.subscribers += 1
+        position = min(offset, self.published)
+        live = False
+        # Events missed while catching up or waiting for the job are read from the log
+        excused = True
+        try:
+            while True:
+                first = self.published - len(self._buffer)
+                if position < first and (not excused or self.path is None):
+                    # Overrun while the subscriber held up events, or nothing to catch up from
+                    self.dropped += 1
+                    logger.warning(f"Dropped a slow subscriber of job {self.job_id} at offset {position}")
+                    yield dropped_event(position if self.path is not None else first)
+                    return
+                if position < self.published:
+                    for event in self._read(position, self.published):
+                        yield f"id: {position}\n{event}"
+                        position += 1
+                    excused = not live
+                    continue
+                if self.done:
+                    return
+                live = True
+                await self._changed.wait()
+                excused = True
+        finally:
+            self.subscribers -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "events": self.published,
+            "buffered_from": self.published - len(self._buffer),
+            "done": self.done,
+            "succeeded": self.succeeded,
+            "subscribers": self.subscribers,
+            "dropped": self.dropped,
+            "logged": self._written,
+        }
+
+
+class EventBus:
+    """
+    The jobs that can be subscribed to, by job ID. start() runs a job's event
+    source as a task of its own, so it runs to the end however many clients
+    follow it, and whether or not any of them go away. Finished jobs are kept
+    for `retention_seconds`.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = JOB_EVENT_BUFFER,
+        directory: Optional[str] = JOB_EVENT_DIR,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.buffer_size = buffer_size
+        self.directory = directory or None
+        self.retention_seconds = retention_seconds
+        self.clock = clock
+        self.jobs: Dict[str, JobEvents] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def start(self, source: Callable[[str], AsyncIterator[str]]) -> JobEvents:
+        """A new job publishing the events of `source`, which is passed its job ID."""
+        self._expire()
+        job_id = uuid.uuid4().hex
+        path = None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{job_id}.jsonl")
+        job = self.jobs[job_id] = JobEvents(job_id, self.buffer_size, path)
+        task = asyncio.ensure_future(self._run(job, source(job_id)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: JobEvents, events: AsyncIterator[str]):
+        try:
+            async for event in events:
+                job.publish(event)
+        except Exception as e:
+            logger.error(f"Error in job {job.job_id}: {str(e)}", exc_info=True)
+        finally:
+            job.finish(self.clock())
+
+    def get(self, job_id: str) -> Optional[JobEvents]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    def _expire(self):
+        now = self.clock()
+        for job_id, job in list(self.jobs.items()):
+            if job.done and now - job.finished_at > self.retention_seconds:
+                del self.jobs[job_id]
+                job.remove()
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._expire()
+        jobs = list(self.jobs.values())
+        return {
+            "running": sum(not job.done for job in jobs),
+            "finished": sum(job.done for job in jobs),
+            "subscribers": sum(job.subscribers for job in jobs),
+            "dropped_subscribers": sum(job.dropped for job in jobs),
+            "buffer_size": self.buffer_size,
+            "on_disk": self.directory is not None,
+            "retention_seconds": self.retention_seconds,
+        }
+
+
+event_bus = EventBus()
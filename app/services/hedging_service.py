@@ -0,0 +1,247 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from app.services.provider_service import Provider, current_stage
+from app.services.rate_limit_service import is_retryable
+from app.services.tracing_service import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per (stage, provider)."""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, provider: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault((stage, provider), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, stage: str, provider: str, percentile: float) -> Optional[float]:
+        """The given percentile, or None until min_samples calls have been seen."""
+        with self._lock:
+            samples = sorted(self._samples.get((stage, provider), ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            keys = list(self._samples)
+        stages: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for stage, provider in keys:
+            stages.setdefault(stage, {})[provider] = {
+                "count": len(self._samples[(stage, provider)]),
+                "p50_ms": _ms(self.percentile(stage, provider, 50)),
+                "p95_ms": _ms(self.percentile(stage, provider, 95)),
+            }
+        return stages
+
+
+def _ms(seconds: Optional[float]) -> Optional[int]:
+    return round(seconds * 1000) if seconds is not None else None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+class ProviderHealth:
+    """Latency percentiles, circuit breakers and hedging counters shared by every request."""
+
+    def __init__(self, percentile: float = 95, default_hedge_after: float = 20.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.percentile = percentile
+        self.default_hedge_after = default_hedge_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency = LatencyTracker()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"calls": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0, "breaker_rejections": 0}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[provider]
+
+    def hedge_after(self, stage: str, provider: str) -> float:
+        """Seconds to wait for `provider` before hedging: the stage's observed percentile latency."""
+        observed = self.latency.percentile(stage, provider, self.percentile)
+        return observed if observed is not None else self.default_hedge_after
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = {name: breaker.state for name, breaker in self._breakers.items()}
+            stats = dict(self.stats)
+        return {"stats": stats, "breakers": breakers, "latency": self.latency.snapshot()}
+
+
+provider_health = ProviderHealth(
+    percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+    default_hedge_after=float(os.getenv("LLM_HEDGE_DEFAULT_AFTER_S", "20")),
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("LLM_BREAKER_RESET_S", "30")),
+)
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "32")), thread_name_prefix="llm-hedge")
+
+
+class HedgedProvider(Provider):
+    """
+    Wraps a primary provider with a fallback on the other API.
+
+    A call that hasn't answered within the stage's observed p95 is sent to
+    the fallback as well and the first successful answer wins. Calls fail over
+    to the fallback outright when the primary returns a 5xx/429 (after its own
+    retries) or its circuit breaker is open. The fallback always uses its own
+    default model, since model names don't carry across providers.
+    """
+
+    def __init__(self, primary: Provider, fallback: Callable[[], Optional[Provider]], health: ProviderHealth = provider_health):
+        self.primary = primary
+        self._fallback = fallback
+        self.health = health
+        self.name = primary.name
+        self.chat_model = primary.chat_model
+        self.structured_model = primary.structured_model
+        self.fast_chat_model = primary.fast_chat_model
+        self.fast_structured_model = primary.fast_structured_model
+
+    def chat(self, messages, model=None, max_tokens=None, system=None, temperature=None) -> str:
+        return self._call("chat", (messages,), model, dict(max_tokens=max_tokens, system=system, temperature=temperature))
+
+    def parse(self, messages, response_model, model=None, max_tokens=None, system=None, temperature=None):
+        return self._call("parse", (messages, response_model), model, dict(max_tokens=max_tokens, system=system, temperature=temperature))
+
+    def stream(self, messages, model=None, max_tokens=None, system=None, temperature=None):
+        # Streams aren't hedged, but skip a primary whose breaker is open
+        kwargs = dict(max_tokens=max_tokens, system=system, temperature=temperature)
+        fallback = self._fallback()
+        if fallback is not None and self.health.breaker(self.primary.name).state == "open":
+            self.health.count("breaker_rejections")
+            return fallback.stream(messages, **kwargs)
+        return self.primary.stream(messages, model=model, **kwargs)
+
+    def warm_up(self):
+        self.primary.warm_up()
+
+    def _call(self, method: str, args: tuple, model: Optional[str], kwargs: Dict[str, Any]):
+        # Calls made outside the model router have no stage and share one per method
+        stage = current_stage() or method
+        self.health.count("calls")
+        fallback = self._fallback()
+        if fallback is None:
+            return self._attempt(self.primary, stage, "primary", method, args, model, kwargs)
+
+        if not self.health.breaker(self.primary.name).allow():
+            self.health.count("breaker_rejections")
+            logger.warning(f"{self.primary.name} circuit breaker is open; sending {stage} to {fallback.name}")
+            return self._attempt(fallback, stage, "failover", method, args, None, kwargs)
+
+        hedge_after = self.health.hedge_after(stage, self.primary.name)
+        primary_future = self._submit(self.primary, stage, "primary", method, args, model, kwargs)
+        done, _ = wait([primary_future], timeout=hedge_after)
+        if not done and self.health.breaker(fallback.name).allow():
+            self.health.count("hedged")
+            logger.info(f"{stage} on {self.primary.name} exceeded {hedge_after:.2f}s; hedging to {fallback.name}")
+            hedge_future = self._submit(fallback, stage, "hedge", method, args, None, kwargs)
+            pending = {primary_future, hedge_future}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge_future:
+                            self.health.count("hedge_wins")
+                        return future.result()
+            # Both failed; report the primary's error
+            return primary_future.result()
+
+        try:
+            return primary_future.result()
+        except Exception as e:
+            if not is_retryable(e) or not self.health.breaker(fallback.name).allow():
+                raise
+            self.health.count("failovers")
+            logger.warning(f"{stage} failed on {self.primary.name} ({e}); failing over to {fallback.name}")
+            return self._attempt(fallback, stage, "failover", method, args, None, kwargs)
+
+    def _submit(self, provider: Provider, stage: str, role: str, method: str, args: tuple, model: Optional[str], kwargs: Dict[str, Any]) -> Future:
+        # Each worker gets its own copy of the context so its spans join the current trace
+        context = contextvars.copy_context()
+        return _executor.submit(context.run, self._attempt, provider, stage, role, method, args, model, kwargs)
+
+    def _attempt(self, provider: Provider, stage: str, role: str, method: str, args: tuple, model: Optional[str], kwargs: Dict[str, Any]):
+        breaker = self.health.breaker(provider.name)
+        started = time.monotonic()
+        try:
+            with tracer.start_span("llm.hedge_attempt", provider=provider.name, stage=stage, role=role):
+                result = getattr(provider, method)(*args, model=model, **kwargs)
+        except Exception as e:
+            # Only outages count against the breaker; a rejected request means the API is up
+            if is_retryable(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        breaker.record_success()
+        self.health.latency.record(stage, provider.name, time.monotonic() - started)
+        return result
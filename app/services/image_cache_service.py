@@ -0,0 +1,187 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.services.tracing_service import tracer
+from app.static_files import IMAGE_CACHE_DIR, IMAGE_CACHE_URL, content_digest, static_url
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it only the PNG is kept
+    Image = None
+
+WEBP_QUALITY = 80
+# {prompt key}-{content digest}.png
+ENTRY_NAME = re.compile(r"^(?P<key>[0-9a-f]{32})-(?P<digest>[0-9a-f]{16})\.png$")
+
+
+def image_cache_key(model: str, width: int, height: int, prompt: str) -> str:
+    """Identical inference requests share a key, so their image is generated once."""
+    request = f"{model}|{width}x{height}|{prompt.strip()}"
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()[:32]
+
+
+class ImageCache:
+    """
+    Generated images on disk, keyed by prompt hash, evicted least-recently-used
+    once their total size passes max_bytes (0 disables eviction).
+
+    Each entry is the original PNG plus, when Pillow is installed, a WebP copy:
+    {key}-{digest}.png and .webp, where the digest is the PNG's content hash,
+    so the files can be served as immutable. URLs are under `url_prefix`: the
+    directory's place under the static mount, or IMAGE_CACHE_URL (which
+    main.py mounts) for a directory outside it. Entries already on disk are
+    picked up at startup in modification-time order, and hits touch the files
+    so recency survives restarts.
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = 0, url_prefix: Optional[str] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix or static_url(directory) or IMAGE_CACHE_URL
+        self._entries: "OrderedDict[str, Tuple[List[str], int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _files(self, key: str, digest: str) -> List[str]:
+        names = [f"{key}-{digest}.png", f"{key}-{digest}.webp"]
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _load(self):
+        """Index entries left by earlier runs. Caller holds the lock."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.isdir(self.directory):
+            return
+        found = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".thumb.webp"):
+                # Thumbnails written by earlier versions, which nothing served
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                continue
+            match = ENTRY_NAME.match(name)
+            if not match:
+                continue  # legacy generated_{uuid}.png files aren't cache entries
+            files = [path for path in self._files(match.group("key"), match.group("digest")) if os.path.exists(path)]
+            found.append((os.path.getmtime(files[0]), match.group("key"), files))
+        for _, key, files in sorted(found):
+            if key in self._entries:
+                self._remove(key)  # an older render of the same prompt
+            self._add(key, files)
+
+    def _add(self, key: str, files: List[str]):
+        size = sum(os.path.getsize(path) for path in files)
+        self._entries[key] = (files, size)
+        self._total_bytes += size
+
+    def _remove(self, key: str):
+        files, size = self._entries.pop(key)
+        self._total_bytes -= size
+        for path in files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _url(self, files: List[str]) -> str:
+        webp = [path for path in files if path.endswith(".webp")]
+        return f"{self.url_prefix}/{os.path.basename(webp[0] if webp else files[0])}"
+
+    def get(self, key: str) -> Optional[str]:
+        """URL of the cached image (the WebP copy when there is one), or None."""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry[0][0]):
+                if entry is not None:
+                    # Removed from disk behind our back
+                    self._total_bytes -= entry[1]
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            files = entry[0]
+        for path in files:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return self._url(files)
+
+    @tracer.traced("image.cache_put")
+    def put(self, key: str, png_bytes: bytes) -> str:
+        """Write the PNG and its WebP copy, evict if over budget, and return the URL."""
+        os.makedirs(self.directory, exist_ok=True)
+        png_path, webp_path = self._files(key, content_digest(png_bytes))
+        self._write(png_path, png_bytes)
+        files = [png_path]
+        if Image is not None:
+            try:
+                with Image.open(io.BytesIO(png_bytes)) as image:
+                    image.load()
+                    buffer = io.BytesIO()
+                    image.save(buffer, "WEBP", quality=WEBP_QUALITY, method=4)
+                    self._write(webp_path, buffer.getvalue())
+                    files.append(webp_path)
+            except Exception as e:
+                logger.warning(f"Could not create a WebP copy of {png_path}: {e}")
+
+        with self._lock:
+            self._load()
+            if key in self._entries and self._entries[key][0] != files:
+                self._remove(key)
+            elif key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._add(key, files)
+            self._evict(keep=key)
+        return self._url(files)
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        # Write then rename, so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.tmp{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self, keep: str):
+        """Drop least-recently-used entries until under budget. Caller holds the lock."""
+        if not self.max_bytes:
+            return
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._load()
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "webp": Image is not None,
+            }
+
+
+image_cache = ImageCache(
+    directory=IMAGE_CACHE_DIR,
+    max_bytes=int(float(os.getenv("IMAGE_CACHE_MAX_MB", "256")) * 1024 * 1024),
+)
@@ -1,36 +1,38 @@
 # File: /app/services/image_service.py
 
 import os
-import openai
-import requests
 import logging
 import base64
-from app.schemas import SceneScript
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Optional
+from app.schemas import ImagePromptBatch, SceneScript
+from app.services.image_cache_service import image_cache, image_cache_key
+from app.services.model_routing_service import model_router
+from app.services.rate_limit_service import RetryableError, rate_limiter
+from app.services.service_container import services
+from app.services.tracing_service import tracer
 from dotenv import load_dotenv
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 RETRODIFFUSION_API_KEY = os.getenv("RETRODIFFUSION_API_KEY")
-RETRODIFFUSION_URL = "https://api.retrodiffusion.ai/v1/inferences"
+RETRODIFFUSION_URL = os.getenv("RETRODIFFUSION_URL", "https://api.retrodiffusion.ai/v1/inferences")
+# Scenes per batched prompt request, and images generated at once
+IMAGE_PROMPT_BATCH_SIZE = int(os.getenv("IMAGE_PROMPT_BATCH_SIZE", "12"))
+IMAGE_CONCURRENCY = int(os.getenv("IMAGE_CONCURRENCY", "4"))
 
 class ImageService:
-    def __init__(self):
-        if not RETRODIFFUSION_API_KEY:
-            raise ValueError("RETRODIFFUSION_API_KEY is not set in .env")
+    """Scene illustrations. The Retro-Diffusion key is only required once an image is requested."""
 
+    @tracer.traced("image.generate_image_prompt")
     def generate_image_prompt(self, scene_script: SceneScript) -> str:
         """
         Uses OpenAI to generate a descriptive image prompt for Retro-Diffusion
         based on the scene script content.
         """
-        # Combine all scene text lines into a descriptive passage
-        scene_text = []
-        for paragraph in scene_script.paragraphs:
-            for line in paragraph.lines:
-                # Include both dialogue and narrator text
-                scene_text.append(f"{line.speaker}: {line.text}")
-        combined_text = " ".join(scene_text)
+        combined_text = self._scene_text(scene_script)
 
         prompt = f"""
         You are an AI assistant that creates image prompts for a text-to-image model.
@@ -44,69 +46,142 @@ class ImageService:
         Return only the prompt text, nothing else.
         """
 
-        completion = openai.chat.completions.create(
-            model="gpt-4-1106-preview",
-            messages=[{"role": "user", "content": prompt}],
+        return model_router.chat("image_prompt", "openai", [{"role": "user", "content": prompt}])
+
+    @staticmethod
+    def _scene_text(scene_script: SceneScript) -> str:
+        """Combine all scene text lines into a descriptive passage"""
+        scene_text = []
+        for paragraph in scene_script.paragraphs:
+            for line in paragraph.lines:
+                # Include both dialogue and narrator text
+                scene_text.append(f"{line.speaker}: {line.text}")
+        return " ".join(scene_text)
+
+    @tracer.traced("image.generate_image_prompts")
+    def generate_image_prompts(self, scene_scripts: List[SceneScript]) -> List[str]:
+        """
+        One structured request for the image prompts of several scenes, in order.
+        Any scene the model leaves out gets its own generate_image_prompt call.
+        """
+        scenes = "\n\n".join(
+            f"<scene {number}>\n{self._scene_text(scene_script)}\n</scene {number}>"
+            for number, scene_script in enumerate(scene_scripts, start=1)
         )
-        return completion.choices[0].message.content.strip()
+        prompt = f"""
+        You are an AI assistant that creates image prompts for a text-to-image model.
+        For each of the following {len(scene_scripts)} scenes from a story, generate a single, concise, vivid,
+        and visually descriptive prompt suitable for a 256x256 illustration.
+        The prompt should focus on the visual depction of the elements of the scene. Don't waste words on describing the story, just a visceral description of what you want the user to see.
+        Keep the characters and setting visually consistent from scene to scene.
 
+        {scenes}
+
+        Return exactly one prompt per scene, in the same order as the scenes.
+        """
+
+        batch = model_router.parse("image_prompts", "openai", [{"role": "user", "content": prompt}], ImagePromptBatch)
+        prompts = [prompt.strip() for prompt in batch.prompts[:len(scene_scripts)]]
+        if len(prompts) < len(scene_scripts):
+            logger.warning(f"Batched image prompts returned {len(prompts)} of {len(scene_scripts)}; prompting the rest individually")
+            prompts += [self.generate_image_prompt(scene_script) for scene_script in scene_scripts[len(prompts):]]
+        return prompts
+
+    @tracer.traced("image.create_image")
     def create_image(self, image_prompt: str) -> str:
         """
         Create an image using Retro-Diffusion API.
         Returns the path to the saved image file or empty string on error.
-        Retries up to 5 times if the API call fails or returns no images.
+        Failed calls and empty responses are retried with jittered exponential
+        backoff by the shared rate limiter. A prompt that was already rendered
+        is served from the image cache without calling the API.
         """
-        max_retries = 5
-        attempt = 0
+        if not RETRODIFFUSION_API_KEY:
+            raise ValueError("RETRODIFFUSION_API_KEY is not set in .env")
 
-        while attempt < max_retries:
-            try:
-                headers = {
-                    "X-RD-Token": RETRODIFFUSION_API_KEY,
-                }
-
-                payload = {
-                    "model": "RD_FLUX",
-                    "width": 256,
-                    "height": 256,
-                    "prompt": image_prompt,
-                    "num_images": 1
-                }
-
-                response = requests.post(RETRODIFFUSION_URL, headers=headers, json=payload)
-                if response.status_code == 200:
-                    data = response.json()
-                    base64_images = data.get("base64_images", [])
-                    if base64_images:
-                        # Success path - proceed with saving the image
-                        os.makedirs("static/images", exist_ok=True)
-                        import uuid
-                        filename = f"static/images/generated_{uuid.uuid4()}.png"
-                        image_data = base64.b64decode(base64_images[0])
-                        with open(filename, "wb") as f:
-                            f.write(image_data)
-                        return f"/{filename}"
-
-                # If we get here, either the status code wasn't 200 or no images were returned
-                attempt += 1
-                if attempt < max_retries:
-                    logger.warning(f"Retro-Diffusion API attempt {attempt} failed, retrying...")
-                    continue
-                else:
-                    logger.error(f"Retro-Diffusion API failed after {max_retries} attempts. Last response: {response.text}")
-                    return ""
+        headers = {
+            "X-RD-Token": RETRODIFFUSION_API_KEY,
+        }
+
+        payload = {
+            "model": "RD_FLUX",
+            "width": 256,
+            "height": 256,
+            "prompt": image_prompt,
+            "num_images": 1
+        }
+
+        cache_key = image_cache_key(payload["model"], payload["width"], payload["height"], image_prompt)
+        cached_url = image_cache.get(cache_key)
+        if cached_url:
+            return cached_url
+
+        def post_inference() -> bytes:
+            with tracer.start_span("image.retrodiffusion_post") as span:
+                response = services.retrodiffusion_session.post(RETRODIFFUSION_URL, headers=headers, json=payload)
+                if span:
+                    span.set_attribute("http.status_code", response.status_code)
+            if response.status_code != 200:
+                raise RetryableError(f"Retro-Diffusion API returned {response.status_code}: {response.text}", response=response)
+            base64_images = response.json().get("base64_images", [])
+            if not base64_images:
+                raise RetryableError("Retro-Diffusion API returned no images")
+            return base64.b64decode(base64_images[0])
 
-            except Exception as e:
-                attempt += 1
-                if attempt < max_retries:
-                    logger.warning(f"Error on attempt {attempt}, retrying: {str(e)}")
-                    continue
-                else:
-                    logger.error(f"Failed after {max_retries} attempts. Last error: {str(e)}")
-                    return ""
+        try:
+            image_data = rate_limiter.call("retrodiffusion", payload["model"], post_inference)
+        except Exception as e:
+            logger.error(f"Retro-Diffusion API failed after {rate_limiter.max_attempts} attempts. Last error: {str(e)}")
+            return ""
 
-        return ""
+        return image_cache.put(cache_key, image_data)
 
+    @tracer.traced("image.generate_scene_images")
+    def generate_scene_images(self, scene_scripts: List[SceneScript], concurrency: Optional[int] = None) -> List[str]:
+        """
+        Images for every scene of an article: prompts in batches of
+        IMAGE_PROMPT_BATCH_SIZE, then `concurrency` (default IMAGE_CONCURRENCY)
+        images at a time. Each batch's images start as soon as its prompts
+        return, while later batches are still being prompted. Returns one path
+        per scene, with an empty string for any scene whose image failed.
+        """
+        if not scene_scripts:
+            return []
+        batches = {
+            start: scene_scripts[start:start + IMAGE_PROMPT_BATCH_SIZE]
+            for start in range(0, len(scene_scripts), IMAGE_PROMPT_BATCH_SIZE)
+        }
+
+        def prompt_batch(batch: List[SceneScript]) -> List[str]:
+            try:
+                return self.generate_image_prompts(batch)
+            except Exception as e:
+                logger.error(f"Error generating batched image prompts: {str(e)}")
+                return [""] * len(batch)
+
+        def create(image_prompt: str) -> str:
+            if not image_prompt:
+                return ""
+            try:
+                return self.create_image(image_prompt)
+            except Exception as e:
+                logger.error(f"Error generating scene image: {str(e)}")
+                return ""
+
+        with ThreadPoolExecutor(max_workers=concurrency or IMAGE_CONCURRENCY, thread_name_prefix="images") as pool:
+            # Each task runs in a copy of the current context so its spans join the trace
+            prompt_futures = {
+                pool.submit(contextvars.copy_context().run, prompt_batch, batch): start
+                for start, batch in batches.items()
+            }
+            image_futures: List[Optional[Future]] = [None] * len(scene_scripts)
+            for future in as_completed(prompt_futures):
+                start = prompt_futures[future]
+                for offset, image_prompt in enumerate(future.result()[:len(batches[start])]):
+                    image_futures[start + offset] = pool.submit(contextvars.copy_context().run, create, image_prompt)
+            return [future.result() if future else "" for future in image_futures]
+
+    @tracer.traced("image.generate_scene_image")
     def generate_scene_image(self, scene_script: SceneScript) -> str:
         """
         High-level function to get image prompt and create image for a given scene.
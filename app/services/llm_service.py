@@ -1,38 +1,47 @@
 # Python standard library imports
+import contextvars
 import json
 import logging
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 # Third-party imports
-from anthropic import Anthropic
 from dotenv import load_dotenv
-import openai
-import instructor
 
 # Local imports
-from app.services.image_service import ImageService
-from app.services.audio_service import AudioService
+from app.services.deadline_service import Deadline
+from app.services.model_routing_service import model_router
+from app.services.scene_index_service import SceneRef, index_scenes, outline_of, select_scenes
+from app.services.script_parser_service import parse_scene_script
+from app.services.service_container import services
+from app.services.tracing_service import tracer
 from app.constants.forbidden_words import FORBIDDEN_WORDS
 from app.constants.writing_styles import AVAILABLE_STYLES
-from app.database import ArticleDB
 from app.schemas import (
     ArticleLength,
     ArticleStructure,
+    Degradation,
+    DraftFormat,
+    GenerationStats,
+    ImageMode,
     LongArticleStructure,
     MediumArticleStructure,
     ShortArticleStructure,
     Paragraph,
+    PlanReconciliation,
+    RevisedLongArticlePlan,
+    RevisedMediumArticlePlan,
+    RevisedShortArticlePlan,
     SceneScript,
     SceneLine, 
-    Scene
+    Scene,
+    StyleMode
 )
 
-# Initialize the database
-db = ArticleDB()
-
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,33 +55,43 @@ logger.info(f"Looking for .env file at: {env_path}")
 # Load environment variables
 load_dotenv(env_path)
 
-# Set the API key directly
-api_key = os.getenv("OPENAI_API_KEY")
-
-# Set the API key directly on the openai module
-openai.api_key = api_key
-
 # After the existing logging setup
 if os.getenv('DEBUG', 'false').lower() == 'true':
     logger.setLevel(logging.DEBUG)
 
-
-anthropic_client = Anthropic(
-    api_key=os.getenv("ANTHROPIC_API_KEY")
-)
-
-# Add Anthropic client initialization after OpenAI client
-anthropic_instructor_client = instructor.from_anthropic(Anthropic(
-    api_key=os.getenv("ANTHROPIC_API_KEY")
-))
-
 # Add provider type
 ProviderType = Literal["openai", "anthropic"]
 
-audio_service = AudioService()
+# Scene scripts parsed locally with at least this confidence skip the LLM extraction call
+LOCAL_SCRIPT_MIN_CONFIDENCE = float(os.getenv("LOCAL_SCRIPT_MIN_CONFIDENCE", "0.75"))
+
+# Sections critiqued at once in map-reduce critique mode
+CRITIQUE_CONCURRENCY = int(os.getenv("CRITIQUE_CONCURRENCY", "4"))
+
+# Sorted, so prompts are the same in every process whatever the string hash seed
+FORBIDDEN_WORDS_TEXT = ", ".join(sorted(FORBIDDEN_WORDS))
 
-image_service = ImageService()
 
+# Example of the speaker-tagged scene script format, shared by extraction and structured drafting
+SCENE_SCRIPT_EXAMPLE = '''{
+        "scene_title": "Scene 1",    
+        "paragraphs": [
+            {
+                "lines": [
+                    {"speaker": "John", "text": "Hello, how are you?"},
+                    {"speaker": "Narrator", "text": "said John."},
+                    {"speaker": "Jane", "text": "I'm fine, thank you."},
+                    {"speaker": "Narrator", "text": "said Jane."},
+                    {"speaker": "Narrator", "text": "They continued to talk as they walked down the street."},
+                    {"speaker": "Narrator", "text": "John turned to Jane and said,"},
+                    {"speaker": "John", "text": "I love you."},
+                    {"speaker": "Narrator", "text": "Jane blushed and said,"},
+                    {"speaker": "Jane", "text": "I love you too."},
+                    {"speaker": "Narrator", "text": "They shared a kiss and continued to walk."}
+                ]
+            }
+        ]
+    }'''
 
 def check_forbidden_words(text: str) -> Tuple[bool, List[str]]:
     """
@@ -112,21 +131,7 @@ def log_api_error(function_name: str, error: Exception, **extra_info):
     }
     logger.error(f"API Error Details: {error_details}", exc_info=True)
 
-def test_api_connection():
-    """Test the OpenAI API connection"""
-    try:
-        completion = openai.chat.completions.create(
-            model="gpt-4o-2024-11-20",
-            messages=[
-                {"role": "user", "content": "Say hello"}
-            ]
-        )
-        logger.info("API connection test successful")
-        return True
-    except Exception as e:
-        log_api_error('test_api_connection', e, model="gpt-4o-2024-11-20")
-        return False
-
+@tracer.traced()
 def generate_article_plan(
     topic: str, 
     style_name: str = "new_yorker", 
@@ -139,10 +144,6 @@ def generate_article_plan(
         if isinstance(length, str):
             length = ArticleLength(length.lower())
             
-        # Test API connection first
-        if not test_api_connection():
-            raise Exception("Failed to connect to OpenAI API")
-            
         # Get style details
         style = AVAILABLE_STYLES.get(style_name.lower(), AVAILABLE_STYLES["new_yorker"])
         
@@ -232,26 +233,10 @@ Allow space for in-depth exploration of ideas or intricate storytelling elements
         Make sure to bias each scene to contain a lot of character actions or dialogue. We don't want the story to drag. 
         """
 
-        if provider == "anthropic":
-            completion = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-latest",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=8000
-            )
-            output_text = completion.content[0].text.strip()
-        else:
-            completion = openai.chat.completions.create(
-                model="gpt-4o-2024-11-20",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            output_text = completion.choices[0].message.content.strip()
+        output_text = model_router.chat("plan", provider, [{"role": "user", "content": prompt}])
 
         # Log the input prompt and output text
-        db.save_llm_call_log(
+        services.db.save_llm_call_log(
             prompt, 
             output_text
         )
@@ -266,90 +251,75 @@ Allow space for in-depth exploration of ideas or intricate storytelling elements
                      provider=provider)
         raise Exception(f"Failed to generate article plan: {str(e)}")
 
-def structure_article_plan(plan: str, length: ArticleLength = ArticleLength.LONG, provider: ProviderType = "openai") -> ArticleStructure:
-    """Convert the narrative plan into a structured article outline"""
-    try:
-        logger.info(f"Converting narrative plan to structured outline with length: {length}")
-        
-        # Adjust the system prompt based on length
-        length_instructions = {
-            ArticleLength.SHORT: """Create a simple article or short story structure with just paragraphs - no headings or sections.""",
-            ArticleLength.MEDIUM: """Create an article or short story structure with up to 3 main headings. Do not include subheadings.""",
-            ArticleLength.LONG: """Create a full article or short story structure with main headings, subheadings, and sub-subheadings."""
-        }
-        
-        # Select the appropriate response format based on length
-        response_format = {
-            ArticleLength.SHORT: ShortArticleStructure,
-            ArticleLength.MEDIUM: MediumArticleStructure,
-            ArticleLength.LONG: LongArticleStructure
-        }[length]
-        
-        # Add length guidance to the system prompt
-        system_prompt = f"""You are an expert at structuring articles or short stories. 
-        
-        {length_instructions[length]}
-
-        Convert the given unstructured narrative plan into a structured outline of the given length. 
-
-        You aren't writing content at this stage, you are giving the outline of what each scene or section and paragraph will be about.
-        
-        For a short article or short story:
-        - Just paragraphs, no headings
-
-        For a medium article or short story:
-        - Include 2-3 main headings
-        - No subheadings
-        
-        For a long article or short story:
-        - Include 3-5 main headings
-        - Each main heading can have 2-3 subheadings
-        - Each subheading can have 1-2 sub-subheadings
-        
-        The paragraph description should each represent a specific scene in the story and capture as much detail as possible about what the scene or section is about.
+STRUCTURE_RESPONSE_MODELS = {
+    ArticleLength.SHORT: ShortArticleStructure,
+    ArticleLength.MEDIUM: MediumArticleStructure,
+    ArticleLength.LONG: LongArticleStructure
+}
+
+REVISED_PLAN_RESPONSE_MODELS = {
+    ArticleLength.SHORT: RevisedShortArticlePlan,
+    ArticleLength.MEDIUM: RevisedMediumArticlePlan,
+    ArticleLength.LONG: RevisedLongArticlePlan
+}
+
+def build_structure_system_prompt(length: ArticleLength) -> str:
+    """Instructions for turning a narrative plan into an outline of the given length."""
+    # Adjust the system prompt based on length
+    length_instructions = {
+        ArticleLength.SHORT: """Create a simple article or short story structure with just paragraphs - no headings or sections.""",
+        ArticleLength.MEDIUM: """Create an article or short story structure with up to 3 main headings. Do not include subheadings.""",
+        ArticleLength.LONG: """Create a full article or short story structure with main headings, subheadings, and sub-subheadings."""
+    }
+    
+    # Add length guidance to the system prompt
+    return f"""You are an expert at structuring articles or short stories. 
+    
+    {length_instructions[length]}
 
-        The 'must include' information should include any specific details or quotes or suggested lines that appear in the narrative plan for a given scene or section, and also details like the characters actions and motivations.
+    Convert the given unstructured narrative plan into a structured outline of the given length. 
 
-        The paragraphs must cover the entire scope of the article or the plot of the story and include every scene described in the unstructured narrative plan. 
-        
-        """
-        
-        # Create the full prompt by combining system prompt and user content
-        full_prompt = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": plan}
-        ]
+    You aren't writing content at this stage, you are giving the outline of what each scene or section and paragraph will be about.
+    
+    For a short article or short story:
+    - Just paragraphs, no headings
 
-        if provider == "anthropic":
-            completion = anthropic_instructor_client.messages.create(
-                model="claude-3-5-sonnet-latest",
-                system=system_prompt,
-                messages=[{"role": "user", "content": plan}],
-                max_tokens=8000, 
-                response_model=response_format
-            )
+    For a medium article or short story:
+    - Include 2-3 main headings
+    - No subheadings
+    
+    For a long article or short story:
+    - Include 3-5 main headings
+    - Each main heading can have 2-3 subheadings
+    - Each subheading can have 1-2 sub-subheadings
+    
+    The paragraph description should each represent a specific scene in the story and capture as much detail as possible about what the scene or section is about.
 
-            # The completion is already the parsed model
-            structured_content = completion
+    The 'must include' information should include any specific details or quotes or suggested lines that appear in the narrative plan for a given scene or section, and also details like the characters actions and motivations.
 
-        else:
-            completion = openai.beta.chat.completions.parse(
-                model="gpt-4o",
-                messages=full_prompt,
-                response_format=response_format
-            )
+    The paragraphs must cover the entire scope of the article or the plot of the story and include every scene described in the unstructured narrative plan. 
+    
+    """
 
-            # Handle potential refusal
-            if completion.choices[0].message.refusal:
-                refusal_msg = completion.choices[0].message.refusal
-                logger.warning(f"Model refused to structure plan: {refusal_msg}")
-                raise Exception(f"Model refused to structure the article plan: {refusal_msg}")
-            
-            # Get the parsed response
-            structured_content = completion.choices[0].message.parsed
+@tracer.traced()
+def structure_article_plan(plan: str, length: ArticleLength = ArticleLength.LONG, provider: ProviderType = "openai") -> ArticleStructure:
+    """Convert the narrative plan into a structured article outline"""
+    try:
+        logger.info(f"Converting narrative plan to structured outline with length: {length}")
+        
+        response_format = STRUCTURE_RESPONSE_MODELS[length]
+        system_prompt = build_structure_system_prompt(length)
+
+        structured_content = model_router.parse(
+            "outline",
+            provider,
+            [{"role": "user", "content": plan}],
+            response_format,
+            system=system_prompt
+        )
 
         # Log the output - convert structured_content to dict before saving
-        db.save_llm_call_log(
+        services.db.save_llm_call_log(
             system_prompt + "\n\n" + plan, 
             structured_content.model_dump()  # Convert to dict before saving
         )
@@ -368,42 +338,14 @@ def structure_article_plan(plan: str, length: ArticleLength = ArticleLength.LONG
         log_api_error('structure_article_plan', e, 
                      plan_length=len(plan), 
                      article_length=length,
-                     model="gpt-4o")
+                     provider=provider)
         raise Exception(f"Failed to structure article plan: {str(e)}")
 
-def critique_and_elaborate_article_plan(
-    topic: str,
-    original_plan: str,
-    structured_plan: ArticleStructure,
-    style_name: str = "new_yorker",
-    length: ArticleLength = ArticleLength.LONG,
-    provider: ProviderType = "openai"
-) -> str:
-    """Critique and elaborate on the article plan to make it better."""
-    try:
-        logger.info(f"Critiquing and elaborating on the article plan.")
-
-        style = AVAILABLE_STYLES.get(style_name.lower(), AVAILABLE_STYLES["new_yorker"])
-
-        # Convert the structured plan to text to provide to the LLM
-        structured_plan_text = json.dumps(structured_plan.model_dump(), indent=2)
-
-        prompt = f"""
-        As an expert editor and planner, please critique and elaborate on the following article or short story plan to improve its structure, coherence, and depth. Provide suggestions to make the article or short story more compelling and comprehensive.
-
-        Original Topic: {topic}
-
-        Original Narrative Plan:
-        {original_plan}
-
-        Structured Plan:
-        {structured_plan_text}
-
-        Instructions:
-        - Identify any weaknesses or gaps in the plan.
-        - Suggest improvements or additions to enhance the article or short story.
-        - Provide a complete revised narrative plan that incorporates these improvements.
+def critique_guidelines(style_name: str = "new_yorker") -> str:
+    """What the editor should hold a plan to, shared by every critique prompt."""
+    style = AVAILABLE_STYLES.get(style_name.lower(), AVAILABLE_STYLES["new_yorker"])
 
+    return f"""
         A world class short story should feature the following:
 
         - Strong Theme
@@ -451,28 +393,51 @@ def critique_and_elaborate_article_plan(
         Make sure in every scene you have completely anazlyed the characters and their motivations and specifically plan why they are taking specific actions. Think long term about the whole story when planning.
 
         Make sure to bias each scene to contain a lot of character actions or dialogue. We don't want the story to drag. 
+        """
+
+def build_critique_prompt(topic: str, original_plan: str, structured_plan: ArticleStructure, style_name: str = "new_yorker") -> str:
+    """The editor's brief for critiquing a plan and its outline, without the answer format."""
+    # Convert the structured plan to text to provide to the LLM
+    structured_plan_text = json.dumps(structured_plan.model_dump(), indent=2)
+
+    return f"""
+        As an expert editor and planner, please critique and elaborate on the following article or short story plan to improve its structure, coherence, and depth. Provide suggestions to make the article or short story more compelling and comprehensive.
+
+        Original Topic: {topic}
+
+        Original Narrative Plan:
+        {original_plan}
+
+        Structured Plan:
+        {structured_plan_text}
+
+        Instructions:
+        - Identify any weaknesses or gaps in the plan.
+        - Suggest improvements or additions to enhance the article or short story.
+        - Provide a complete revised narrative plan that incorporates these improvements.
+        """ + critique_guidelines(style_name)
+
+@tracer.traced()
+def critique_and_elaborate_article_plan(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    style_name: str = "new_yorker",
+    length: ArticleLength = ArticleLength.LONG,
+    provider: ProviderType = "openai"
+) -> str:
+    """Critique and elaborate on the article plan to make it better."""
+    try:
+        logger.info(f"Critiquing and elaborating on the article plan.")
 
+        prompt = build_critique_prompt(topic, original_plan, structured_plan, style_name) + """
         Please return only the revised narrative plan.
         """
 
-        if provider == "anthropic":
-            completion = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-latest",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=8000
-            )
-            revised_plan = completion.content[0].text.strip()
-        else:
-            completion = openai.chat.completions.create(
-                model="gpt-4o-2024-11-20",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            revised_plan = completion.choices[0].message.content.strip()
+        revised_plan = model_router.chat("critique", provider, [{"role": "user", "content": prompt}])
 
         # Log the output - convert messages to list before saving
-        db.save_llm_call_log(
+        services.db.save_llm_call_log(
             prompt,
             revised_plan
         )
@@ -483,18 +448,214 @@ def critique_and_elaborate_article_plan(
     except Exception as e:
         log_api_error('critique_and_elaborate_article_plan', e)
         raise Exception(f"Failed to critique and elaborate article plan: {str(e)}")
+
+def format_outline_headings(structured_plan: ArticleStructure) -> str:
+    """The outline's headings alone, numbered, as every section critique's map of the whole article."""
+    content = structured_plan.content
+    lines = [content.title, f"Introduction ({len(content.intro_paragraphs)} scenes)"]
+    for i, heading in enumerate(content.main_headings, 1):
+        lines.append(f"{i}. {heading.title}")
+        for j, sub_heading in enumerate(heading.sub_headings, 1):
+            lines.append(f"   {i}.{j}. {sub_heading.title}")
+            for k, sub_sub_heading in enumerate(sub_heading.sub_headings, 1):
+                lines.append(f"      {i}.{j}.{k}. {sub_sub_heading.title}")
+    lines.append(f"Conclusion ({len(content.conclusion_paragraphs)} scenes)")
+    return "\n".join(lines)
+
+def build_section_critique_prompt(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    heading_index: int,
+    style_name: str = "new_yorker"
+) -> str:
+    """The editor's brief for one main heading of the outline, with the whole plan as context."""
+    main_headings = structured_plan.content.main_headings
+    heading = main_headings[heading_index]
+    section_text = json.dumps(heading.model_dump(), indent=2)
+
+    return f"""
+        As an expert editor and planner, please critique and elaborate on one section of the following article or short story plan to improve its structure, coherence, and depth. The other sections are being revised by other editors at the same time, so keep this one consistent with the overall plan and the sections around it.
+
+        Original Topic: {topic}
+
+        Original Narrative Plan:
+        {original_plan}
+
+        Outline of the Whole Article:
+        {format_outline_headings(structured_plan)}
+
+        Section to Revise ({heading_index + 1} of {len(main_headings)}, "{heading.title}"):
+        {section_text}
+
+        Instructions:
+        - Identify any weaknesses or gaps in this section.
+        - Suggest improvements or additions to enhance it.
+        - Provide a complete revised narrative plan for this section only, scene by scene. Do not plan the other sections.
+        """ + critique_guidelines(style_name) + """
+        Please return only the revised narrative plan for this section.
+        """
+
+@tracer.traced()
+def critique_article_plan_by_section(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    style_name: str = "new_yorker",
+    length: ArticleLength = ArticleLength.LONG,
+    provider: ProviderType = "openai",
+    concurrency: Optional[int] = None
+) -> str:
+    """
+    Map-reduce critique: each main heading's subtree is critiqued in parallel,
+    `concurrency` at a time, with the narrative plan and the outline's headings
+    as shared context. One short structured call then reconciles continuity
+    between the sections and revises the introduction and conclusion. Returns
+    the revised narrative plan assembled from those parts, as
+    critique_and_elaborate_article_plan does. Outlines without headings are
+    critiqued whole.
+    """
+    main_headings = getattr(structured_plan.content, "main_headings", [])
+    if len(main_headings) < 2:
+        return critique_and_elaborate_article_plan(topic, original_plan, structured_plan, style_name, length, provider)
+
+    try:
+        logger.info(f"Critiquing the article plan in {len(main_headings)} sections.")
+
+        def critique_section(heading_index: int) -> str:
+            with tracer.start_span("critique_section", heading=heading_index):
+                prompt = build_section_critique_prompt(topic, original_plan, structured_plan, heading_index, style_name)
+                section_plan = model_router.chat("critique_section", provider, [{"role": "user", "content": prompt}])
+                services.db.save_llm_call_log(prompt, section_plan)
+                return section_plan
+
+        with ThreadPoolExecutor(max_workers=concurrency or CRITIQUE_CONCURRENCY, thread_name_prefix="critique") as pool:
+            # Each section runs in a copy of the current context so its spans join the trace
+            futures = [pool.submit(contextvars.copy_context().run, critique_section, i) for i in range(len(main_headings))]
+            section_plans = [future.result() for future in futures]
+
+        content = structured_plan.content
+        revised_sections = "\n\n".join(
+            f'Section {i + 1}, "{heading.title}":\n{section_plan}'
+            for i, (heading, section_plan) in enumerate(zip(main_headings, section_plans))
+        )
+        prompt = f"""
+        As an expert editor, you are reconciling an article or short story plan whose sections were revised separately by different editors.
+
+        Original Topic: {topic}
+
+        Original Narrative Plan:
+        {original_plan}
+
+        Introduction Scenes:
+        {json.dumps([scene.model_dump() for scene in content.intro_paragraphs], indent=2)}
+
+        Revised Sections:
+        {revised_sections}
+
+        Conclusion Scenes:
+        {json.dumps([scene.model_dump() for scene in content.conclusion_paragraphs], indent=2)}
+
+        Instructions:
+        - As `opening`, give the revised plan for the introduction, setting up what the revised sections pay off.
+        - As `section_notes`, give one short note per section, in order, naming what must change in it to stay continuous with the others: characters, timeline, foreshadowing, the build to the climax. Write "None" for a section that needs no change.
+        - As `closing`, give the revised plan for the conclusion, landing the climax the sections build to.
+        - Keep it short. Do not rewrite the sections themselves.
+        """
+
+        reconciliation = model_router.parse(
+            "critique_reduce",
+            provider,
+            [{"role": "user", "content": prompt}],
+            PlanReconciliation
+        )
+        services.db.save_llm_call_log(prompt, reconciliation.model_dump())
+
+        parts = [f"Introduction:\n{reconciliation.opening}"]
+        for i, (heading, section_plan) in enumerate(zip(main_headings, section_plans)):
+            part = f"{heading.title}:\n{section_plan}"
+            note = reconciliation.section_notes[i].strip() if i < len(reconciliation.section_notes) else ""
+            if note and note.rstrip(".").lower() != "none":
+                part += f"\n\nContinuity: {note}"
+            parts.append(part)
+        parts.append(f"Conclusion:\n{reconciliation.closing}")
+
+        logger.info("Successfully critiqued and reconciled the article plan.")
+        return "\n\n".join(parts)
+
+    except Exception as e:
+        log_api_error('critique_article_plan_by_section', e,
+                      topic=topic,
+                      article_length=length,
+                      provider=provider)
+        raise Exception(f"Failed to critique article plan by section: {str(e)}")
+
+@tracer.traced()
+def critique_and_restructure_article_plan(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    style_name: str = "new_yorker",
+    length: ArticleLength = ArticleLength.LONG,
+    provider: ProviderType = "openai"
+) -> Tuple[str, ArticleStructure]:
+    """
+    Critique the plan and return the revised narrative plan together with its
+    outline from one structured call, instead of critiquing to free text and
+    structuring that with a second call. If the fused call fails (e.g. the
+    model can't fit both into the schema), falls back to those two calls.
+    """
+    logger.info(f"Critiquing the article plan and restructuring it with length: {length}")
+
+    prompt = build_critique_prompt(topic, original_plan, structured_plan, style_name) + """
+        Return the complete revised narrative plan as `revised_plan`, and as `outline` the revised plan structured according to the system instructions.
+        """
+    system_prompt = build_structure_system_prompt(length)
+
+    try:
+        revision = model_router.parse(
+            "critique_restructure",
+            provider,
+            [{"role": "user", "content": prompt}],
+            REVISED_PLAN_RESPONSE_MODELS[length],
+            system=system_prompt
+        )
+    except Exception as e:
+        log_api_error('critique_and_restructure_article_plan', e,
+                      topic=topic,
+                      article_length=length,
+                      provider=provider)
+        logger.warning("Fused critique failed; falling back to critique, then restructure")
+        span = tracer.current_span()
+        if span:
+            span.set_attribute("fused_fallback", True)
+        revised_plan = critique_and_elaborate_article_plan(topic, original_plan, structured_plan, style_name, length, provider)
+        return revised_plan, structure_article_plan(revised_plan, length, provider)
+
+    services.db.save_llm_call_log(
+        system_prompt + "\n\n" + prompt,
+        revision.model_dump()
+    )
+
+    logger.info("Successfully critiqued and restructured the article plan.")
+    return revision.revised_plan, ArticleStructure(length=length, content=revision.outline)
     
+@tracer.traced()
 def apply_style_transfer(
     content: str,
     scene_description: str,
     must_include: str,
     style_name: str = "new_yorker",
-    provider: ProviderType = "openai"
+    provider: ProviderType = "openai",
+    max_retries: int = 3
 ) -> str:
-    """Apply style transfer to the generated content, incorporating scene_description and must_include."""
+    """
+    Apply style transfer to the generated content, incorporating scene_description
+    and must_include. Makes up to `max_retries` calls in all, retrying while
+    forbidden words remain.
+    """
     try:
         style = AVAILABLE_STYLES.get(style_name.lower(), AVAILABLE_STYLES["new_yorker"])
-        max_retries = 3
         current_try = 0
         all_forbidden_words = set()
         styled_content = content
@@ -517,7 +678,7 @@ Important Rules:
 4. Do not add or remove any significant information
 5. Preserve any technical accuracy in the original
 
-You may not use any of the following words or phrases: {', '.join(FORBIDDEN_WORDS)}
+You may not use any of the following words or phrases: {FORBIDDEN_WORDS_TEXT}
 
 The rewritten content must:
 
@@ -535,7 +696,7 @@ Rewrite the content in the specified style while keeping all information intact.
 maintaining the same narrative flow and key information but eliminating
 these forbidden words or phrases: {', '.join(all_forbidden_words)}.
 
-You also may not use any of the following words or phrases: {', '.join(FORBIDDEN_WORDS)} in the rewritten content.
+You also may not use any of the following words or phrases: {FORBIDDEN_WORDS_TEXT} in the rewritten content.
 
 The rewritten content must:
 
@@ -551,26 +712,15 @@ Previous version:
 Do not return any content other than the rewritten content. Do not include introductory text like 'Here is the rewritten content:, just return the rewritten text by itself."""
 
                 # Call the LLM API
-                if provider == "anthropic":
-                    completion = anthropic_client.messages.create(
-                        model="claude-3-5-sonnet-latest",
-                        messages=[
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=50
+                with tracer.start_span("style_transfer_attempt", attempt=current_try, provider=provider):
+                    styled_content = model_router.chat(
+                        "style_transfer" if current_try == 0 else "style_repair",
+                        provider,
+                        [{"role": "user", "content": prompt}]
                     )
-                    styled_content = completion.content[0].text.strip()
-
-                else:
-                    completion = openai.chat.completions.create(
-                        model="gpt-4o-2024-11-20",
-                        messages=[{"role": "user", "content": prompt}],
-                        max_tokens=50
-                    )
-                    styled_content = completion.choices[0].message.content.strip()
 
                 # Log the output
-                db.save_llm_call_log(prompt, styled_content)
+                services.db.save_llm_call_log(prompt, styled_content)
 
                 # Check for forbidden words
                 has_forbidden, found_words = check_forbidden_words(styled_content)
@@ -606,69 +756,29 @@ Do not return any content other than the rewritten content. Do not include intro
         logger.warning("Style transfer failed, returning original content")
         return content
 
-def get_section_description(plan: ArticleStructure, path: List[str]) -> str:
-    """Get a description of the section we want to write based on the path"""
-    if path[0] == "intro":
-        return "Write the introduction or exposition paragraphs for the article or short story."
-    elif path[0] == "conclusion":
-        return "Write the conclusion or resolution paragraphs for the article or short story."
-    elif path[0] == "main":
-        # Handle different article structures
-        if isinstance(plan.content, ShortArticleStructure):
-            return "Write the main content paragraphs for the short story. Make sure to cover each paragraph listed in the structured plan in order along with the necessary 'must include' information, while keeping in mind the overall plan for the article or story."
-            
-        # Navigate to the correct heading/subheading for medium and long articles
-        heading_idx = int(path[1])
-        heading = plan.content.main_headings[heading_idx]
-        
-        if len(path) == 2:
-            return f"Write the content for the main heading: {heading.title}. Make sure to cover each paragraph listed in the structured plan in order, along with the necessary 'must include' information, while keeping in mind the overall plan for the article or story."
-        
-        if path[2] == "sub":
-            # Only process subheadings for LongArticleStructure
-            if not isinstance(plan.content, LongArticleStructure):
-                raise ValueError("Subheadings are only available in long articles")
-                
-            sub_idx = int(path[3])
-            subheading = heading.sub_headings[sub_idx]
-            
-            if len(path) == 4:
-                return f"Write the content for the subheading: {subheading.title}. Make sure to cover each paragraph listed in the structured plan in order, along with the necessary 'must include' information, while keeping in mind the overall plan for the article or story."
-            
-            if path[4] == "subsub":
-                subsub_idx = int(path[5])
-                subsubheading = subheading.sub_headings[subsub_idx]
-                return f"Write the content for the sub-subheading: {subsubheading.title}. Make sure to cover each paragraph listed in the structured plan in order, along with the necessary 'must include' information, while keeping in mind the overall plan for the article or story."
-    
-    raise ValueError(f"Invalid section path: {path}")
-
-def extract_scene_script(scene_input: str, provider: ProviderType = "openai") -> SceneScript:
-    """Extract the scene script from the content"""
-    
-    # Define example format separately
-    example_format = '''{
-        "scene_title": "Scene 1",    
-        "paragraphs": [
-            {
-                "lines": [
-                    {"speaker": "John", "text": "Hello, how are you?"},
-                    {"speaker": "Narrator", "text": "said John."},
-                    {"speaker": "Jane", "text": "I'm fine, thank you."},
-                    {"speaker": "Narrator", "text": "said Jane."},
-                    {"speaker": "Narrator", "text": "They continued to talk as they walked down the street."},
-                    {"speaker": "Narrator", "text": "John turned to Jane and said,"},
-                    {"speaker": "John", "text": "I love you."},
-                    {"speaker": "Narrator", "text": "Jane blushed and said,"},
-                    {"speaker": "Jane", "text": "I love you too."},
-                    {"speaker": "Narrator", "text": "They shared a kiss and continued to walk."}
-                ]
-            }
-        ]
-    }'''
+@tracer.traced()
+def extract_scene_script(
+    scene_input: str,
+    provider: ProviderType = "openai",
+    stats: Optional[GenerationStats] = None
+) -> SceneScript:
+    """
+    Extract the scene script from the content. The rule-based local parser is
+    tried first; the LLM is only called when its confidence is too low.
+    """
+    local = parse_scene_script(scene_input)
+    span = tracer.current_span()
+    if span:
+        span.set_attribute("local_parse_confidence", local.confidence)
+    if local.confidence >= LOCAL_SCRIPT_MIN_CONFIDENCE:
+        if stats is not None:
+            stats.script_extractions_avoided += 1
+        return local.script
+    logger.info(f"Local scene script confidence {local.confidence} is below {LOCAL_SCRIPT_MIN_CONFIDENCE}; extracting with {provider}")
 
     prompt = f"""Take the following written content and extract it as a scene script as a list of paragraphs containing conversation turns and narrator commentary. Follow the following format: 
     
-    {example_format}
+    {SCENE_SCRIPT_EXAMPLE}
 
     Scene content input: 
 
@@ -686,35 +796,15 @@ def extract_scene_script(scene_input: str, provider: ProviderType = "openai") ->
     In other words, you have to capture when the narrator explains who's speaking. Make sure to end regular speaking sentences with a comma so the Narrator can finish the sentence, unless the speaker is asking a question or exclaiming.We are going to concatenate these conversation turns together later, but they won't have the speaker labels, so we need the Narrator's portion to capture who's speaking. 
     """
 
-    if provider == "anthropic":
-        completion = anthropic_instructor_client.messages.create(
-            model="claude-3-5-sonnet-latest",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=8000, 
-            response_model=SceneScript
-        )
-
-        # The completion is already the parsed model
-        scene_script = completion
-
-    else:
-        completion = openai.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format=SceneScript
-        )
-
-        # Handle potential refusal
-        if completion.choices[0].message.refusal:
-            refusal_msg = completion.choices[0].message.refusal
-            logger.warning(f"Model refused to structure plan: {refusal_msg}")
-            raise Exception(f"Model refused to structure the article plan: {refusal_msg}")
-        
-        # Get the parsed response
-        scene_script = completion.choices[0].message.parsed
+    scene_script = model_router.parse(
+        "script_extraction",
+        provider,
+        [{"role": "user", "content": prompt}],
+        SceneScript
+    )
 
     # Log the output - convert structured_content to dict before saving
-    db.save_llm_call_log(
+    services.db.save_llm_call_log(
         prompt, 
         scene_script.model_dump()  # Convert to dict before saving
     )
@@ -723,30 +813,33 @@ def extract_scene_script(scene_input: str, provider: ProviderType = "openai") ->
 
     return scene_script
 
-def write_paragraph(
+def build_scene_prompt(
     topic: str,
     original_plan: str,
     structured_plan: ArticleStructure,
     written_content: Union[ArticleStructure, ShortArticleStructure, MediumArticleStructure, LongArticleStructure],
     scene: Scene,
     style: str = "new_yorker",
-    provider: ProviderType = "openai"
+    brief: bool = False
 ) -> str:
-    """Write a specific scene of the article or short story."""
-    try:
-        # Format the content that's been written so far
-        formatted_content = format_written_content(written_content)
+    """
+    The drafting prompt for one scene: the style guide plus the plan and
+    everything written so far. A brief scene is asked for in a few short
+    paragraphs.
+    """
+    # Format the content that's been written so far
+    formatted_content = format_written_content(written_content)
 
-        # Get the scene description and must_include information
-        scene_description = scene.scene_description
-        must_include = scene.must_include
+    # Get the scene description and must_include information
+    scene_description = scene.scene_description
+    must_include = scene.must_include
 
-        logger.info(f"Writing scene: {scene_description}")
+    # Get the selected style details
+    style_details = AVAILABLE_STYLES.get(style.lower(), AVAILABLE_STYLES["new_yorker"])
 
-        # Get the selected style details
-        style_details = AVAILABLE_STYLES.get(style.lower(), AVAILABLE_STYLES["new_yorker"])
+    length_rule = "- Is brief: two or three short paragraphs at most\n" if brief else ""
 
-        prompt = f"""
+    return f"""
 <style guide>
 
 You are an expert author writing in the style of {style_details.name}.
@@ -756,7 +849,7 @@ Style Description: {style_details.description}
 Example of the style:
 {style_details.example}
 
-You may not use any of the following words or phrases: {', '.join(FORBIDDEN_WORDS)}
+You may not use any of the following words or phrases: {FORBIDDEN_WORDS_TEXT}
 
 Write in clear, distinct paragraphs.
 
@@ -790,7 +883,7 @@ Please write the next section that:
 
 - Follows this description: {scene_description}
 - Must include: {must_include}
-
+{length_rule}
 Make sure the next section flows naturally from the previous content.
 
 Make sure to bias each scene to contain a lot of character actions or dialogue. We don't want the story to drag. 
@@ -800,36 +893,74 @@ Do not return any text other than the next section of the article or short story
 </instructions>
 """
 
-        if provider == "anthropic":
-            completion = anthropic_client.messages.create(
-                model="claude-3-5-sonnet-latest",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=50
-            )
-            generated_content = completion.content[0].text.strip()
-        else:
-            completion = openai.chat.completions.create(
-                model="gpt-4o-2024-11-20",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=50
-            )
-            generated_content = completion.choices[0].message.content.strip()
+@tracer.traced()
+def write_paragraph(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    written_content: Union[ArticleStructure, ShortArticleStructure, MediumArticleStructure, LongArticleStructure],
+    scene: Scene,
+    style: str = "new_yorker",
+    provider: ProviderType = "openai",
+    style_mode: StyleMode = StyleMode.TWO_PASS,
+    stats: Optional[GenerationStats] = None,
+    style_attempts: int = 3,
+    brief: bool = False
+) -> str:
+    """
+    Write a specific scene of the article or short story.
+
+    In single-pass mode the in-style draft is kept as long as it passes
+    check_forbidden_words; apply_style_transfer only runs when it doesn't.
+    """
+    try:
+        # Get the scene description and must_include information
+        scene_description = scene.scene_description
+        must_include = scene.must_include
+
+        logger.info(f"Writing scene: {scene_description}")
+
+        span = tracer.current_span()
+        if span:
+            span.set_attribute("scene_description", scene_description[:200])
+
+        prompt = build_scene_prompt(topic, original_plan, structured_plan, written_content, scene, style, brief)
+
+        generated_content = model_router.chat(
+            "scene_draft",
+            provider,
+            [{"role": "user", "content": prompt}]
+        )
 
         # Log the output
-        db.save_llm_call_log(
+        services.db.save_llm_call_log(
             prompt,
             generated_content
         )
 
+        if stats is not None:
+            stats.scenes_written += 1
+
+        if style_mode == StyleMode.SINGLE_PASS:
+            has_forbidden, found_words = check_forbidden_words(generated_content)
+            if span:
+                span.set_attribute("style_transfer_skipped", not has_forbidden)
+            if not has_forbidden:
+                if stats is not None:
+                    stats.style_transfer_calls_avoided += 1
+                return generated_content
+            logger.info(f"Draft contains forbidden words {found_words}; falling back to style transfer")
+            if stats is not None:
+                stats.style_transfer_fallbacks += 1
+
         # Apply style transfer (which handles forbidden words)
         styled_content = apply_style_transfer(
             content=generated_content,
             scene_description=scene_description,
             must_include=must_include,
             style_name=style,
-            provider=provider
+            provider=provider,
+            max_retries=style_attempts
         )
 
         logger.debug(f"Successfully wrote scene")
@@ -844,167 +975,228 @@ Do not return any text other than the next section of the article or short story
                       provider=provider)
         raise Exception(f"Failed to write scene: {str(e)}")
 
-# Modify the write_full_article function signature and implementation
-def write_full_article(
+@tracer.traced()
+def write_scene_script(
     topic: str,
     original_plan: str,
     structured_plan: ArticleStructure,
+    written_content: Union[ArticleStructure, ShortArticleStructure, MediumArticleStructure, LongArticleStructure],
+    scene: Scene,
     style: str = "new_yorker",
     provider: ProviderType = "openai",
-    include_headers: bool = True
-) -> Tuple[ArticleStructure, SceneScript]:
-    """Write the entire article or short story, generating each paragraph individually."""
-    
+    stats: Optional[GenerationStats] = None,
+    style_attempts: int = 3,
+    brief: bool = False
+) -> SceneScript:
+    """
+    Write a scene in style straight into a speaker-tagged SceneScript with one
+    structured-output call, instead of drafting, restyling and extracting.
+    Falls back to style transfer plus extraction if forbidden words slip in.
+    """
     try:
-        # Create a deep copy of the structured plan to preserve the original
-        written_article = ArticleStructure(
-            length=structured_plan.length,
-            content=structured_plan.content.model_copy(deep=True)
-        )
+        scene_description = scene.scene_description
+        logger.info(f"Writing scene script: {scene_description}")
 
-        logger.info(f"Starting full article writing process for {structured_plan.length} article, generating paragraphs individually")
+        span = tracer.current_span()
+        if span:
+            span.set_attribute("scene_description", scene_description[:200])
 
-        # Initialize combined scene script
-        all_paragraphs = []
-        scene_title = topic  # Use topic as the overall title
+        prompt = build_scene_prompt(topic, original_plan, structured_plan, written_content, scene, style, brief)
+        prompt += f"""
+<output format>
 
-        if isinstance(written_article.content, ShortArticleStructure):
-            for idx, scene in enumerate(written_article.content.scenes):
-                scene_text = write_paragraph(
-                    topic, original_plan, structured_plan, written_article,
-                    scene, style=style, provider=provider
-                )
-                scene_script = extract_scene_script(scene_text, provider)
-                written_article.content.scenes[idx].text = scene_script.model_dump_json()
+Return the section as a scene script: a list of paragraphs containing conversation turns and narrator commentary, in this format:
 
-                # Generate image for this scene
-                image_url = image_service.generate_scene_image(scene_script)  # NEW
-                written_article.content.scenes[idx].image_url = image_url       # NEW
+{SCENE_SCRIPT_EXAMPLE}
 
-                all_paragraphs.extend(scene_script.paragraphs)
+Each paragraph of the section should be its own paragraph in the script. Split dialogue from the narration around it, e.g. "Net's caught again," Danny said. becomes {{"speaker": "Danny", "text": "Net's caught again,"}} followed by {{"speaker": "Narrator", "text": "Danny said."}}. End regular speaking sentences with a comma so the Narrator can finish the sentence, unless the speaker is asking a question or exclaiming.
 
-        elif isinstance(written_article.content, MediumArticleStructure):
-            # Introduction
-            for idx, scene in enumerate(written_article.content.intro_paragraphs):
-                scene_text = write_paragraph(
-                    topic, original_plan, structured_plan, written_article,
-                    scene, style=style, provider=provider
-                )
-                scene_script = extract_scene_script(scene_text, provider)
-                written_article.content.intro_paragraphs[idx].text = scene_script.model_dump_json()
+</output format>
+"""
 
-                # Generate image for this scene
-                image_url = image_service.generate_scene_image(scene_script)  # NEW
-                written_article.content.intro_paragraphs[idx].image_url = image_url # NEW
+        scene_script = model_router.parse(
+            "scene_script",
+            provider,
+            [{"role": "user", "content": prompt}],
+            SceneScript
+        )
+        services.db.save_llm_call_log(prompt, scene_script.model_dump())
 
-                all_paragraphs.extend(scene_script.paragraphs)
+        if stats is not None:
+            stats.scenes_written += 1
 
-            # Main headings
-            for heading in written_article.content.main_headings:
-                for idx, scene in enumerate(heading.scenes):
-                    scene_text = write_paragraph(
-                        topic, original_plan, structured_plan, written_article,
-                        scene, style=style, provider=provider
-                    )
-                    scene_script = extract_scene_script(scene_text, provider)
-                    heading.scenes[idx].text = scene_script.model_dump_json()
+        has_forbidden, found_words = check_forbidden_words(scene_script_to_prose(scene_script))
+        if not has_forbidden:
+            if stats is not None:
+                stats.style_transfer_calls_avoided += 1
+                stats.script_extractions_avoided += 1
+            return scene_script
 
-                    # Generate image for this scene
-                    image_url = image_service.generate_scene_image(scene_script)  # NEW
-                    heading.scenes[idx].image_url = image_url # NEW
+        logger.info(f"Scene script contains forbidden words {found_words}; falling back to style transfer")
+        if stats is not None:
+            stats.style_transfer_fallbacks += 1
+        styled_content = apply_style_transfer(
+            content=scene_script_to_prose(scene_script),
+            scene_description=scene_description,
+            must_include=scene.must_include,
+            style_name=style,
+            provider=provider,
+            max_retries=style_attempts
+        )
+        return extract_scene_script(styled_content, provider, stats)
 
-                    all_paragraphs.extend(scene_script.paragraphs)
+    except Exception as e:
+        log_api_error('write_scene_script', e,
+                      scene_description=scene.scene_description,
+                      topic=topic,
+                      style=style,
+                      provider=provider)
+        raise Exception(f"Failed to write scene: {str(e)}")
 
-            # Conclusion
-            for idx, scene in enumerate(written_article.content.conclusion_paragraphs):
-                scene_text = write_paragraph(
-                    topic, original_plan, structured_plan, written_article,
-                    scene, style=style, provider=provider
-                )
-                scene_script = extract_scene_script(scene_text, provider)
-                written_article.content.conclusion_paragraphs[idx].text = scene_script.model_dump_json()
+# Modify the write_full_article function signature and implementation
+@tracer.traced()
+def write_scene(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    written_article: ArticleStructure,
+    scene: Scene,
+    style: str = "new_yorker",
+    provider: ProviderType = "openai",
+    style_mode: StyleMode = StyleMode.TWO_PASS,
+    stats: Optional[GenerationStats] = None,
+    include_audio: bool = True,
+    draft_format: DraftFormat = DraftFormat.PROSE,
+    style_attempts: int = 3,
+    brief: bool = False
+) -> SceneScript:
+    """
+    Write one scene in place (sets scene.script) and return its script. The
+    image is left to the caller.
 
-                # Generate image for this scene
-                image_url = image_service.generate_scene_image(scene_script)  # NEW
-                written_article.content.conclusion_paragraphs[idx].image_url = image_url # NEW
+    Speaker-tagged scripts are only needed for audio: without it the scene's
+    prose is wrapped as a narrator-only script locally. With it, the SCRIPT
+    draft format gets the script from the writer itself.
+    """
+    if include_audio and draft_format == DraftFormat.SCRIPT:
+        scene_script = write_scene_script(
+            topic, original_plan, structured_plan, written_article, scene,
+            style=style, provider=provider, stats=stats, style_attempts=style_attempts,
+            brief=brief
+        )
+    else:
+        scene_text = write_paragraph(
+            topic, original_plan, structured_plan, written_article, scene,
+            style=style, provider=provider, style_mode=style_mode, stats=stats,
+            style_attempts=style_attempts, brief=brief
+        )
+        if include_audio:
+            scene_script = extract_scene_script(scene_text, provider, stats)
+        else:
+            scene_script = prose_to_scene_script(scene_text, scene.scene_description)
+            if stats is not None:
+                stats.script_extractions_avoided += 1
+    scene.script = scene_script
+    return scene_script
 
-                all_paragraphs.extend(scene_script.paragraphs)
+def write_full_article(
+    topic: str,
+    original_plan: str,
+    structured_plan: ArticleStructure,
+    style: str = "new_yorker",
+    provider: ProviderType = "openai",
+    include_headers: bool = True,
+    style_mode: StyleMode = StyleMode.TWO_PASS,
+    stats: Optional[GenerationStats] = None,
+    include_audio: bool = True,
+    draft_format: DraftFormat = DraftFormat.PROSE,
+    image_mode: ImageMode = ImageMode.PER_SCENE,
+    drafts: Optional[List[SceneScript]] = None,
+    style_attempts: int = 3,
+    include_images: bool = True,
+    image_concurrency: Optional[int] = None,
+    deadline: Optional[Deadline] = None
+) -> Tuple[ArticleStructure, SceneScript]:
+    """
+    Write the entire article or short story, generating each scene individually
+    with write_scene, in reading order. `drafts` are scripts already written for
+    the opening scenes (kept speculative drafts); they are used as they are.
 
-        elif isinstance(written_article.content, LongArticleStructure):
-            # Introduction
-            for idx, scene in enumerate(written_article.content.intro_paragraphs):
-                scene_text = write_paragraph(
-                    topic, original_plan, structured_plan, written_article, scene, style=style, provider=provider
-                )
-                scene_script = extract_scene_script(scene_text, provider)
-                written_article.content.intro_paragraphs[idx].text = scene_script.model_dump_json()
+    In BATCHED image mode the illustrations are prompted in one request once
+    every scene is written, then generated `image_concurrency` at a time.
+    Without include_images no illustrations are made.
 
-                # Generate image for this scene
-                image_url = image_service.generate_scene_image(scene_script)  # NEW
-                written_article.content.intro_paragraphs[idx].image_url = image_url # NEW
+    With a `deadline`, each scene first asks it what to give up to finish in
+    time (see Deadline.schedule), projecting from the scenes written so far:
+    forbidden-word retries, its image, then its length.
+    """
+    
+    try:
+        # Create a deep copy of the structured plan to preserve the original
+        written_article = ArticleStructure(
+            length=structured_plan.length,
+            content=structured_plan.content.model_copy(deep=True)
+        )
 
-                all_paragraphs.extend(scene_script.paragraphs)
+        logger.info(f"Starting full article writing process for {structured_plan.length} article, generating paragraphs individually")
 
-            # Main headings and nested content
-            for heading in written_article.content.main_headings:
-                for idx, scene in enumerate(heading.scenes):
-                    scene_text = write_paragraph(
-                        topic, original_plan, structured_plan, written_article,
-                        scene, style=style, provider=provider
-                    )
-                    scene_script = extract_scene_script(scene_text, provider)
-                    heading.scenes[idx].text = scene_script.model_dump_json()
-
-                    # Generate image for this scene
-                    image_url = image_service.generate_scene_image(scene_script)  # NEW
-                    heading.scenes[idx].image_url = image_url # NEW
-
-                    all_paragraphs.extend(scene_script.paragraphs)
-
-                for sub in heading.sub_headings:
-                    for idx, scene in enumerate(sub.scenes):
-                        scene_text = write_paragraph(
-                            topic, original_plan, structured_plan, written_article,
-                            scene, style=style, provider=provider
-                        )
-                        scene_script = extract_scene_script(scene_text, provider)
-                        sub.scenes[idx].text = scene_script.model_dump_json()
-
-                        # Generate image for this scene
-                        image_url = image_service.generate_scene_image(scene_script)  # NEW
-                        sub.scenes[idx].image_url = image_url # NEW
-
-                        all_paragraphs.extend(scene_script.paragraphs)
-
-                    for subsub in sub.sub_headings:
-                        for idx, scene in enumerate(subsub.scenes):
-                            scene_text = write_paragraph(
-                                topic, original_plan, structured_plan, written_article,
-                                scene, style=style, provider=provider
-                            )
-                            scene_script = extract_scene_script(scene_text, provider)
-                            subsub.scenes[idx].text = scene_script.model_dump_json()
-
-                            # Generate image for this scene
-                            image_url = image_service.generate_scene_image(scene_script)  # NEW
-                            subsub.scenes[idx].image_url = image_url # NEW
-
-                            all_paragraphs.extend(scene_script.paragraphs)
-
-            # Conclusion
-            for idx, scene in enumerate(written_article.content.conclusion_paragraphs):
-                scene_text = write_paragraph(
-                    topic, original_plan, structured_plan, written_article,
-                    scene, style=style, provider=provider
+        # Initialize combined scene script
+        all_paragraphs = []
+        scene_title = topic  # Use topic as the overall title
+        pending_images: List[Tuple[SceneRef, SceneScript]] = []
+
+        drafts = drafts or []
+        refs = index_scenes(written_article)
+        scene_seconds: List[float] = []
+        for ref in refs:
+            started = time.monotonic()
+            degraded = set()
+            if deadline is not None:
+                average = sum(scene_seconds) / len(scene_seconds) if scene_seconds else None
+                degraded = deadline.schedule(len(refs) - ref.position, average)
+
+            if ref.position < len(drafts):
+                scene_script = ref.scene.script = drafts[ref.position]
+            else:
+                attempts = style_attempts
+                if Degradation.STYLE_RETRIES in degraded and style_attempts > 1:
+                    attempts = 1
+                    deadline.record(Degradation.STYLE_RETRIES, ref.position)
+                brief = Degradation.SHORT_SCENES in degraded
+                if brief:
+                    deadline.record(Degradation.SHORT_SCENES, ref.position)
+                scene_script = write_scene(
+                    topic, original_plan, structured_plan, written_article, ref.scene,
+                    style=style, provider=provider, style_mode=style_mode, stats=stats,
+                    include_audio=include_audio, draft_format=draft_format,
+                    style_attempts=attempts, brief=brief
                 )
-                scene_script = extract_scene_script(scene_text, provider)
-                written_article.content.conclusion_paragraphs[idx].text = scene_script.model_dump_json()
 
-                # Generate image for this scene
-                image_url = image_service.generate_scene_image(scene_script)  # NEW
-                written_article.content.conclusion_paragraphs[idx].image_url = image_url # NEW
+            # Generate image for this scene
+            if include_images and Degradation.IMAGES in degraded:
+                deadline.record(Degradation.IMAGES, ref.position)
+            elif include_images and image_mode == ImageMode.BATCHED:
+                pending_images.append((ref, scene_script))
+            elif include_images:
+                ref.scene.image_url = services.image_service.generate_scene_image(scene_script)
+
+            if ref.position >= len(drafts):
+                scene_seconds.append(time.monotonic() - started)
 
-                all_paragraphs.extend(scene_script.paragraphs)
+            all_paragraphs.extend(scene_script.paragraphs)
+
+        if pending_images and deadline is not None and deadline.remaining() <= deadline.reserve:
+            # The batch would run into the time held back for audio and saving
+            for ref, _ in pending_images:
+                deadline.record(Degradation.IMAGES, ref.position)
+            pending_images = []
+
+        if pending_images:
+            image_urls = services.image_service.generate_scene_images(
+                [script for _, script in pending_images], concurrency=image_concurrency
+            )
+            for (ref, _), image_url in zip(pending_images, image_urls):
+                ref.scene.image_url = image_url
 
         # Create combined scene script with all paragraphs
         combined_script = SceneScript(
@@ -1023,33 +1215,91 @@ def write_full_article(
                       provider=provider)
         raise Exception(f"Failed to write full article: {str(e)}")
 
-def format_scene_script(scene_text: str) -> str:
-    """Helper function to convert scene script JSON to prose"""
+@tracer.traced()
+def regenerate_scenes(
+    topic: str,
+    original_plan: str,
+    article: ArticleStructure,
+    path: str,
+    style: str = "new_yorker",
+    provider: ProviderType = "openai",
+    style_mode: StyleMode = StyleMode.TWO_PASS,
+    stats: Optional[GenerationStats] = None,
+    include_audio: bool = False,
+    draft_format: DraftFormat = DraftFormat.PROSE,
+    image_mode: ImageMode = ImageMode.PER_SCENE,
+    image_concurrency: Optional[int] = None
+) -> Tuple[List[str], SceneScript]:
+    """
+    Rewrite the scene at `path`, or every scene in the section it names, of an
+    already written article in place, with new images. Each scene is written
+    exactly as write_full_article would: seeing only the scenes before it.
+    In BATCHED image mode the new images are generated `image_concurrency` at
+    a time once every scene is rewritten.
+    Returns the rewritten paths and the combined script of the whole article
+    for audio. Raises ValueError if nothing is at `path`.
+    """
+    targets = select_scenes(article, path)
     try:
-        # Parse the JSON string into a SceneScript object
-        scene_script = SceneScript.model_validate_json(scene_text)
-        
-        # Process each paragraph
-        formatted_paragraphs = []
-        for paragraph in scene_script.paragraphs:
-            # Combine lines into prose
-            prose_lines = []
-            for line in paragraph.lines:
-                if line.speaker == "Narrator":
-                    prose_lines.append(line.text)
-                else:
-                    # Add quotes around character dialogue
-                    prose_lines.append(f'"{line.text}"')
-            
-            # Join the lines with appropriate spacing
-            formatted_paragraphs.append(" ".join(prose_lines))
-        
-        # Return paragraphs joined with newlines
-        return "\n\n".join(formatted_paragraphs)
-        
+        structured_plan = outline_of(article)
+        all_refs = index_scenes(article)
+        logger.info(f"Regenerating {len(targets)} of {len(all_refs)} scenes under {path}")
+
+        pending_images: List[Tuple[Scene, SceneScript]] = []
+        for ref in targets:
+            # Hide this scene and everything after it, so the prompt matches a first write
+            later = all_refs[ref.position:]
+            saved = [(other.scene.script, other.scene.text) for other in later]
+            for other in later:
+                other.scene.script, other.scene.text = None, None
+            try:
+                scene_script = write_scene(
+                    topic, original_plan, structured_plan, article, ref.scene,
+                    style=style, provider=provider, style_mode=style_mode, stats=stats,
+                    include_audio=include_audio, draft_format=draft_format
+                )
+            finally:
+                for other, (script, text) in zip(later[1:], saved[1:]):
+                    other.scene.script, other.scene.text = script, text
+            ref.scene.text = None
+
+            if image_mode == ImageMode.BATCHED:
+                pending_images.append((ref.scene, scene_script))
+            else:
+                ref.scene.image_url = services.image_service.generate_scene_image(scene_script)
+
+        if pending_images:
+            image_urls = services.image_service.generate_scene_images(
+                [script for _, script in pending_images], concurrency=image_concurrency
+            )
+            for (scene, _), image_url in zip(pending_images, image_urls):
+                scene.image_url = image_url
+
+        paragraphs = []
+        for ref in all_refs:
+            script = ref.scene.script or prose_to_scene_script(ref.scene.prose or "", ref.scene.scene_description)
+            paragraphs.extend(script.paragraphs)
+        return [ref.path for ref in targets], SceneScript(scene_title=topic, paragraphs=paragraphs)
+
     except Exception as e:
-        logger.error(f"Error formatting scene script: {e}")
-        return scene_text  # Return original text if parsing fails
+        log_api_error('regenerate_scenes', e,
+                      topic=topic,
+                      path=path,
+                      provider=provider)
+        raise Exception(f"Failed to regenerate scenes: {str(e)}")
+
+def prose_to_scene_script(text: str, scene_title: str = "") -> SceneScript:
+    """Wrap prose as a narrator-only SceneScript, one paragraph per block of text, without an LLM call."""
+    paragraphs = [
+        Paragraph(lines=[SceneLine(speaker="Narrator", text=block.strip())])
+        for block in re.split(r"\n\s*\n", text)
+        if block.strip()
+    ]
+    return SceneScript(scene_title=scene_title, paragraphs=paragraphs)
+
+def scene_script_to_prose(scene_script: SceneScript) -> str:
+    """Join a scene script's lines back into prose, quoting character dialogue."""
+    return scene_script.to_prose()
 
 def format_written_content(
     written_article: Union[
@@ -1067,8 +1317,9 @@ def format_written_content(
         if scene.image_url:
             # Insert image as markdown
             result_lines.append(f"![Scene Illustration]({scene.image_url})")
-        if scene.text:
-            result_lines.append(format_scene_script(scene.text))
+        prose = scene.prose
+        if prose:
+            result_lines.append(prose)
         return "\n\n".join(result_lines)
 
     # ShortArticleStructure
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Type
+
+from app.constants.model_routing import MODEL_ROUTES, StageRoute
+from app.services.hedging_service import LatencyTracker
+from app.services.provider_service import Messages, T, collect_usage, llm_stage, model_tier
+from app.services.rate_limit_service import estimate_tokens
+from app.services.service_container import services
+
+logger = logging.getLogger(__name__)
+
+
+def load_model_routes(path: Optional[str] = None) -> Dict[str, StageRoute]:
+    """
+    MODEL_ROUTES with the JSON file at `path` merged over it, e.g.
+    {"outline": {"tier": "default"}, "critique": {"provider": "anthropic", "max_tokens": 4000}}.
+    """
+    routes = dict(MODEL_ROUTES)
+    if not path:
+        return routes
+    with open(path) as f:
+        overrides = json.load(f)
+    for stage, fields in overrides.items():
+        if stage not in routes:
+            logger.warning(f"Model routing file {path} names unknown stage {stage!r}")
+        base = routes.get(stage, StageRoute())
+        routes[stage] = StageRoute.model_validate({**base.model_dump(exclude_unset=True), **fields})
+    logger.info(f"Loaded model routes from {path}")
+    return routes
+
+
+class StageMetrics:
+    """Calls, errors, latency and token usage per stage and model."""
+
+    def __init__(self):
+        self.latency = LatencyTracker(window=500, min_samples=1)
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, model: str, seconds: float, input_tokens: int, output_tokens: int, estimated: bool, error: bool = False):
+        with self._lock:
+            metrics = self._stages.setdefault(stage, {
+                "calls": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0,
+                "estimated_token_calls": 0, "models": Counter(),
+            })
+            metrics["calls"] += 1
+            metrics["errors"] += int(error)
+            metrics["input_tokens"] += input_tokens
+            metrics["output_tokens"] += output_tokens
+            metrics["estimated_token_calls"] += int(estimated)
+            metrics["models"][model] += 1
+        if not error:
+            self.latency.record(stage, model, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency.snapshot()
+        with self._lock:
+            return {
+                stage: {**metrics, "models": dict(metrics["models"]), "latency": latency.get(stage, {})}
+                for stage, metrics in self._stages.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+        self.latency = LatencyTracker(window=500, min_samples=1)
+
+
+class ModelRouter:
+    """
+    Sends each stage's LLM calls to the provider, model, max_tokens and
+    temperature its route names, and records what every call cost.
+    """
+
+    def __init__(self, routes: Dict[str, StageRoute]):
+        self.routes = routes
+        self.metrics = StageMetrics()
+
+    def route(self, stage: str) -> StageRoute:
+        return self.routes.get(stage) or StageRoute()
+
+    def chat(self, stage: str, provider: str, messages: Messages, system: Optional[str] = None) -> str:
+        return self._call(stage, provider, "chat", (messages,), messages, system)
+
+    def parse(self, stage: str, provider: str, messages: Messages, response_model: Type[T], system: Optional[str] = None) -> T:
+        return self._call(stage, provider, "parse", (messages, response_model), messages, system)
+
+    def _call(self, stage: str, provider: str, method: str, args: tuple, messages: Messages, system: Optional[str]):
+        route = self.route(stage)
+        client = services.provider(route.provider or provider)
+        with model_tier(route.tier) if route.tier else nullcontext(), llm_stage(stage), collect_usage() as usage:
+            model = route.model or client.default_model(structured=method == "parse")
+            started = time.monotonic()
+            try:
+                result = getattr(client, method)(
+                    *args, model=route.model, system=system,
+                    max_tokens=route.max_tokens, temperature=route.temperature
+                )
+            except Exception:
+                self.metrics.record(stage, f"{client.name}/{model}", time.monotonic() - started, 0, 0, False, error=True)
+                raise
+        elapsed = time.monotonic() - started
+
+        input_tokens, output_tokens = usage["input_tokens"], usage["output_tokens"]
+        estimated = not usage["reported"]
+        if estimated:
+            input_tokens = estimate_tokens(system, *(message["content"] for message in messages))
+            output_tokens = estimate_tokens(result.model_dump_json() if method == "parse" else result)
+        self.metrics.record(stage, f"{client.name}/{model}", elapsed, input_tokens, output_tokens, estimated)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "routes": {stage: route.model_dump(exclude_none=True) for stage, route in self.routes.items()},
+            "stages": self.metrics.snapshot(),
+        }
+
+
+model_router = ModelRouter(load_model_routes(os.getenv("MODEL_ROUTING_FILE")))
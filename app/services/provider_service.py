@@ -0,0 +1,314 @@
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Type, TypeVar
+
+import httpx
+from pydantic import BaseModel
+
+from app.schemas import ModelTier
+from app.services.rate_limit_service import estimate_tokens, rate_limiter
+from app.services.tracing_service import tracer
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+T = TypeVar("T", bound=BaseModel)
+
+Messages = List[Dict[str, str]]
+
+# The model tier for calls made in this context, e.g. FAST for a draft preset's stages
+_model_tier: ContextVar[ModelTier] = ContextVar("model_tier", default=ModelTier.DEFAULT)
+
+
+# The routing stage (e.g. "scene_draft") of calls made in this context, for per-stage policies like hedging
+_stage: ContextVar[Optional[str]] = ContextVar("llm_stage", default=None)
+
+
+# Token counts reported by the APIs for calls made in this context, while a caller collects them
+_usage: ContextVar[Optional[Dict[str, int]]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def collect_usage() -> Iterator[Dict[str, int]]:
+    """
+    Add up the token usage reported by every call made inside the block.
+    `reported` counts the calls that reported usage at all (instructor's
+    Anthropic parse doesn't).
+    """
+    usage = {"reported": 0, "input_tokens": 0, "output_tokens": 0}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+@contextmanager
+def model_tier(tier: ModelTier) -> Iterator[None]:
+    """Make calls without an explicit model use the tier's models until the block exits."""
+    token = _model_tier.set(tier)
+    try:
+        yield
+    finally:
+        _model_tier.reset(token)
+
+
+@contextmanager
+def llm_stage(stage: str) -> Iterator[None]:
+    """Tag calls made inside the block with their routing stage."""
+    token = _stage.set(stage)
+    try:
+        yield
+    finally:
+        _stage.reset(token)
+
+
+def current_stage() -> Optional[str]:
+    return _stage.get()
+
+
+def create_pooled_http_client(timeout: float = 600.0) -> httpx.Client:
+    """
+    A keep-alive httpx client for a single API host. Connections are reused
+    across requests (and HTTP/2 multiplexed when the h2 package is installed),
+    so only the first call to a host pays for the TLS handshake.
+    """
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120")),
+        ),
+        timeout=httpx.Timeout(timeout, connect=10.0),
+        follow_redirects=True,
+    )
+
+
+def warm_up_connection(http_client: httpx.Client, base_url: str):
+    """Open (and keep) a connection to base_url. Any HTTP response counts; errors are only logged."""
+    try:
+        with tracer.start_span("http.warm_up", url=base_url):
+            http_client.head(base_url, timeout=5.0)
+        logger.info(f"Warmed up connection to {base_url}")
+    except Exception as e:
+        logger.warning(f"Connection warm-up to {base_url} failed: {e}")
+
+
+class Provider:
+    """
+    Common interface over the LLM APIs used by the pipeline.
+
+    Every method takes OpenAI-style messages plus an optional system prompt and
+    falls back to the provider's default model for the current model tier
+    when none is given.
+    """
+
+    name: str = ""
+    chat_model: str = ""
+    structured_model: str = ""
+    fast_chat_model: str = ""
+    fast_structured_model: str = ""
+
+    def default_model(self, structured: bool = False) -> str:
+        if _model_tier.get() == ModelTier.FAST:
+            return self.fast_structured_model if structured else self.fast_chat_model
+        return self.structured_model if structured else self.chat_model
+
+    def chat(
+        self,
+        messages: Messages,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> str:
+        """Return the text of a single completion."""
+        raise NotImplementedError
+
+    def parse(
+        self,
+        messages: Messages,
+        response_model: Type[T],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> T:
+        """Return the completion parsed into response_model using the provider's structured output support."""
+        raise NotImplementedError
+
+    def stream(
+        self,
+        messages: Messages,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None
+    ) -> Iterator[str]:
+        """Yield the completion text as it is generated."""
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Open a connection to the API host ahead of the first real request."""
+
+    def _limited(self, model: str, func, messages: Messages, system: Optional[str], max_tokens: Optional[int]):
+        """Run one API request under the shared rate limiter, with retries and backoff."""
+        estimated_tokens = estimate_tokens(system, *(message["content"] for message in messages)) + (max_tokens or 1000)
+        return rate_limiter.call(self.name, model, func, estimated_tokens=estimated_tokens)
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+    chat_model = "gpt-4o-2024-11-20"
+    structured_model = "gpt-4o"
+    fast_chat_model = "gpt-4o-mini"
+    fast_structured_model = "gpt-4o-mini"
+
+    def __init__(self, client):
+        self.client = client
+
+    def _messages(self, messages: Messages, system: Optional[str]) -> Messages:
+        if system:
+            return [{"role": "system", "content": system}] + list(messages)
+        return list(messages)
+
+    def _options(self, max_tokens: Optional[int], temperature: Optional[float]) -> dict:
+        options = {}
+        if max_tokens is not None:
+            options["max_tokens"] = max_tokens
+        if temperature is not None:
+            options["temperature"] = temperature
+        return options
+
+    def chat(self, messages, model=None, max_tokens=None, system=None, temperature=None) -> str:
+        model = model or self.default_model()
+        with tracer.start_span("llm.chat", provider=self.name, model=model) as span:
+            completion = self._limited(model, lambda: self.client.chat.completions.create(
+                model=model,
+                messages=self._messages(messages, system),
+                **self._options(max_tokens, temperature)
+            ), messages, system, max_tokens)
+            _record_usage(span, completion.usage.prompt_tokens if completion.usage else None,
+                          completion.usage.completion_tokens if completion.usage else None)
+            return completion.choices[0].message.content.strip()
+
+    def parse(self, messages, response_model, model=None, max_tokens=None, system=None, temperature=None):
+        model = model or self.default_model(structured=True)
+        with tracer.start_span("llm.parse", provider=self.name, model=model, response_model=response_model.__name__) as span:
+            completion = self._limited(model, lambda: self.client.beta.chat.completions.parse(
+                model=model,
+                messages=self._messages(messages, system),
+                response_format=response_model,
+                **self._options(max_tokens, temperature)
+            ), messages, system, max_tokens)
+            _record_usage(span, completion.usage.prompt_tokens if completion.usage else None,
+                          completion.usage.completion_tokens if completion.usage else None)
+
+            # Handle potential refusal
+            if completion.choices[0].message.refusal:
+                refusal_msg = completion.choices[0].message.refusal
+                logger.warning(f"Model refused to produce {response_model.__name__}: {refusal_msg}")
+                raise Exception(f"Model refused to produce {response_model.__name__}: {refusal_msg}")
+
+            return completion.choices[0].message.parsed
+
+    def stream(self, messages, model=None, max_tokens=None, system=None, temperature=None) -> Iterator[str]:
+        model = model or self.default_model()
+        with tracer.start_span("llm.stream", provider=self.name, model=model):
+            # Only opening the stream is retried; a failure mid-stream propagates
+            response = self._limited(model, lambda: self.client.chat.completions.create(
+                model=model,
+                messages=self._messages(messages, system),
+                stream=True,
+                **self._options(max_tokens, temperature)
+            ), messages, system, max_tokens)
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    def warm_up(self):
+        warm_up_connection(self.client._client, str(self.client.base_url))
+
+
+class AnthropicProvider(Provider):
+    name = "anthropic"
+    chat_model = "claude-3-5-sonnet-latest"
+    structured_model = "claude-3-5-sonnet-latest"
+    fast_chat_model = "claude-3-5-haiku-latest"
+    fast_structured_model = "claude-3-5-haiku-latest"
+    default_max_tokens = 8000
+
+    def __init__(self, client, instructor_client):
+        self.client = client
+        self.instructor_client = instructor_client
+
+    def _options(self, max_tokens: Optional[int], system: Optional[str], temperature: Optional[float]) -> dict:
+        options = {"max_tokens": max_tokens or self.default_max_tokens}
+        if system:
+            options["system"] = system
+        if temperature is not None:
+            options["temperature"] = temperature
+        return options
+
+    def chat(self, messages, model=None, max_tokens=None, system=None, temperature=None) -> str:
+        model = model or self.default_model()
+        with tracer.start_span("llm.chat", provider=self.name, model=model) as span:
+            completion = self._limited(model, lambda: self.client.messages.create(
+                model=model,
+                messages=messages,
+                **self._options(max_tokens, system, temperature)
+            ), messages, system, max_tokens)
+            _record_usage(span, completion.usage.input_tokens, completion.usage.output_tokens)
+            return completion.content[0].text.strip()
+
+    def parse(self, messages, response_model, model=None, max_tokens=None, system=None, temperature=None):
+        model = model or self.default_model(structured=True)
+        with tracer.start_span("llm.parse", provider=self.name, model=model, response_model=response_model.__name__):
+            # instructor returns the already-parsed model
+            return self._limited(model, lambda: self.instructor_client.messages.create(
+                model=model,
+                messages=messages,
+                response_model=response_model,
+                **self._options(max_tokens, system, temperature)
+            ), messages, system, max_tokens)
+
+    def stream(self, messages, model=None, max_tokens=None, system=None, temperature=None) -> Iterator[str]:
+        model = model or self.default_model()
+        with tracer.start_span("llm.stream", provider=self.name, model=model):
+            # Only opening the stream is retried; a failure mid-stream propagates
+            stream_manager = self.client.messages.stream(
+                model=model,
+                messages=messages,
+                **self._options(max_tokens, system, temperature)
+            )
+            response = self._limited(model, stream_manager.__enter__, messages, system, max_tokens)
+            try:
+                for text in response.text_stream:
+                    yield text
+            finally:
+                stream_manager.__exit__(None, None, None)
+
+    def warm_up(self):
+        warm_up_connection(self.client._client, str(self.client.base_url))
+
+
+def _record_usage(span, input_tokens: Optional[int], output_tokens: Optional[int]):
+    usage = _usage.get()
+    if usage is not None:
+        usage["reported"] += 1
+        usage["input_tokens"] += input_tokens or 0
+        usage["output_tokens"] += output_tokens or 0
+    if span is None:
+        return
+    if input_tokens is not None:
+        span.set_attribute("usage.input_tokens", input_tokens)
+    if output_tokens is not None:
+        span.set_attribute("usage.output_tokens", output_tokens)
@@ -0,0 +1,356 @@
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from app.services.tracing_service import tracer
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class RateLimits:
+    """Published limits for one provider. 0 disables a limit."""
+    requests_per_minute: float = 0
+    tokens_per_minute: float = 0
+    max_concurrency: int = 8
+
+
+# Roughly the providers' entry tiers, used only when RATE_LIMITS_ENABLED=true.
+# They throttle well below paid tiers, so set <PROVIDER>_RPM, <PROVIDER>_TPM
+# and <PROVIDER>_MAX_CONCURRENCY to your account's limits when enabling.
+DEFAULT_LIMITS: Dict[str, RateLimits] = {
+    "openai": RateLimits(requests_per_minute=500, tokens_per_minute=30000, max_concurrency=16),
+    "anthropic": RateLimits(requests_per_minute=50, tokens_per_minute=40000, max_concurrency=8),
+    "elevenlabs": RateLimits(requests_per_minute=0, tokens_per_minute=0, max_concurrency=4),
+    "retrodiffusion": RateLimits(requests_per_minute=60, tokens_per_minute=0, max_concurrency=4),
+}
+
+
+def limits_for(provider: str) -> RateLimits:
+    defaults = DEFAULT_LIMITS.get(provider, RateLimits())
+    prefix = provider.upper()
+    return RateLimits(
+        requests_per_minute=float(os.getenv(f"{prefix}_RPM", defaults.requests_per_minute)),
+        tokens_per_minute=float(os.getenv(f"{prefix}_TPM", defaults.tokens_per_minute)),
+        max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", defaults.max_concurrency)),
+    )
+
+
+def estimate_tokens(*texts: Any) -> int:
+    """Rough token count (4 characters per token) used for TPM accounting."""
+    return sum(len(str(text)) for text in texts if text) // 4
+
+
+class TokenBucket:
+    """
+    Request and token buckets refilled continuously at the per-minute rates.
+    reserve() always succeeds and returns how long the caller must wait, so
+    callers queue fairly instead of polling.
+    """
+
+    def __init__(self, limits: RateLimits):
+        self.limits = limits
+        self.requests = limits.requests_per_minute
+        self.tokens = limits.tokens_per_minute
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.updated = now
+        if self.limits.requests_per_minute:
+            self.requests = min(self.limits.requests_per_minute, self.requests + elapsed * self.limits.requests_per_minute / 60)
+        if self.limits.tokens_per_minute:
+            self.tokens = min(self.limits.tokens_per_minute, self.tokens + elapsed * self.limits.tokens_per_minute / 60)
+
+    def reserve(self, tokens: int = 0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self.blocked_until - now)
+            if self.limits.requests_per_minute:
+                self.requests -= 1
+                if self.requests < 0:
+                    wait = max(wait, -self.requests * 60 / self.limits.requests_per_minute)
+            if self.limits.tokens_per_minute and tokens:
+                # A single request larger than the whole bucket only waits for a full bucket
+                self.tokens -= min(tokens, self.limits.tokens_per_minute)
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens * 60 / self.limits.tokens_per_minute)
+            return wait
+
+    def block(self, seconds: float):
+        """Stop handing out capacity for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in a SQLite table, so every worker process
+    sharing the database file draws from the same budget.
+    """
+
+    def __init__(self, limits: RateLimits, db_path: str, key: str):
+        super().__init__(limits)
+        self.db_path = db_path
+        self.key = key
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    key TEXT PRIMARY KEY,
+                    requests REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    blocked_until REAL NOT NULL
+                )
+            ''')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _state(self) -> Iterator[None]:
+        """Load the shared bucket into self, let the caller update it, then write it back atomically."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT requests, tokens, updated, blocked_until FROM rate_limit_buckets WHERE key = ?",
+                (self.key,)
+            ).fetchone()
+            if row:
+                self.requests, self.tokens, updated, self.blocked_until = row
+                # Wall-clock time is shared across processes; monotonic time is not
+                self.updated = time.monotonic() - max(0.0, time.time() - updated)
+                self.blocked_until = time.monotonic() + max(0.0, self.blocked_until - time.time())
+            yield
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_buckets (key, requests, tokens, updated, blocked_until) VALUES (?, ?, ?, ?, ?)",
+                (self.key, self.requests, self.tokens, time.time(),
+                 time.time() + max(0.0, self.blocked_until - time.monotonic()))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def reserve(self, tokens: int = 0) -> float:
+        with self._state():
+            return super().reserve(tokens)
+
+    def block(self, seconds: float):
+        with self._state():
+            super().block(seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit. Each fast, successful call raises the limit by
+    about one per window of calls; a throttled call halves it, and a call several
+    times slower than the best recent latency trims it by 10%. The latency
+    tolerance is wide because LLM calls legitimately vary with output length.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1, initial_limit: Optional[float] = None, latency_tolerance: float = 4.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial_limit or max(min_limit, max_limit / 2))
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.min_latency: Optional[float] = None
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, throttled: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif latency is not None:
+                # Let the baseline drift up slowly so one lucky fast call doesn't pin it
+                if self.min_latency is None or latency < self.min_latency:
+                    self.min_latency = latency
+                else:
+                    self.min_latency *= 1.01
+                if latency > self.min_latency * self.latency_tolerance:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class RetryableError(Exception):
+    """Raised by callers for failures that should be retried (e.g. an empty response)."""
+
+    def __init__(self, message: str, response: Any = None):
+        super().__init__(message)
+        self.response = response
+
+
+def _response_of(error: BaseException):
+    return getattr(error, "response", None)
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and _response_of(error) is not None:
+        status = getattr(_response_of(error), "status_code", None)
+    return status
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read Retry-After (seconds or HTTP date) or retry-after-ms from an SDK or requests error."""
+    response = _response_of(error)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    status = status_code_of(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    if isinstance(error, RetryableError):
+        return True
+    # Connection resets and timeouts from httpx/requests and the SDKs built on them
+    name = type(error).__name__
+    return any(marker in name for marker in ("Connection", "Timeout", "Transport"))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ProviderRateLimiter:
+    """
+    Process-wide limiter keyed by provider, since published limits are per
+    account rather than per model. Each call waits for request/token budget
+    and a concurrency slot, and is retried with jittered exponential backoff
+    on 429s and transient errors, honouring Retry-After.
+    """
+
+    def __init__(self, enabled: bool = True, db_path: Optional[str] = None, max_attempts: int = 5):
+        self.enabled = enabled
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._concurrency: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"calls": 0, "throttled": 0, "retries": 0, "waited_ms": 0}
+
+    def bucket(self, provider: str) -> TokenBucket:
+        """The provider's bucket, shared by every model on it."""
+        with self._lock:
+            if provider not in self._buckets:
+                limits = limits_for(provider)
+                if self.db_path:
+                    self._buckets[provider] = SQLiteTokenBucket(limits, self.db_path, provider)
+                else:
+                    self._buckets[provider] = TokenBucket(limits)
+            return self._buckets[provider]
+
+    def concurrency(self, provider: str) -> AdaptiveConcurrencyLimiter:
+        with self._lock:
+            if provider not in self._concurrency:
+                self._concurrency[provider] = AdaptiveConcurrencyLimiter(max_limit=limits_for(provider).max_concurrency)
+            return self._concurrency[provider]
+
+    def call(self, provider: str, model: str, func: Callable[[], T], estimated_tokens: int = 0) -> T:
+        """
+        Run func under the provider's limits, retrying retryable failures.
+        When limits are disabled the call still gets retries and backoff.
+        """
+        bucket = self.bucket(provider) if self.enabled else None
+        limiter = self.concurrency(provider) if self.enabled else None
+        attempt = 0
+        while True:
+            wait = bucket.reserve(estimated_tokens) if bucket else 0.0
+            if wait > 0:
+                with tracer.start_span("rate_limit.wait", provider=provider, model=model, wait_ms=round(wait * 1000)):
+                    time.sleep(wait)
+                self._count("waited_ms", int(wait * 1000))
+
+            if limiter:
+                limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = func()
+            except Exception as e:
+                throttled = status_code_of(e) == 429
+                if limiter:
+                    # A failed call's latency says nothing about capacity; only 429s move the limit
+                    limiter.release(throttled=throttled)
+                attempt += 1
+                if not is_retryable(e) or attempt >= self.max_attempts:
+                    raise
+                retry_after = retry_after_seconds(e)
+                if throttled:
+                    self._count("throttled")
+                    if retry_after and bucket:
+                        bucket.block(retry_after)
+                delay = max(retry_after or 0.0, backoff_delay(attempt))
+                self._count("retries")
+                logger.warning(
+                    f"{provider} {model} call failed ({type(e).__name__}: {e}); "
+                    f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s"
+                )
+                with tracer.start_span("rate_limit.backoff", provider=provider, model=model, attempt=attempt, delay_ms=round(delay * 1000)):
+                    time.sleep(delay)
+                continue
+            if limiter:
+                limiter.release(time.monotonic() - started)
+            self._count("calls")
+            return result
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters and concurrency limits, for the metrics endpoint."""
+        with self._lock:
+            return {
+                **self.stats,
+                "concurrency": {
+                    provider: {"limit": round(limiter.limit, 2), "in_flight": limiter.in_flight}
+                    for provider, limiter in self._concurrency.items()
+                },
+            }
+
+
+rate_limiter = ProviderRateLimiter(
+    enabled=os.getenv("RATE_LIMITS_ENABLED", "false").lower() == "true",
+    db_path=os.getenv("RATE_LIMIT_DB_PATH") or None,
+    max_attempts=int(os.getenv("RATE_LIMIT_MAX_ATTEMPTS", "5")),
+)
@@ -0,0 +1,106 @@
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Union
+
+from app.schemas import (
+    ArticleStructure,
+    LongArticleStructure,
+    MediumArticleStructure,
+    Scene,
+    ShortArticleStructure,
+)
+
+ArticleContent = Union[ShortArticleStructure, MediumArticleStructure, LongArticleStructure]
+
+
+@dataclass
+class SceneRef:
+    """
+    One scene's place in an article.
+
+    `path` is stable for a given outline and names every level:
+    "scenes/2" (short), "intro/0", "headings/1/scenes/0",
+    "headings/1/sub_headings/0/scenes/1",
+    "headings/1/sub_headings/0/sub_headings/0/scenes/0", "conclusion/1".
+    `headings` holds the titles of the sections it sits in, outermost first.
+    """
+    path: str
+    scene: Scene
+    headings: List[str] = field(default_factory=list)
+    position: int = 0  # reading order across the whole article
+    previous: Optional["SceneRef"] = field(default=None, repr=False)
+    next: Optional["SceneRef"] = field(default=None, repr=False)
+
+    def in_subtree(self, prefix: str) -> bool:
+        """Whether this scene is `prefix` or inside the section it names."""
+        prefix = prefix.strip("/")
+        return self.path == prefix or self.path.startswith(prefix + "/")
+
+    def summary(self) -> dict:
+        return {
+            "path": self.path,
+            "position": self.position,
+            "headings": self.headings,
+            "scene_description": self.scene.scene_description,
+            "written": self.scene.script is not None or bool(self.scene.text),
+            "image_url": self.scene.image_url,
+            "previous": self.previous.path if self.previous else None,
+            "next": self.next.path if self.next else None,
+        }
+
+
+def _walk(content: ArticleContent) -> Iterator[tuple]:
+    """(path, headings, scene) in reading order."""
+    if isinstance(content, ShortArticleStructure):
+        for i, scene in enumerate(content.scenes):
+            yield f"scenes/{i}", [], scene
+        return
+
+    for i, scene in enumerate(content.intro_paragraphs):
+        yield f"intro/{i}", [], scene
+    for h, heading in enumerate(content.main_headings):
+        heading_path = f"headings/{h}"
+        for i, scene in enumerate(heading.scenes):
+            yield f"{heading_path}/scenes/{i}", [heading.title], scene
+        if not isinstance(content, LongArticleStructure):
+            continue  # medium outlines may carry sub_headings, but they are never written
+        for s, sub in enumerate(heading.sub_headings):
+            sub_path = f"{heading_path}/sub_headings/{s}"
+            for i, scene in enumerate(sub.scenes):
+                yield f"{sub_path}/scenes/{i}", [heading.title, sub.title], scene
+            for t, subsub in enumerate(sub.sub_headings):
+                subsub_path = f"{sub_path}/sub_headings/{t}"
+                for i, scene in enumerate(subsub.scenes):
+                    yield f"{subsub_path}/scenes/{i}", [heading.title, sub.title, subsub.title], scene
+    for i, scene in enumerate(content.conclusion_paragraphs):
+        yield f"conclusion/{i}", [], scene
+
+
+def index_scenes(article: Union[ArticleStructure, ArticleContent]) -> List[SceneRef]:
+    """Every scene of an article in reading order, linked to its neighbours."""
+    content = article.content if isinstance(article, ArticleStructure) else article
+    refs = [
+        SceneRef(path=path, scene=scene, headings=headings, position=position)
+        for position, (path, headings, scene) in enumerate(_walk(content))
+    ]
+    for previous, following in zip(refs, refs[1:]):
+        previous.next = following
+        following.previous = previous
+    return refs
+
+
+def select_scenes(article: Union[ArticleStructure, ArticleContent], path: str) -> List[SceneRef]:
+    """The scene at `path`, or every scene under the section it names. Raises ValueError when nothing matches."""
+    selected = [ref for ref in index_scenes(article) if ref.in_subtree(path)]
+    if not selected:
+        raise ValueError(f"No scene or section at path: {path}")
+    return selected
+
+
+def outline_of(article: ArticleStructure) -> ArticleStructure:
+    """A copy of the article with every scene's text, script and image removed, as the writer's plan."""
+    outline = ArticleStructure(length=article.length, content=article.content.model_copy(deep=True))
+    for ref in index_scenes(outline):
+        ref.scene.text = None
+        ref.scene.script = None
+        ref.scene.image_url = None
+    return outline
@@ -0,0 +1,160 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from app.schemas import Paragraph, SceneLine, SceneScript
+
+SPEECH_VERBS = (
+    "said", "says", "asked", "asks", "replied", "replies", "answered", "shouted", "yelled", "whispered",
+    "muttered", "murmured", "called", "cried", "added", "continued", "told", "explained", "snapped",
+    "laughed", "sighed", "growled", "demanded", "insisted", "agreed", "admitted", "warned", "offered",
+    "repeated", "screamed", "breathed", "hissed", "grunted", "mumbled", "pleaded", "protested",
+    "remarked", "responded", "stammered", "suggested", "wondered", "exclaimed", "began", "went on",
+)
+PRONOUNS = ("he", "she", "they", "i", "we")
+# Capitalised words that start sentences but are never speaker names
+NOT_NAMES = {
+    "The", "A", "An", "Then", "But", "And", "So", "When", "As", "After", "Before", "Now", "Still", "Finally",
+    "His", "Her", "Their", "My", "Our", "It", "This", "That", "There", "Someone", "Everyone", "Nobody",
+    "He", "She", "They", "I", "We", "You",
+}
+
+_VERB = r"(?:" + "|".join(SPEECH_VERBS) + r")"
+_NAME = r"[A-Z][\w'\-]+(?:\s[A-Z][\w'\-]+)?"
+_PRONOUN = r"(?:" + "|".join(PRONOUNS) + r")"
+
+# "said Jane." / "Danny said." / "he said softly," straight after a quote. The verb
+# must end the clause, so narration like "They continued to talk" isn't a tag.
+_TAG_END = r"(?:\s+\w+ly)?\s*(?:[,.;!?]|$)"
+_TAG_VERB_NAME = re.compile(rf"^\s*,?\s*{_VERB}\s+(?P<name>{_NAME})\b")
+_TAG_NAME_VERB = re.compile(rf"^\s*,?\s*(?P<name>{_NAME})\s+(?:\w+ly\s+)?{_VERB}{_TAG_END}")
+_TAG_PRONOUN = re.compile(rf"^\s*,?\s*(?P<pronoun>{_PRONOUN})\s+(?:\w+ly\s+)?{_VERB}{_TAG_END}", re.IGNORECASE)
+# "John turned to Jane and said," right before a quote
+_LEAD_NAME = re.compile(rf"(?:^\s*|[.!?]\s+)(?P<name>{_NAME})\b[^.!?\"]*\b{_VERB}\b[^.!?\"]*[,:]\s*$")
+_LEAD_PRONOUN = re.compile(rf"(?:^\s*|[.!?]\s+)(?P<pronoun>{_PRONOUN})\b[^.!?\"]*\b{_VERB}\b[^.!?\"]*[,:]\s*$", re.IGNORECASE)
+
+_QUOTE = re.compile(r'"([^"]*)"')
+# 'Hello,' he said — dialogue in single quotes isn't handled, so it lowers confidence
+_SINGLE_QUOTED_DIALOGUE = re.compile(r"(?:^|\s)'[A-Z]")
+
+# Credit each quote earns towards the confidence score, by how its speaker was found
+_CREDIT = {"tag": 1.0, "paragraph": 0.9, "pronoun": 0.5, "alternation": 0.5, "unknown": 0.0}
+
+
+@dataclass
+class ScriptParseResult:
+    script: SceneScript
+    confidence: float
+    quotes: int = 0
+    unresolved: List[str] = field(default_factory=list)
+
+
+def _name(candidate: Optional[str]) -> Optional[str]:
+    if not candidate:
+        return None
+    if candidate.split()[0] in NOT_NAMES:
+        return None
+    return candidate.title()
+
+
+def _tagged_speaker(before: str, after: str) -> Tuple[Optional[str], Optional[str]]:
+    """(name, method) from a named tag after or leading into the quote, else a pronoun tag."""
+    for pattern in (_TAG_VERB_NAME, _TAG_NAME_VERB):
+        match = pattern.match(after)
+        if match and _name(match.group("name")):
+            return _name(match.group("name")), "tag"
+    match = _LEAD_NAME.search(before)
+    if match and _name(match.group("name")):
+        return _name(match.group("name")), "tag"
+    if _TAG_PRONOUN.match(after) or _LEAD_PRONOUN.search(before):
+        return None, "pronoun"
+    return None, None
+
+
+def _normalize_quotes(text: str) -> str:
+    return text.replace("“", '"').replace("”", '"').replace("’", "'").replace("‘", "'")
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    blocks = [block.strip() for block in re.split(r"\n\s*\n", text) if block.strip()]
+    if len(blocks) == 1:
+        blocks = [line.strip() for line in blocks[0].split("\n") if line.strip()]
+    return blocks
+
+
+def parse_scene_script(text: str, scene_title: str = "Scene") -> ScriptParseResult:
+    """
+    Split prose into narrator and speaker SceneLines without an LLM.
+
+    Dialogue is any double-quoted span. Its speaker comes from the attribution
+    tag after it ("said Jane.", "Danny said.") or leading into it ("John turned
+    to Jane and said,"), then from other quotes in the same paragraph, then
+    from turn-taking between the last two speakers. The confidence is the
+    mean credit over all quotes (1.0 for pure narration) and drops to 0 when
+    quotes are unbalanced.
+    """
+    text = _normalize_quotes(text)
+    paragraphs: List[Paragraph] = []
+    credits: List[float] = []
+    unresolved: List[str] = []
+    speakers: List[str] = []  # order in which characters last spoke
+    balanced = True
+
+    for block in _split_paragraphs(text):
+        if block.count('"') % 2:
+            balanced = False
+        pieces = _QUOTE.split(block)  # narration, quote, narration, quote, ...
+        quotes = []
+        for index in range(1, len(pieces), 2):
+            before = pieces[index - 1]
+            after = pieces[index + 1] if index + 1 < len(pieces) else ""
+            name, method = _tagged_speaker(before, after)
+            quotes.append([index, name, method])
+
+        # Untagged quotes in a paragraph with a named tag belong to the same speaker
+        paragraph_speakers = {name for _, name, _ in quotes if name}
+        paragraph_speaker = paragraph_speakers.pop() if len(paragraph_speakers) == 1 else None
+
+        lines: List[SceneLine] = []
+        last_in_paragraph: Optional[str] = None
+        for position, piece in enumerate(pieces):
+            if position % 2 == 0:
+                narration = piece.strip()
+                if narration and re.search(r"\w", narration):
+                    lines.append(SceneLine(speaker="Narrator", text=narration))
+                continue
+
+            _, name, method = next(quote for quote in quotes if quote[0] == position)
+            if name is None:
+                if paragraph_speaker:
+                    name, method = paragraph_speaker, method or "paragraph"
+                elif last_in_paragraph and method is None:
+                    # A follow-on quote in the same paragraph continues the same turn
+                    name, method = last_in_paragraph, "paragraph"
+                elif speakers:
+                    # Turn-taking: the other party in a two-person exchange, or the only speaker so far
+                    name = speakers[-2] if len(speakers) >= 2 else speakers[-1]
+                    method = method or "alternation"
+                else:
+                    name, method = "Unknown", "unknown"
+                    unresolved.append(piece.strip()[:60])
+            credits.append(_CREDIT[method])
+            last_in_paragraph = name
+            if name != "Unknown":
+                if name in speakers:
+                    speakers.remove(name)
+                speakers.append(name)
+            lines.append(SceneLine(speaker=name, text=piece.strip()))
+
+        if lines:
+            paragraphs.append(Paragraph(lines=lines))
+
+    confidence = sum(credits) / len(credits) if credits else 1.0
+    if not balanced or _SINGLE_QUOTED_DIALOGUE.search(text):
+        confidence = 0.0 if not balanced else min(confidence, 0.5)
+    return ScriptParseResult(
+        script=SceneScript(scene_title=scene_title, paragraphs=paragraphs),
+        confidence=round(confidence, 3),
+        quotes=len(credits),
+        unresolved=unresolved,
+    )
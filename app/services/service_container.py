@@ -0,0 +1,196 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from dotenv import load_dotenv
+
+from app.database import ArticleDB
+
+logger = logging.getLogger(__name__)
+
+load_dotenv(Path(__file__).parent.parent.parent / '.env')
+
+
+class ServiceContainer:
+    """
+    Holds the API clients and services shared by every request.
+
+    Nothing is constructed at import time: each client is built on first use,
+    so the server boots without any API keys and only pays for the SDKs a
+    request actually needs. The heavy SDK imports happen inside the factories
+    for the same reason.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._instances: Dict[str, Any] = {}
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    logger.info(f"Creating shared {name}")
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    @property
+    def db(self) -> ArticleDB:
+        def create_db():
+            db = ArticleDB()
+            db.create_tables()
+            return db
+        return self._get("db", create_db)
+
+    def http_client(self, name: str):
+        """One pooled keep-alive httpx client per API host."""
+        def create_http_client():
+            from app.services.provider_service import create_pooled_http_client
+            return create_pooled_http_client()
+        return self._get(f"http_client.{name}", create_http_client)
+
+    @property
+    def openai_client(self):
+        def create_openai():
+            import openai
+            return openai.OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=self.http_client("openai"),
+                # The shared rate limiter retries, enabled or not; SDK retries would stack on top
+                max_retries=0
+            )
+        return self._get("openai_client", create_openai)
+
+    @property
+    def anthropic_client(self):
+        def create_anthropic():
+            from anthropic import Anthropic
+            return Anthropic(
+                api_key=os.getenv("ANTHROPIC_API_KEY"),
+                http_client=self.http_client("anthropic"),
+                # The shared rate limiter retries, enabled or not; SDK retries would stack on top
+                max_retries=0
+            )
+        return self._get("anthropic_client", create_anthropic)
+
+    @property
+    def anthropic_instructor_client(self):
+        def create_instructor():
+            import instructor
+            return instructor.from_anthropic(self.anthropic_client)
+        return self._get("anthropic_instructor_client", create_instructor)
+
+    @property
+    def elevenlabs_client(self):
+        def create_elevenlabs():
+            from elevenlabs import ElevenLabs
+            return ElevenLabs(
+                api_key=os.getenv("ELEVENLABS_API_KEY"),
+                base_url=os.getenv("ELEVENLABS_BASE_URL"),
+                httpx_client=self.http_client("elevenlabs")
+            )
+        return self._get("elevenlabs_client", create_elevenlabs)
+
+    @property
+    def retrodiffusion_session(self):
+        """Pooled requests session for the Retro-Diffusion API."""
+        def create_session():
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+        return self._get("retrodiffusion_session", create_session)
+
+    def provider(self, name: str):
+        """
+        The Provider implementation for "openai" or "anthropic". With
+        LLM_HEDGING=true it is wrapped to hedge slow calls and fail over to the
+        other provider, when that provider's API key is configured.
+        """
+        if os.getenv("LLM_HEDGING", "false").lower() != "true":
+            return self._base_provider(name)
+
+        def create_hedged_provider():
+            from app.services.hedging_service import HedgedProvider
+            other = "anthropic" if name == "openai" else "openai"
+            return HedgedProvider(
+                self._base_provider(name),
+                lambda: self._base_provider(other) if os.getenv(f"{other.upper()}_API_KEY") else None
+            )
+        return self._get(f"provider.hedged.{name}", create_hedged_provider)
+
+    def _base_provider(self, name: str):
+        if name == "anthropic":
+            def create_anthropic_provider():
+                from app.services.provider_service import AnthropicProvider
+                return AnthropicProvider(self.anthropic_client, self.anthropic_instructor_client)
+            return self._get("provider.anthropic", create_anthropic_provider)
+        if name == "openai":
+            def create_openai_provider():
+                from app.services.provider_service import OpenAIProvider
+                return OpenAIProvider(self.openai_client)
+            return self._get("provider.openai", create_openai_provider)
+        raise ValueError(f"Unknown provider: {name}")
+
+    def warm_up(self):
+        """
+        Open connections to every provider that has an API key configured, so
+        the first article doesn't pay for DNS and TLS setup. Providers without
+        keys are skipped; failures are only logged.
+        """
+        if os.getenv("OPENAI_API_KEY"):
+            self.provider("openai").warm_up()
+        if os.getenv("ANTHROPIC_API_KEY"):
+            self.provider("anthropic").warm_up()
+        if os.getenv("RETRODIFFUSION_API_KEY"):
+            from app.services.image_service import RETRODIFFUSION_URL
+            try:
+                self.retrodiffusion_session.head(RETRODIFFUSION_URL, timeout=5.0)
+            except Exception as e:
+                logger.warning(f"Connection warm-up to {RETRODIFFUSION_URL} failed: {e}")
+        if os.getenv("ELEVENLABS_API_KEY"):
+            from app.services.provider_service import warm_up_connection
+            warm_up_connection(self.http_client("elevenlabs"), os.getenv("ELEVENLABS_BASE_URL") or "https://api.elevenlabs.io")
+
+    @property
+    def audio_service(self):
+        def create_audio_service():
+            from app.services.audio_service import AudioService
+            return AudioService()
+        return self._get("audio_service", create_audio_service)
+
+    @property
+    def image_service(self):
+        def create_image_service():
+            from app.services.image_service import ImageService
+            return ImageService()
+        return self._get("image_service", create_image_service)
+
+    def is_created(self, name: str) -> bool:
+        return name in self._instances
+
+    def close(self):
+        """Close any clients holding open connections."""
+        with self._lock:
+            # Close the SDK clients before the http clients they share
+            for name, instance in sorted(self._instances.items(), key=lambda item: item[0].startswith("http_client.")):
+                close = getattr(instance, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as e:
+                        logger.warning(f"Error closing {name}: {e}")
+            self._instances.clear()
+
+
+services = ServiceContainer()
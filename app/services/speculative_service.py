@@ -0,0 +1,135 @@
+import difflib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.schemas import ArticleStructure, GenerationStats, Scene, SceneScript
+from app.services.llm_service import write_scene
+from app.services.scene_index_service import index_scenes, outline_of
+from app.services.tracing_service import tracer
+
+logger = logging.getLogger(__name__)
+
+# How many opening scenes to draft while the plan is critiqued
+SPECULATIVE_SCENES = int(os.getenv("SPECULATIVE_SCENES", "3"))
+# How close a revised scene's description and must_include must stay to its draft's for the draft to be kept
+SPECULATIVE_MIN_SIMILARITY = float(os.getenv("SPECULATIVE_MIN_SIMILARITY", "0.9"))
+
+
+@dataclass
+class SpeculativeDraft:
+    """A scene written from the first outline, with what it was written against and what writing it took."""
+    path: str
+    scene_description: str
+    must_include: str
+    script: SceneScript
+    seconds: float
+    stats: GenerationStats = field(default_factory=GenerationStats)
+
+
+def scene_similarity(draft: SpeculativeDraft, scene: Scene) -> float:
+    """0-1 similarity of a revised scene's description and must_include to the draft's, ignoring case and spacing."""
+    def normalize(description: str, must_include: str) -> str:
+        return " ".join(f"{description}\n{must_include}".lower().split())
+
+    return difflib.SequenceMatcher(
+        None,
+        normalize(draft.scene_description, draft.must_include),
+        normalize(scene.scene_description, scene.must_include),
+    ).ratio()
+
+
+class SpeculativeDrafter:
+    """
+    Writes the opening scenes of the first outline, in reading order, while
+    the plan is critiqued and restructured. Call run() in a worker thread and
+    stop() once the revised outline is in; drafts finished by then are in
+    `drafts`, and the one in flight is abandoned.
+
+    Each draft sees the drafts before it as the article so far, so only an
+    unbroken run of matching opening scenes can be kept (see accept).
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        original_plan: str,
+        structured_plan: ArticleStructure,
+        count: int = SPECULATIVE_SCENES,
+        **write_options
+    ):
+        self.topic = topic
+        self.original_plan = original_plan
+        self.structured_plan = structured_plan
+        self.count = count
+        self.write_options = write_options
+        self.drafts: List[SpeculativeDraft] = []
+        self._stopped = threading.Event()
+
+    def run(self):
+        article = outline_of(self.structured_plan)
+        with tracer.start_span("stage.speculative_draft", scenes=self.count) as span:
+            for ref in index_scenes(article)[:self.count]:
+                if self._stopped.is_set():
+                    break
+                started = time.perf_counter()
+                stats = GenerationStats()
+                try:
+                    script = write_scene(
+                        self.topic, self.original_plan, self.structured_plan, article, ref.scene,
+                        stats=stats, **self.write_options
+                    )
+                except Exception as e:
+                    # Speculation is best effort; the write stage writes the scene for real
+                    logger.warning(f"Speculative draft of {ref.path} failed: {str(e)}")
+                    break
+                if self._stopped.is_set():
+                    break
+                self.drafts.append(SpeculativeDraft(
+                    path=ref.path,
+                    scene_description=ref.scene.scene_description,
+                    must_include=ref.scene.must_include,
+                    script=script,
+                    seconds=time.perf_counter() - started,
+                    stats=stats,
+                ))
+            if span:
+                span.set_attribute("drafts", len(self.drafts))
+
+    def stop(self) -> List[SpeculativeDraft]:
+        """Stop drafting and return the drafts finished so far."""
+        self._stopped.set()
+        return list(self.drafts)
+
+
+def accept(
+    drafts: List[SpeculativeDraft],
+    revised_plan: ArticleStructure,
+    stats: Optional[GenerationStats] = None,
+    min_similarity: float = SPECULATIVE_MIN_SIMILARITY
+) -> List[SceneScript]:
+    """
+    The drafts to keep for the revised outline: the longest opening run whose
+    scenes are at the same path with a nearly unchanged description and
+    must_include. Records hits and the drafting time taken off the critical
+    path in `stats`, and adds in the kept drafts' own counters, since their
+    scenes are part of the article.
+    """
+    kept: List[SpeculativeDraft] = []
+    for draft, ref in zip(drafts, index_scenes(revised_plan)):
+        if draft.path != ref.path or scene_similarity(draft, ref.scene) < min_similarity:
+            break
+        kept.append(draft)
+
+    logger.info(f"Keeping {len(kept)} of {len(drafts)} speculative drafts")
+    if stats is not None:
+        stats.speculative_drafts += len(drafts)
+        stats.speculative_hits += len(kept)
+        stats.speculative_ms_saved += round(sum(draft.seconds for draft in kept) * 1000)
+        for draft in kept:
+            for name, value in draft.stats:
+                setattr(stats, name, getattr(stats, name) + value)
+    return [draft.script for draft in kept]
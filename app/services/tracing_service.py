@@ -0,0 +1,258 @@
+import functools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Span currently active in this context (thread or asyncio task)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """A single timed operation. Field names follow the OpenTelemetry span model."""
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.status = "OK"
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_unix_nano or time.time_ns()
+        return (end - self.start_time_unix_nano) / 1_000_000
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Serialize the span in the OTLP/JSON shape understood by OpenTelemetry collectors."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(self.end_time_unix_nano or time.time_ns()),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2 if self.status == "ERROR" else 1, "message": self.status_message or ""},
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class ConsoleSpanExporter:
+    """Logs each finished span on a single line."""
+
+    def export(self, span: Span):
+        logger.info(
+            f"[trace {span.trace_id[:8]}] {span.name} {span.duration_ms:.1f}ms "
+            f"status={span.status} {span.attributes}"
+        )
+
+    def export_trace(self, trace_id: str, spans: List[Span]):
+        pass
+
+
+class JSONFileSpanExporter:
+    """Writes each finished trace to <directory>/<trace_id>.json in OTLP/JSON format."""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: Span):
+        pass
+
+    def export_trace(self, trace_id: str, spans: List[Span]):
+        path = self.directory / f"{trace_id}.json"
+        with open(path, "w") as f:
+            json.dump(to_otlp_payload(spans), f, indent=2)
+
+
+def to_otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", "longslop")]},
+            "scopeSpans": [{
+                "scope": {"name": "app.services.tracing_service"},
+                "spans": [span.to_otlp() for span in spans],
+            }],
+        }]
+    }
+
+
+class Tracer:
+    """
+    Minimal in-process tracer. Spans are kept in memory per trace so a finished
+    article's waterfall can be fetched later; the oldest traces are evicted once
+    max_traces is reached.
+    """
+
+    def __init__(self, max_traces: int = 100, exporters: Optional[list] = None):
+        self.max_traces = max_traces
+        self.exporters = exporters or []
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes) -> Iterator[Span]:
+        """Start a new trace whose root span is `name`."""
+        trace_id = secrets.token_hex(16)
+        with self._lock:
+            self._traces[trace_id] = []
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        try:
+            with self._run_span(Span(name, trace_id, attributes=attributes)) as span:
+                yield span
+        finally:
+            spans = self.get_trace(trace_id) or []
+            for exporter in self.exporters:
+                try:
+                    exporter.export_trace(trace_id, spans)
+                except Exception as e:
+                    logger.error(f"Error exporting trace {trace_id}: {e}")
+
+    @contextmanager
+    def start_span(self, name: str, **attributes) -> Iterator[Optional[Span]]:
+        """
+        Start a child of the current span. Outside of a trace this is a no-op
+        and yields None, so services can be used without tracing.
+        """
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        with self._run_span(Span(name, parent.trace_id, parent.span_id, attributes)) as span:
+            yield span
+
+    @contextmanager
+    def _run_span(self, span: Span) -> Iterator[Span]:
+        with self._lock:
+            if span.trace_id in self._traces:
+                self._traces[span.trace_id].append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators may be finalized from a different context
+                _current_span.set(None)
+            for exporter in self.exporters:
+                try:
+                    exporter.export(span)
+                except Exception as e:
+                    logger.error(f"Error exporting span {span.name}: {e}")
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator that runs the wrapped function inside a span named after it."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def get_trace(self, trace_id: str) -> Optional[List[Span]]:
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return list(spans) if spans is not None else None
+
+    def list_traces(self) -> List[Dict[str, Any]]:
+        """Summaries of the traces kept in memory, newest first."""
+        with self._lock:
+            traces = list(self._traces.items())
+        summaries = []
+        for trace_id, spans in reversed(traces):
+            if not spans:
+                continue
+            root = spans[0]
+            summaries.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "attributes": root.attributes,
+                "duration_ms": round(root.duration_ms, 1),
+                "finished": root.end_time_unix_nano is not None,
+                "span_count": len(spans),
+            })
+        return summaries
+
+    def waterfall(self, trace_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Flatten a trace into rows ordered by start time, with offsets relative to the root span."""
+        spans = self.get_trace(trace_id)
+        if not spans:
+            return None
+        origin = min(span.start_time_unix_nano for span in spans)
+        depths: Dict[str, int] = {}
+        rows = []
+        for span in sorted(spans, key=lambda s: s.start_time_unix_nano):
+            depth = depths.get(span.parent_span_id, -1) + 1 if span.parent_span_id else 0
+            depths[span.span_id] = depth
+            rows.append({
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_span_id": span.parent_span_id,
+                "depth": depth,
+                "offset_ms": round((span.start_time_unix_nano - origin) / 1_000_000, 1),
+                "duration_ms": round(span.duration_ms, 1),
+                "status": span.status,
+                "attributes": span.attributes,
+            })
+        return rows
+
+
+def _default_exporters() -> list:
+    exporters = []
+    if os.getenv("TRACE_CONSOLE", "false").lower() == "true":
+        exporters.append(ConsoleSpanExporter())
+    if os.getenv("TRACE_EXPORT_DIR"):
+        exporters.append(JSONFileSpanExporter(os.getenv("TRACE_EXPORT_DIR")))
+    return exporters
+
+
+tracer = Tracer(
+    max_traces=int(os.getenv("TRACE_MAX_TRACES", "100")),
+    exporters=_default_exporters(),
+)
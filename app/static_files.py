@@ -0,0 +1,153 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, PathLike, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always written
+    brotli = None
+
+# main.py serves STATIC_DIR at STATIC_URL
+STATIC_DIR = "static"
+STATIC_URL = "/static"
+# Where the image cache is served from when IMAGE_CACHE_DIR is outside STATIC_DIR
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(STATIC_DIR, "images"))
+IMAGE_CACHE_URL = "/image-cache"
+
+# Generated files carry a hex content digest in their name, e.g. story-3f2a....mp3
+HASHED_NAME = re.compile(r"-(?P<digest>[0-9a-f]{16})\.")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Unhashed files (index.html, script.js) may change, so browsers revalidate with the ETag
+REVALIDATE = "no-cache"
+
+COMPRESSIBLE = (".html", ".js", ".css", ".svg", ".json", ".txt", ".map")
+# (Accept-Encoding token, file suffix), in order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def content_digest(data: bytes) -> str:
+    """Short hex digest used in generated file names."""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def static_url(directory: str) -> Optional[str]:
+    """The URL path the static mount serves `directory` under, or None if it is outside STATIC_DIR."""
+    try:
+        relative = os.path.relpath(os.path.abspath(directory), os.path.abspath(STATIC_DIR))
+    except ValueError:  # another drive on Windows
+        return None
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    return STATIC_URL if relative == os.curdir else f"{STATIC_URL}/{relative.replace(os.sep, '/')}"
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def precompress_directory(directory: str, extensions: Iterable[str] = COMPRESSIBLE, min_size: int = 256) -> int:
+    """
+    Write .gz (and .br when brotli is installed) next to every text asset
+    under `directory` whose variant is missing or older than the file.
+    Returns how many variants were written.
+    """
+    written = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not name.endswith(tuple(extensions)):
+                continue
+            path = os.path.join(root, name)
+            if os.path.getsize(path) < min_size:
+                continue
+            with open(path, "rb") as f:
+                data = None
+                for suffix, compress in ((".gz", lambda d: gzip.compress(d, 9, mtime=0)),
+                                         (".br", brotli and (lambda d: brotli.compress(d, quality=11)))):
+                    if compress is None:
+                        continue
+                    variant = path + suffix
+                    if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+                        continue
+                    data = data if data is not None else f.read()
+                    with open(variant, "wb") as out:
+                        out.write(compress(data))
+                    written += 1
+    return written
+
+
+class _FileResponse(FileResponse):
+    def _should_use_range(self, http_if_range: str, stat_result: os.stat_result) -> bool:
+        # Honour If-Range against our content ETag rather than Starlette's mtime-based one
+        return http_if_range == self.headers.get("etag") or super()._should_use_range(http_if_range, stat_result)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with strong content ETags, long-lived immutable caching for
+    content-hashed names, and precompressed .br/.gz variants for clients that
+    accept them. Range requests (audio seeking) are answered with 206 partial
+    content by Starlette's FileResponse; If-Range is checked against the ETag.
+    """
+
+    def file_response(
+        self,
+        full_path: PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = os.fspath(full_path)
+        name = os.path.basename(path)
+        hashed = HASHED_NAME.search(name)
+        digest = hashed.group("digest") if hashed else _file_digest(path, stat_result.st_mtime_ns, stat_result.st_size)
+
+        headers = {
+            "cache-control": IMMUTABLE if hashed else REVALIDATE,
+            "etag": f'"{digest}"',
+        }
+        variant = None
+        if name.endswith(COMPRESSIBLE) and "range" not in request_headers:
+            headers["vary"] = "Accept-Encoding"
+            variant = self._encoded_variant(path, stat_result, request_headers.get("accept-encoding", ""))
+
+        if variant:
+            encoding, variant_path, variant_stat = variant
+            headers["etag"] = f'"{digest}-{encoding}"'
+            headers["content-encoding"] = encoding
+            response = _FileResponse(variant_path, status_code=status_code, stat_result=variant_stat, headers=headers,
+                                     media_type=mimetypes.guess_type(path)[0] or "text/plain")
+        else:
+            response = _FileResponse(path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    @staticmethod
+    def _encoded_variant(path: str, stat_result: os.stat_result, accept_encoding: str) -> Optional[tuple]:
+        accepted = {token.split(";")[0].strip() for token in accept_encoding.lower().split(",")}
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            try:
+                variant_stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            # A variant older than its source is stale; serve the source instead
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                return encoding, path + suffix, variant_stat
+        return None
@@ -0,0 +1,593 @@
+"""
+Local stand-ins for the OpenAI, Anthropic, ElevenLabs and Retro-Diffusion APIs.
+
+Each provider runs as its own threaded HTTP server on 127.0.0.1 and answers the
+endpoints the app uses with well-formed (if meaningless) payloads. Latency,
+error rates and 429 behaviour are configurable per provider so the pipeline can
+be benchmarked reproducibly without API keys.
+
+    providers = start_fake_providers(FakeProvidersConfig())
+    os.environ.update(providers.env())
+    ...
+    providers.stop()
+
+Run as a script to keep the servers up for manual testing:
+
+    python -m benchmarks.fake_providers --latency-ms 200
+"""
+import argparse
+import base64
+import copy
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# 1x1 transparent PNG
+TINY_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)).decode()
+
+# A silent MPEG-1 Layer III frame, repeated to give each TTS line some size
+SILENT_MP3_FRAME = bytes.fromhex("fffb9064") + b"\x00" * 413
+
+NAMES = ["Danny", "Mara", "Elias", "Ruth", "Tomas", "Ines"]
+VERBS = ["said", "asked", "muttered", "called", "answered"]
+NARRATION = [
+    "The tide came in slow over the flats.",
+    "{name} pulled the rope tight and looked toward the harbor.",
+    "Nobody spoke for a while.",
+    "The lamp over the door swung in the wind.",
+    "{name} set the cup down and waited.",
+    "Rain had started again, thin and cold.",
+]
+DIALOGUE = [
+    "Net's caught again",
+    "We should have left before dark",
+    "You don't know that",
+    "Hand me the knife",
+    "It was never going to be enough",
+    "Where did you put the letters",
+]
+
+
+@dataclass
+class LatencyConfig:
+    """Lognormal time-to-first-byte plus a per-output-token cost, with an optional slow tail."""
+    median_ms: float = 50.0
+    sigma: float = 0.25
+    per_token_ms: float = 0.0
+    slow_rate: float = 0.0
+    slow_multiplier: float = 10.0
+    # Latency multiplier per model name, e.g. {"gpt-4o-mini": 0.4}
+    model_factors: Dict[str, float] = field(default_factory=dict)
+
+    def sample(self, rng: random.Random, output_tokens: int = 0, model: Optional[str] = None) -> float:
+        seconds = rng.lognormvariate(math.log(self.median_ms / 1000), self.sigma) if self.median_ms > 0 else 0.0
+        seconds += output_tokens * self.per_token_ms / 1000
+        seconds *= self.model_factors.get(model, 1.0)
+        if self.slow_rate and rng.random() < self.slow_rate:
+            seconds *= self.slow_multiplier
+        return seconds
+
+
+@dataclass
+class FakeProviderConfig:
+    latency: LatencyConfig = field(default_factory=LatencyConfig)
+    # Fraction of requests answered with a 500
+    error_rate: float = 0.0
+    # Requests per minute before answering 429 (0 disables the limit)
+    rate_limit_rpm: int = 0
+    # Approximate output size for free-text completions
+    output_tokens: int = 300
+    # When set, each article outline after the first repeats the previous one with this
+    # fraction of scene descriptions rewritten, as a critique-and-restructure pass would
+    outline_churn: Optional[float] = None
+    # When set, free-text critiques (the editor's brief) answer with this many tokens per scene
+    # in the outline they were given, as real critiques grow with the outline
+    critique_tokens_per_scene: int = 0
+
+
+@dataclass
+class FakeProvidersConfig:
+    openai: FakeProviderConfig = field(default_factory=FakeProviderConfig)
+    anthropic: FakeProviderConfig = field(default_factory=FakeProviderConfig)
+    elevenlabs: FakeProviderConfig = field(default_factory=lambda: FakeProviderConfig(latency=LatencyConfig(median_ms=20)))
+    retrodiffusion: FakeProviderConfig = field(default_factory=lambda: FakeProviderConfig(latency=LatencyConfig(median_ms=100)))
+    seed: int = 0
+
+    @classmethod
+    def uniform(cls, **provider_kwargs) -> "FakeProvidersConfig":
+        """Same settings for every provider."""
+        return cls(
+            openai=FakeProviderConfig(**provider_kwargs),
+            anthropic=FakeProviderConfig(**provider_kwargs),
+            elevenlabs=FakeProviderConfig(**provider_kwargs),
+            retrodiffusion=FakeProviderConfig(**provider_kwargs),
+        )
+
+
+class _TokenBucket:
+    def __init__(self, rpm: int):
+        self.capacity = rpm
+        self.tokens = float(rpm)
+        self.rate = rpm / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> Optional[float]:
+        """Take one token. Returns None on success or the seconds until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return None
+            return (1 - self.tokens) / self.rate
+
+
+# ---------------------------------------------------------------------------
+# Payload generation
+# ---------------------------------------------------------------------------
+
+def fake_prose(rng: random.Random, tokens: int) -> str:
+    """Prose with quoted dialogue and attribution tags, roughly `tokens` long."""
+    paragraphs = []
+    words = 0
+    while words * 1.3 < tokens:
+        name = rng.choice(NAMES)
+        sentences = [rng.choice(NARRATION).format(name=name)]
+        if rng.random() < 0.7:
+            sentences.append(f'"{rng.choice(DIALOGUE)}," {name} {rng.choice(VERBS)}.')
+        sentences.append(rng.choice(NARRATION).format(name=rng.choice(NAMES)))
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        words += len(paragraph.split())
+    return "\n\n".join(paragraphs)
+
+
+def instance_from_schema(schema: Dict[str, Any], rng: random.Random, defs: Optional[Dict[str, Any]] = None, key: str = "") -> Any:
+    """Build a value that validates against a (pydantic-generated) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", schema.get("definitions", {}))
+    if "$ref" in schema:
+        return instance_from_schema(defs[schema["$ref"].split("/")[-1]], rng, defs, key)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            options = [option for option in schema[combinator] if option.get("type") != "null"]
+            if len(options) < len(schema[combinator]):
+                # Optional fields are left empty, as the real models usually do
+                return None
+            return instance_from_schema(options[0], rng, defs, key)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+
+    schema_type = schema.get("type", "object")
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != "null"), "null")
+    if schema_type == "object":
+        return {
+            name: instance_from_schema(prop, rng, defs, name)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        # Keep nested outlines small so long articles stay tractable
+        count = rng.randint(1, 2) if key in ("sub_headings", "main_headings") else rng.randint(1, 3)
+        return [instance_from_schema(schema.get("items", {}), rng, defs, key) for _ in range(count)]
+    if schema_type == "string":
+        if key == "speaker":
+            return rng.choice(NAMES + ["Narrator", "Narrator"])
+        if key == "text":
+            return fake_prose(rng, 80)
+        if key == "revised_plan":
+            return fake_prose(rng, FakeProviderConfig.output_tokens)  # as long as a free-text critique
+        return f"{key.replace('_', ' ').title() or 'Value'} {rng.randint(1, 999)}"
+    if schema_type == "integer":
+        return rng.randint(0, 10)
+    if schema_type == "number":
+        return rng.random()
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    return None
+
+
+def _estimate_tokens(value: Any) -> int:
+    return max(1, len(json.dumps(value)) // 4)
+
+
+def revise_outline(outline: Dict[str, Any], churn: float, rng: random.Random) -> Dict[str, Any]:
+    """A copy of an outline with about `churn` of its scenes rewritten."""
+    revised = copy.deepcopy(outline)
+
+    def visit(node: Any):
+        if isinstance(node, dict):
+            if "scene_description" in node and rng.random() < churn:
+                node["scene_description"] = fake_prose(rng, 30)
+                node["must_include"] = fake_prose(rng, 10)
+            for value in node.values():
+                visit(value)
+        elif isinstance(node, list):
+            for value in node:
+                visit(value)
+
+    visit(revised)
+    return revised
+
+
+# ---------------------------------------------------------------------------
+# HTTP servers
+# ---------------------------------------------------------------------------
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, name: str, config: FakeProviderConfig, seed: int):
+        super().__init__(("127.0.0.1", 0), _FakeProviderHandler)
+        self.name = name
+        self.config = config
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.bucket = _TokenBucket(config.rate_limit_rpm) if config.rate_limit_rpm else None
+        self.last_outline: Optional[Dict[str, Any]] = None
+        self.outline_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def outline(self, name: str, instance: Any, rng: random.Random) -> Any:
+        """With outline_churn set, turn a fresh article outline into a revision of the last one."""
+        churn = self.config.outline_churn
+        if churn is not None and name.endswith("ArticlePlan") and isinstance(instance, dict):
+            # A fused critique: the outline is nested next to the revised plan
+            instance["outline"] = self.outline("ArticleStructure", instance["outline"], rng)
+            return instance
+        if churn is None or not name.endswith("ArticleStructure"):
+            return instance
+        with self.outline_lock:
+            previous, self.last_outline = self.last_outline, None
+            if previous is None:
+                self.last_outline = instance
+                return instance
+        return revise_outline(previous, churn, rng)
+
+    def free_text_tokens(self, body: Dict[str, Any]) -> int:
+        """Approximate output size of a free-text completion."""
+        tokens = self.config.output_tokens
+        prompt = json.dumps(body.get("messages"))
+        if self.config.critique_tokens_per_scene and "As an expert editor" in prompt:
+            tokens = self.config.critique_tokens_per_scene * prompt.count("scene_description")
+        return min(tokens, body.get("max_tokens") or 10**6)
+
+    def random(self) -> random.Random:
+        # Derive a per-request generator so concurrent handlers stay reproducible enough
+        with self.rng_lock:
+            return random.Random(self.rng.random())
+
+    def record(self, endpoint: str, status: int):
+        with self.stats_lock:
+            self.requests[endpoint] += 1
+            self.statuses[str(status)] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.stats_lock:
+            return {
+                "requests": dict(self.requests),
+                "statuses": dict(self.statuses),
+                "total": sum(self.requests.values()),
+                "rate_limited": self.statuses.get("429", 0),
+            }
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.requests.clear()
+            self.statuses.clear()
+
+
+class _FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeProviderServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        # Used for connection warm-up; any cheap 200 will do
+        self._send_json(200, {"object": "list", "data": []}, endpoint="GET " + self.path.split("?")[0])
+
+    def do_HEAD(self):
+        self.server.record("HEAD", 200)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        path = self.path.split("?")[0]
+        rng = self.server.random()
+        config = self.server.config
+
+        if self.server.bucket is not None:
+            wait = self.server.bucket.take()
+            if wait is not None:
+                self._send_json(
+                    429,
+                    {"error": {"type": "rate_limit_error", "message": "Rate limit exceeded"}},
+                    endpoint=path,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))},
+                )
+                return
+        if config.error_rate and rng.random() < config.error_rate:
+            time.sleep(config.latency.sample(rng))
+            self._send_json(500, {"error": {"type": "api_error", "message": "Injected failure"}}, endpoint=path)
+            return
+
+        if path.endswith("/chat/completions"):
+            self._openai_chat(body, rng)
+        elif path.endswith("/messages"):
+            self._anthropic_messages(body, rng)
+        elif "/text-to-speech/" in path:
+            self._elevenlabs_tts(body, rng)
+        elif path.endswith("/inferences"):
+            self._retrodiffusion(body, rng)
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown endpoint {path}"}}, endpoint=path)
+
+    # -- providers ---------------------------------------------------------
+
+    def _openai_chat(self, body: Dict[str, Any], rng: random.Random):
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            json_schema = response_format["json_schema"]
+            instance = self.server.outline(json_schema.get("name", ""), instance_from_schema(json_schema["schema"], rng), rng)
+            if isinstance(instance, dict) and "prompts" in instance:
+                # Batched image prompts: one per <scene N> block, as a real model returns
+                scenes = sum(str(message.get("content", "")).count("</scene ") for message in body.get("messages", []))
+                instance["prompts"] = [fake_prose(rng, 40) for _ in range(scenes)]
+            content = json.dumps(instance)
+        else:
+            content = fake_prose(rng, self.server.free_text_tokens(body))
+        output_tokens = _estimate_tokens(content)
+        time.sleep(self.server.config.latency.sample(rng, output_tokens, body.get("model")))
+        if body.get("stream"):
+            chunks = [{
+                "id": "chatcmpl-stream",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-4o"),
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+            } for word in re.findall(r"\S+\s*", content)]
+            self._send_events([(None, chunk) for chunk in chunks] + [(None, "[DONE]")], endpoint=f"chat.completions {body.get('model')}")
+            return
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": _estimate_tokens(body.get("messages")),
+                "completion_tokens": output_tokens,
+                "total_tokens": _estimate_tokens(body.get("messages")) + output_tokens,
+            },
+        }, endpoint=f"chat.completions {body.get('model')}")
+
+    def _anthropic_messages(self, body: Dict[str, Any], rng: random.Random):
+        tools = body.get("tools") or []
+        if tools:
+            tool = tools[0]
+            tool_input = self.server.outline(tool["name"], instance_from_schema(tool["input_schema"], rng), rng)
+            content = [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:12]}", "name": tool["name"], "input": tool_input}]
+            stop_reason = "tool_use"
+            output_tokens = _estimate_tokens(tool_input)
+        else:
+            system = body.get("system") or ""
+            if isinstance(system, list):
+                system = " ".join(block.get("text", "") for block in system)
+            if "<JSON_SCHEMA>" in system:
+                # instructor's ANTHROPIC_JSON mode embeds the schema in the system prompt
+                schema = json.loads(system.split("<JSON_SCHEMA>")[1].split("</JSON_SCHEMA>")[0])
+                text = json.dumps(self.server.outline(schema.get("title", ""), instance_from_schema(schema, rng), rng))
+            else:
+                text = fake_prose(rng, self.server.free_text_tokens(body))
+            content = [{"type": "text", "text": text}]
+            stop_reason = "end_turn"
+            output_tokens = _estimate_tokens(text)
+        time.sleep(self.server.config.latency.sample(rng, output_tokens, body.get("model")))
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-3-5-sonnet-latest"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {"input_tokens": _estimate_tokens(body.get("messages")), "output_tokens": 1},
+        }
+        if body.get("stream") and stop_reason == "end_turn":
+            text = content[0]["text"]
+            events = [("message_start", {"type": "message_start", "message": message}),
+                      ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})]
+            events += [("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}})
+                       for word in re.findall(r"\S+\s*", text)]
+            events += [("content_block_stop", {"type": "content_block_stop", "index": 0}),
+                       ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": output_tokens}}),
+                       ("message_stop", {"type": "message_stop"})]
+            self._send_events(events, endpoint=f"messages {body.get('model')}")
+            return
+        self._send_json(200, {
+            "id": message["id"],
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-3-5-sonnet-latest"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": _estimate_tokens(body.get("messages")), "output_tokens": output_tokens},
+        }, endpoint=f"messages {body.get('model')}")
+
+    def _elevenlabs_tts(self, body: Dict[str, Any], rng: random.Random):
+        frames = max(1, len(body.get("text", "")) // 15)
+        time.sleep(self.server.config.latency.sample(rng, frames))
+        self._send_bytes(200, SILENT_MP3_FRAME * frames, "audio/mpeg", endpoint="text-to-speech")
+
+    def _retrodiffusion(self, body: Dict[str, Any], rng: random.Random):
+        time.sleep(self.server.config.latency.sample(rng))
+        self._send_json(200, {
+            "created_at": int(time.time()),
+            "balance_cost": 0,
+            "base64_images": [TINY_PNG] * int(body.get("num_images", 1)),
+            "model": body.get("model"),
+        }, endpoint="inferences")
+
+    # -- helpers -----------------------------------------------------------
+
+    def _send_json(self, status: int, payload: Any, endpoint: str, headers: Optional[Dict[str, str]] = None):
+        self._send_bytes(status, json.dumps(payload).encode(), "application/json", endpoint, headers)
+
+    def _send_events(self, events, endpoint: str):
+        """Server-sent events, as used by both LLM APIs when stream=true."""
+        self.server.record(endpoint, 200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for event, data in events:
+            payload = data if isinstance(data, str) else json.dumps(data)
+            frame = (f"event: {event}\n" if event else "") + f"data: {payload}\n\n"
+            self.wfile.write(frame.encode())
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str, endpoint: str, headers: Optional[Dict[str, str]] = None):
+        self.server.record(endpoint, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeProviders:
+    """The four running fake servers."""
+
+    def __init__(self, servers: Dict[str, FakeProviderServer]):
+        self.servers = servers
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the app's clients at the fake servers."""
+        return {
+            "OPENAI_API_KEY": "fake-openai-key",
+            "OPENAI_BASE_URL": f"{self.servers['openai'].url}/v1",
+            "ANTHROPIC_API_KEY": "fake-anthropic-key",
+            "ANTHROPIC_BASE_URL": self.servers["anthropic"].url,
+            "ELEVENLABS_API_KEY": "fake-elevenlabs-key",
+            "ELEVENLABS_BASE_URL": self.servers["elevenlabs"].url,
+            "RETRODIFFUSION_API_KEY": "fake-retrodiffusion-key",
+            "RETRODIFFUSION_URL": f"{self.servers['retrodiffusion'].url}/v1/inferences",
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: server.stats() for name, server in self.servers.items()}
+
+    def reset_stats(self):
+        for server in self.servers.values():
+            server.reset_stats()
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+
+
+def start_fake_providers(config: Optional[FakeProvidersConfig] = None) -> FakeProviders:
+    config = config or FakeProvidersConfig()
+    servers = {}
+    for offset, name in enumerate(("openai", "anthropic", "elevenlabs", "retrodiffusion")):
+        server = FakeProviderServer(name, getattr(config, name), seed=config.seed + offset)
+        server.thread = threading.Thread(target=server.serve_forever, name=f"fake-{name}", daemon=True)
+        server.thread.start()
+        servers[name] = server
+    return FakeProviders(servers)
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """CLI flags shared by the benchmark tools."""
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Median LLM time to first byte")
+    parser.add_argument("--latency-sigma", type=float, default=0.25, help="Lognormal sigma of the latency")
+    parser.add_argument("--per-token-ms", type=float, default=0.0, help="Extra latency per generated token")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of LLM calls that are slow")
+    parser.add_argument("--slow-multiplier", type=float, default=10.0)
+    parser.add_argument("--slow-provider", choices=["openai", "anthropic", "both"], default="both",
+                        help="Which LLM provider the slow tail applies to")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rpm", type=int, default=0, help="Per-provider RPM before 429s (0 = unlimited)")
+    parser.add_argument("--model-latency", action="append", default=[], metavar="MODEL=FACTOR",
+                        help="Scale one model's latency, e.g. gpt-4o-mini=0.4 (repeatable)")
+    parser.add_argument("--outline-churn", type=float, default=None,
+                        help="Make each revised outline repeat the last with this fraction of scenes rewritten")
+    parser.add_argument("--critique-tokens-per-scene", type=int, default=0,
+                        help="Make free-text critiques this many tokens long per scene in their outline")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeProvidersConfig:
+    def llm_config(name: str) -> FakeProviderConfig:
+        slow = args.slow_provider in (name, "both")
+        return FakeProviderConfig(
+            latency=LatencyConfig(
+                median_ms=args.latency_ms,
+                sigma=args.latency_sigma,
+                per_token_ms=args.per_token_ms,
+                slow_rate=args.slow_rate if slow else 0.0,
+                slow_multiplier=args.slow_multiplier,
+                model_factors={model: float(factor) for model, factor in (item.split("=", 1) for item in args.model_latency)},
+            ),
+            error_rate=args.error_rate,
+            rate_limit_rpm=args.rate_limit_rpm,
+            outline_churn=args.outline_churn,
+            critique_tokens_per_scene=args.critique_tokens_per_scene,
+        )
+
+    return FakeProvidersConfig(
+        openai=llm_config("openai"),
+        anthropic=llm_config("anthropic"),
+        elevenlabs=FakeProviderConfig(latency=LatencyConfig(median_ms=args.latency_ms / 2), error_rate=args.error_rate, rate_limit_rpm=args.rate_limit_rpm),
+        retrodiffusion=FakeProviderConfig(latency=LatencyConfig(median_ms=args.latency_ms * 2), error_rate=args.error_rate, rate_limit_rpm=args.rate_limit_rpm),
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run fake provider servers until interrupted")
+    add_config_arguments(parser)
+    providers = start_fake_providers(config_from_args(parser.parse_args()))
+    for key, value in providers.env().items():
+        print(f"{key}={value}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        providers.stop()
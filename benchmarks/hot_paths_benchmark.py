@@ -0,0 +1,259 @@
+"""
+Micro-benchmarks for the pure-Python paths that run many times per article,
+checked against a stored baseline:
+
+    python -m benchmarks.hot_paths_benchmark
+    python -m benchmarks.hot_paths_benchmark --only format_written_content --lengths long
+    python -m benchmarks.hot_paths_benchmark --save-baseline
+    python -m benchmarks.hot_paths_benchmark --threshold 0.1 --output hot_paths.json
+
+Every case runs against a seeded synthetic article of each length, fully
+written with scene scripts from the parser benchmark's generator, so inputs
+are the size and shape the app produces:
+
+    check_forbidden_words   the article's prose (run on every drafted scene)
+    scene_script_to_prose   every scene's script rendered uncached
+    format_written_content  the whole article, as each drafting prompt does
+    index_scenes            the scene index write_full_article walks
+    plan_model_dump_json    the outline as build_scene_prompt embeds it
+    content_deep_copy       model_copy(deep=True) of the outline, as write_full_article starts
+    db_save_article         ArticleDB.save_article into a scratch SQLite file
+    db_get_article          ArticleDB.get_article from a file holding just that article
+    normalize_speaker_name  every line's speaker, as narration assigns voices
+
+Each case reports the best per-call time over --repeat rounds of timeit's
+autoranged loop. Its rounds alternate with rounds of a fixed pure-Python
+calibration loop, and the baseline is compared on the ratio of the two, so a
+baseline recorded on one machine (or under different load) still means
+something on another. A case
+more than --threshold slower than its baseline is timed again (--confirm
+times) and, if it stays over, is a regression: the exit status is 1.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.database import ArticleDB
+from app.schemas import (
+    ArticleLength,
+    ArticleStructure,
+    MainHeading,
+    MediumArticleStructure,
+    Scene,
+    ShortArticleStructure,
+)
+from app.services.audio_service import normalize_speaker_name
+from app.services.llm_service import check_forbidden_words, format_written_content, scene_script_to_prose
+from app.services.scene_index_service import index_scenes, outline_of
+from benchmarks.run_benchmark import git_commit
+from benchmarks.scene_storage_benchmark import outline as long_outline
+from benchmarks.script_parser_benchmark import generate_scene
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "hot_paths.json"
+LENGTHS = ["short", "medium", "long"]
+
+
+def article(length: str, seed: int) -> ArticleStructure:
+    """A written article of the given length: short has 8 scenes, medium 16, long 52 under 6 headings."""
+    def scenes(count: int) -> List[Scene]:
+        return [Scene(scene_description=f"Scene {i}", must_include="") for i in range(count)]
+
+    if length == "short":
+        written = ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+            title="Benchmark", scenes=scenes(8),
+        ))
+    elif length == "medium":
+        written = ArticleStructure(length=ArticleLength.MEDIUM, content=MediumArticleStructure(
+            title="Benchmark",
+            intro_paragraphs=scenes(2),
+            main_headings=[MainHeading(title=f"Heading {h}", scenes=scenes(3), sub_headings=[]) for h in range(4)],
+            conclusion_paragraphs=scenes(2),
+        ))
+    else:
+        written = long_outline(6)
+
+    rng = random.Random(seed)
+    for ref in index_scenes(written):
+        ref.scene.script = generate_scene(rng, ref.position)
+        ref.scene.image_url = f"/static/images/scene_{ref.position}.webp"
+    return written
+
+
+def calibration() -> None:
+    """Fixed pure-Python work (string building, dict and list churn) that times are normalized by."""
+    counts: Dict[str, int] = {}
+    for i in range(2000):
+        key = f"speaker-{i % 37}"
+        counts[key] = counts.get(key, 0) + len(key.title())
+    sorted(counts.items())
+
+
+def scratch_db(path: str) -> ArticleDB:
+    os.environ["ARTICLES_DB_PATH"] = path
+    db = ArticleDB()
+    db.create_tables()
+    return db
+
+
+def cases(length: str, seed: int, workdir: str) -> Dict[str, Callable[[], Any]]:
+    """
+    Zero-argument callables for every case, bound to this length's fixture.
+    Saves go to their own database, so the rows they pile up don't slow the
+    get_article case.
+    """
+    written = article(length, seed)
+    plan = outline_of(written)
+    refs = index_scenes(written)
+    scripts = [ref.scene.script for ref in refs]
+    prose = format_written_content(written)  # also warms each scene's memoized prose, as mid-write
+    speakers = [line.speaker.lower() for script in scripts for paragraph in script.paragraphs for line in paragraph.lines]
+    read_db = scratch_db(os.path.join(workdir, f"read-{length}.db"))
+    write_db = scratch_db(os.path.join(workdir, f"write-{length}.db"))
+    article_id = read_db.save_article("Benchmark topic", "hemingway", written, plan="A plan.")
+
+    return {
+        "check_forbidden_words": lambda: check_forbidden_words(prose),
+        "scene_script_to_prose": lambda: [scene_script_to_prose(script) for script in scripts],
+        "format_written_content": lambda: format_written_content(written),
+        "index_scenes": lambda: index_scenes(written),
+        "plan_model_dump_json": lambda: plan.model_dump_json(),
+        "content_deep_copy": lambda: plan.content.model_copy(deep=True),
+        "db_save_article": lambda: write_db.save_article("Benchmark topic", "hemingway", written, plan="A plan."),
+        "db_get_article": lambda: read_db.get_article(article_id),
+        "normalize_speaker_name": lambda: [normalize_speaker_name(speaker) for speaker in speakers],
+    }
+
+
+def time_case(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """
+    Best seconds per call of `fn` and of the calibration loop, over `repeat`
+    rounds of autoranged timeit loops that alternate between the two, so
+    both see the same machine load.
+    """
+    timers = [timeit.Timer(fn), timeit.Timer(calibration)]
+    numbers = [timer.autorange()[0] for timer in timers]
+    best = [float("inf"), float("inf")]
+    for _ in range(repeat):
+        for i, (timer, number) in enumerate(zip(timers, numbers)):
+            best[i] = min(best[i], timer.timeit(number) / number)
+    return best[0], best[1]
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float, normalize: bool,
+            retime: Callable[[str], Dict[str, Any]], confirm: int) -> List[Dict[str, Any]]:
+    """
+    Print each case against the baseline and return the regressions. A case
+    over the threshold is timed again up to `confirm` times and only counts
+    if every attempt is, since one noisy round shouldn't fail the run.
+    """
+    def change(result: Dict[str, Any], previous: Dict[str, Any]) -> float:
+        if normalize:
+            return (result["us"] / result["calibration_us"]) / (previous["us"] / previous["calibration_us"]) - 1
+        return result["us"] / previous["us"] - 1
+
+    regressions = []
+    print(f"\nAgainst baseline from commit {baseline.get('commit')} (threshold {threshold:+.0%}"
+          f"{', calibrated' if normalize else ''}):")
+    for name in report["results"]:
+        result = report["results"][name]
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            print(f"  {name:<34} no baseline")
+            continue
+        attempts = 0
+        while change(result, previous) > threshold and attempts < confirm:
+            attempts += 1
+            retimed = retime(name)
+            if change(retimed, previous) < change(result, previous):
+                result = report["results"][name] = retimed
+        slowdown = change(result, previous)
+        regressed = slowdown > threshold
+        note = ""
+        if regressed:
+            note = f"  REGRESSION (confirmed {attempts}x)" if attempts else "  REGRESSION"
+        elif attempts:
+            note = f"  (within threshold after {attempts} retries)"
+        print(f"  {name:<34} {previous['us']:>10.1f}us -> {result['us']:>10.1f}us ({slowdown:+.1%}){note}")
+        if regressed:
+            regressions.append({"case": name, "baseline_us": previous["us"], "us": result["us"], "change": round(slowdown, 4)})
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", nargs="+", default=LENGTHS, choices=LENGTHS)
+    parser.add_argument("--only", nargs="+", metavar="CASE", help="Run only these cases")
+    parser.add_argument("--repeat", type=int, default=7, help="Timing rounds per case; the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Stored baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Slowdown over the baseline that counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="Times a case over the threshold is timed again before it counts as a regression")
+    parser.add_argument("--no-normalize", action="store_true",
+                        help="Compare raw times instead of times relative to the calibration loop")
+    parser.add_argument("--output", help="Write the JSON report here")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="longslop-hot-paths-")
+
+    functions: Dict[str, Callable[[], Any]] = {}
+    for length in args.lengths:
+        for name, fn in cases(length, args.seed, workdir).items():
+            if not args.only or name in args.only:
+                functions[f"{name}[{length}]"] = fn
+
+    def measure(key: str) -> Dict[str, Any]:
+        seconds, calibration_seconds = time_case(functions[key], args.repeat)
+        name, length = key[:-1].split("[")
+        return {
+            "case": name,
+            "length": length,
+            "us": round(seconds * 1e6, 2),
+            "calibration_us": round(calibration_seconds * 1e6, 2),
+        }
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for key in functions:
+        results[key] = measure(key)
+        print(f"{key:<34} {results[key]['us']:>10.1f}us  ({results[key]['us'] / results[key]['calibration_us']:.3f}x calibration)")
+
+    report: Dict[str, Any] = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.threshold, not args.no_normalize,
+                                        measure, args.confirm)
+    else:
+        print(f"\nNo baseline at {args.baseline}; record one with --save-baseline")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main().get("regressions") else 0)
@@ -0,0 +1,436 @@
+"""
+SSE load test of /api/v1/write-article-stream against the fake providers.
+
+Starts the fake OpenAI/Anthropic/ElevenLabs/Retro-Diffusion servers, launches
+the app as its own uvicorn process in a scratch directory, then opens
+--connections streams at --rate new connections per second and reads each one
+the way an EventSource does:
+
+    python -m benchmarks.load_test --connections 50 --rate 5
+    python -m benchmarks.load_test --connections 200 --rate 20 --arrival poisson --output load.json
+    python -m benchmarks.load_test --connections 40 --rate 0 --length short=3 --length medium=1
+    python -m benchmarks.load_test --connections 20 --topic "Tidal flats" --topic "A lost radio" --output load.json
+
+Topics and lengths are drawn per connection from the --topic and --length
+mixes (NAME=WEIGHT for weighted lengths, or a topics file with --topics-file).
+Repeated topics coalesce server-side like real duplicate requests do unless
+--distinct is given.
+
+The report has p50/p95/p99 (plus mean and max) for time to response headers,
+to the first event, to `plan`, to `revised_outline`, to `complete_content`
+and to the end of the stream, the peak number of open streams, errors and
+dropped followers, and the server process's CPU and RSS sampled from /proc
+while the test runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_providers import add_config_arguments, config_from_args, start_fake_providers
+from benchmarks.run_benchmark import REPO_ROOT, free_port, git_commit
+
+DEFAULT_TOPICS = [
+    "A lighthouse keeper who stops answering the radio",
+    "The last ferry across a frozen lake",
+    "Two brothers who inherit a failing orchard",
+    "A night shift at a border weather station",
+    "An archivist who finds her own name in a ledger",
+]
+MILESTONES = ["headers", "first_event", "plan", "revised_outline", "complete_content", "end"]
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linear-interpolated percentile of `values` (already sorted)."""
+    if len(values) == 1:
+        return values[0]
+    rank = (len(values) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    summary: Dict[str, Any] = {"count": len(ordered)}
+    for p in PERCENTILES:
+        summary[f"p{p}_s"] = round(percentile(ordered, p), 4)
+    summary["mean_s"] = round(sum(ordered) / len(ordered), 4)
+    summary["max_s"] = round(ordered[-1], 4)
+    return summary
+
+
+def parse_mix(items: List[str]) -> List[Tuple[str, float]]:
+    """NAME or NAME=WEIGHT items as (name, weight) pairs."""
+    mix = []
+    for item in items:
+        name, _, weight = item.partition("=")
+        mix.append((name, float(weight) if weight else 1.0))
+    return mix
+
+
+class ProcessSampler:
+    """
+    Samples a process's CPU time and RSS from /proc on a background thread.
+    Linux only; elsewhere `summary()` is None.
+    """
+
+    def __init__(self, pid: int, interval: float):
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Tuple[float, float, int]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def read(self) -> Optional[Tuple[float, int]]:
+        """(CPU seconds, RSS bytes) so far, or None if /proc isn't readable."""
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                # Fields after the parenthesised command name; utime and stime are 14th and 15th overall
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/status") as f:
+                rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration, IndexError, ValueError):
+            return None
+        return (int(fields[11]) + int(fields[12])) / self._ticks, rss_kb * 1024
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            reading = self.read()
+            if reading is not None:
+                self.samples.append((time.perf_counter(), *reading))
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        if len(self.samples) < 2:
+            return None
+        cpu_percent = [
+            (later[1] - earlier[1]) / (later[0] - earlier[0]) * 100
+            for earlier, later in zip(self.samples, self.samples[1:])
+            if later[0] > earlier[0]
+        ]
+        elapsed = self.samples[-1][0] - self.samples[0][0]
+        return {
+            "cpu_s": round(self.samples[-1][1] - self.samples[0][1], 3),
+            "mean_cpu_percent": round((self.samples[-1][1] - self.samples[0][1]) / elapsed * 100, 1),
+            "peak_cpu_percent": round(max(cpu_percent), 1),
+            "start_rss_mb": round(self.samples[0][2] / 1024 / 1024, 1),
+            "peak_rss_mb": round(max(sample[2] for sample in self.samples) / 1024 / 1024, 1),
+            "end_rss_mb": round(self.samples[-1][2] / 1024 / 1024, 1),
+            "samples": len(self.samples),
+        }
+
+
+def start_server(port: int, env: Dict[str, str], timeout: float = 30.0) -> Tuple[subprocess.Popen, str]:
+    """Launch the app under uvicorn in a scratch directory and wait until it answers."""
+    workdir = tempfile.mkdtemp(prefix="longslop-load-")
+    os.symlink(REPO_ROOT / "frontend", os.path.join(workdir, "frontend"))
+    os.makedirs(os.path.join(workdir, "static"), exist_ok=True)
+    env = {**os.environ, **env, "PYTHONPATH": str(REPO_ROOT), "ARTICLES_DB_PATH": os.path.join(workdir, "articles.db")}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL,
+    )
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before serving a request")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/v1/styles", timeout=1.0).status_code == 200:
+                return process, workdir
+        except httpx.TransportError:
+            pass
+        time.sleep(0.05)
+    process.terminate()
+    raise TimeoutError(f"Server did not answer within {timeout}s")
+
+
+async def read_events(response: httpx.Response):
+    """
+    Yield (event name, data) for each SSE event, dispatched on the blank line
+    that ends it as EventSource does. Multi-line data is joined with newlines.
+    """
+    name, data = "message", []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield name, "\n".join(data)
+            name, data = "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "event":
+                name = value
+            elif field == "data":
+                data.append(value)
+    if data:
+        yield name, "\n".join(data)
+
+
+class LoadState:
+    """Open-stream gauge shared by the connections."""
+
+    def __init__(self):
+        self.open = 0
+        self.peak_open = 0
+
+    def opened(self):
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+
+    def closed(self):
+        self.open -= 1
+
+
+async def run_connection(client: httpx.AsyncClient, base_url: str, params: Dict[str, Any], state: LoadState,
+                         timeout: float) -> Dict[str, Any]:
+    """Stream one article and record when each milestone arrived, relative to the request."""
+    started = time.perf_counter()
+    times: Dict[str, float] = {}
+    counts: Counter = Counter()
+    result: Dict[str, Any] = {"topic": params["topic"], "length": params["length"], "status": None, "error": None}
+
+    async def consume():
+        async with client.stream("GET", f"{base_url}/api/v1/write-article-stream", params=params) as response:
+            times["headers"] = time.perf_counter() - started
+            result["status"] = response.status_code
+            result["coalesced"] = response.headers.get("x-coalesced")
+            if response.status_code != 200:
+                result["error"] = f"HTTP {response.status_code}"
+                return
+            async for name, data in read_events(response):
+                now = time.perf_counter() - started
+                times.setdefault("first_event", now)
+                if name == "end":
+                    break
+                message = json.loads(data)
+                kind = message.get("type", name)
+                counts[kind] += 1
+                times.setdefault(kind, now)
+                if kind in ("error", "dropped"):
+                    result["error"] = f"{kind}: {message.get('content')}"
+        times["end"] = time.perf_counter() - started
+
+    state.opened()
+    try:
+        await asyncio.wait_for(consume(), timeout)
+    except asyncio.TimeoutError:
+        result["error"] = f"timed out after {timeout}s"
+    except (httpx.HTTPError, json.JSONDecodeError) as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        state.closed()
+    result["times_s"] = {key: round(value, 4) for key, value in times.items()}
+    result["events"] = dict(counts)
+    return result
+
+
+def arrival_delays(count: int, rate: float, arrival: str, rng: random.Random) -> List[float]:
+    """Start offsets in seconds for `count` connections at `rate` per second (0 = all at once)."""
+    if rate <= 0:
+        return [0.0] * count
+    offsets, at = [], 0.0
+    for _ in range(count):
+        offsets.append(at)
+        at += rng.expovariate(rate) if arrival == "poisson" else 1 / rate
+    return offsets
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], LoadState, float]:
+    rng = random.Random(args.seed)
+    topics = [(topic, 1.0) for topic in args.topic] if args.topic else [(topic, 1.0) for topic in DEFAULT_TOPICS]
+    if args.topics_file:
+        with open(args.topics_file) as f:
+            topics = [(line.strip(), 1.0) for line in f if line.strip()]
+    lengths = parse_mix(args.length or ["short"])
+    extra_params = dict(param.split("=", 1) for param in args.param)
+
+    def connection_params(index: int) -> Dict[str, Any]:
+        topic = rng.choices([name for name, _ in topics], [weight for _, weight in topics])[0]
+        length = rng.choices([name for name, _ in lengths], [weight for _, weight in lengths])[0]
+        return {
+            "topic": f"{topic} ({index + 1})" if args.distinct else topic,
+            "style": args.style,
+            "length": length,
+            "provider": args.provider,
+            "includeHeaders": "true",
+            "includeAudio": str(args.audio).lower(),
+            **extra_params,
+        }
+
+    state = LoadState()
+    delays = arrival_delays(args.connections, args.rate, args.arrival, rng)
+    plans = [connection_params(index) for index in range(args.connections)]
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(args.timeout, connect=10.0), limits=limits) as client:
+        started = time.perf_counter()
+
+        async def scheduled(delay: float, params: Dict[str, Any]) -> Dict[str, Any]:
+            await asyncio.sleep(max(0.0, started + delay - time.perf_counter()))
+            result = await run_connection(client, base_url, params, state, args.timeout)
+            result["started_at_s"] = round(delay, 4)
+            return result
+
+        results = await asyncio.gather(*(scheduled(delay, params) for delay, params in zip(delays, plans)))
+        wall = time.perf_counter() - started
+    return list(results), state, wall
+
+
+def summarize(results: List[Dict[str, Any]], state: LoadState, wall: float) -> Dict[str, Any]:
+    completed = [result for result in results if "complete_content" in result["times_s"]]
+    return {
+        "connections": len(results),
+        "completed": len(completed),
+        "errors": sum(1 for result in results if result["error"]),
+        "error_kinds": dict(Counter(result["error"].split(":", 1)[0] for result in results if result["error"])),
+        "status_codes": dict(Counter(str(result["status"]) for result in results)),
+        "coalesced": dict(Counter(result.get("coalesced") or "none" for result in results)),
+        "peak_open_streams": state.peak_open,
+        "wall_s": round(wall, 4),
+        "articles_per_minute": round(len(completed) / wall * 60, 2) if wall else 0.0,
+        "latency": {
+            milestone: latency_summary([result["times_s"][milestone] for result in results if milestone in result["times_s"]])
+            for milestone in MILESTONES
+        },
+    }
+
+
+def print_summary(summary: Dict[str, Any], server: Optional[Dict[str, Any]]):
+    print(
+        f"connections={summary['connections']} completed={summary['completed']} errors={summary['errors']} "
+        f"peak_open={summary['peak_open_streams']} wall={summary['wall_s']:.2f}s "
+        f"throughput={summary['articles_per_minute']}/min"
+    )
+    print(f"{'milestone':<18}{'count':>7}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES) + f"{'max':>10}")
+    for milestone, stats in summary["latency"].items():
+        if not stats["count"]:
+            print(f"{milestone:<18}{0:>7}")
+            continue
+        print(f"{milestone:<18}{stats['count']:>7}" + "".join(f"{stats[f'p{p}_s']:>9.3f}s" for p in PERCENTILES)
+              + f"{stats['max_s']:>9.3f}s")
+    if server:
+        print(
+            f"server cpu={server['cpu_s']}s mean={server['mean_cpu_percent']}% peak={server['peak_cpu_percent']}% "
+            f"rss={server['start_rss_mb']}MB -> peak {server['peak_rss_mb']}MB"
+        )
+    if summary["error_kinds"]:
+        print(f"errors by kind: {summary['error_kinds']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=20, help="Streams to open in total")
+    parser.add_argument("--rate", type=float, default=2.0, help="New connections per second (0 = all at once)")
+    parser.add_argument("--arrival", choices=["uniform", "poisson"], default="uniform",
+                        help="Evenly spaced arrivals, or exponential gaps with the same mean rate")
+    parser.add_argument("--topic", action="append", default=[], help="Topic in the mix (repeatable)")
+    parser.add_argument("--topics-file", help="File with one topic per line, used instead of --topic")
+    parser.add_argument("--distinct", action="store_true",
+                        help="Suffix every topic with its connection number so no two requests coalesce")
+    parser.add_argument("--length", action="append", default=[], metavar="LENGTH[=WEIGHT]",
+                        help="Article length in the mix, e.g. short=3 (repeatable, default short)")
+    parser.add_argument("--style", default="hemingway")
+    parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+    parser.add_argument("--audio", action="store_true", help="Request audio narration too")
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra query parameter for the stream endpoint (repeatable)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a stream is abandoned")
+    parser.add_argument("--sample-interval", type=float, default=0.25, help="Seconds between server CPU/RSS samples")
+    parser.add_argument("--url", help="Load an already running app instead of starting one (no server CPU/RSS unless --server-pid)")
+    parser.add_argument("--server-pid", type=int, help="PID of the app process behind --url, for CPU/RSS sampling")
+    parser.add_argument("--output", help="Write the JSON report here")
+    add_config_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+
+    providers = None
+    process = None
+    workdir = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        pid = args.server_pid
+    else:
+        providers = start_fake_providers(config_from_args(args))
+        env = dict(providers.env())
+        # Match the app's client-side rate limits to the fakes unless set explicitly
+        for name in ("OPENAI", "ANTHROPIC", "ELEVENLABS", "RETRODIFFUSION"):
+            env[f"{name}_RPM"] = os.environ.get(f"{name}_RPM", str(args.rate_limit_rpm))
+            env[f"{name}_TPM"] = os.environ.get(f"{name}_TPM", "0")
+        if args.rate_limit_rpm:
+            env["RATE_LIMITS_ENABLED"] = os.environ.get("RATE_LIMITS_ENABLED", "true")
+        # Finished duplicates are written again rather than replayed; in-flight ones still coalesce
+        env["COALESCE_TTL_SECONDS"] = os.environ.get("COALESCE_TTL_SECONDS", "0")
+        port = free_port()
+        try:
+            process, workdir = start_server(port, env)
+        except Exception:
+            providers.stop()
+            raise
+        base_url = f"http://127.0.0.1:{port}"
+        pid = process.pid
+
+    sampler = ProcessSampler(pid, args.sample_interval) if pid else None
+    try:
+        if sampler:
+            sampler.start()
+        results, state, wall = asyncio.run(run_load(base_url, args))
+    finally:
+        if sampler:
+            sampler.stop()
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if providers is not None:
+            providers.stop()
+
+    summary = summarize(results, state, wall)
+    server = sampler.summary() if sampler else None
+    print_summary(summary, server)
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "args": {key: value for key, value in vars(args).items() if key != "output"},
+        "workdir": workdir,
+        "summary": summary,
+        "server": server,
+        "provider_requests": providers.stats() if providers else None,
+        "connections": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Record real provider traffic once, then replay it offline.
+
+In record mode each provider gets a local proxy that forwards the app's
+requests to the real API (with the app's own keys) and appends every exchange
+to a cassette, `<dir>/<provider>.jsonl`: the request, the response and how long
+it took. In replay mode the same servers answer from the cassettes instead,
+keyed by a hash of the request (method, path and canonical JSON body, i.e. the
+prompt), after the recorded latency times `latency_scale`. A prompt sent more
+than once is answered with its recordings in the order they were made, so
+retries replay as they happened. A request with no recording gets a 404.
+
+Because every OpenAI, Anthropic, ElevenLabs and Retro-Diffusion call in the app
+goes through the base URLs these servers set, a recorded article can be
+written again after any code change with no API keys and the same timings:
+
+    python -m benchmarks.run_benchmark --record recordings --lengths medium --audio off
+    python -m benchmarks.run_benchmark --replay recordings --lengths medium --audio off
+
+Run as a script to keep the servers up for manual testing:
+
+    python -m benchmarks.replay_providers --replay recordings
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+PROVIDERS = ("openai", "anthropic", "elevenlabs", "retrodiffusion")
+
+# Where record mode forwards each provider's requests
+UPSTREAMS = {
+    "openai": "https://api.openai.com",
+    "anthropic": "https://api.anthropic.com",
+    "elevenlabs": "https://api.elevenlabs.io",
+    "retrodiffusion": "https://api.retrodiffusion.ai",
+}
+
+# Request headers not passed on upstream; the rest, including API keys, are (keys are never recorded)
+HOP_BY_HOP = {"host", "content-length", "connection", "accept-encoding", "keep-alive", "transfer-encoding"}
+# Response headers worth replaying
+RECORDED_HEADERS = ("retry-after",)
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """Hash of a request, with its JSON body canonicalised so key order doesn't matter."""
+    try:
+        canonical = json.dumps(json.loads(body), sort_keys=True).encode() if body else b""
+    except ValueError:
+        canonical = body
+    return hashlib.sha256(f"{method} {path}\n".encode() + canonical).hexdigest()
+
+
+def request_body(body: bytes) -> Any:
+    """The request as stored for reading, so the prompts of a recorded run can be inspected."""
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return body.decode(errors="replace")
+
+
+class ReplayProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, name: str, cassette: str, record: bool, latency_scale: float = 1.0,
+                 upstream: Optional[str] = None):
+        super().__init__(("127.0.0.1", 0), _ReplayProviderHandler)
+        self.name = name
+        self.cassette = cassette
+        self.recording = record
+        self.latency_scale = latency_scale
+        self.upstream = upstream or UPSTREAMS[name]
+        self.recordings: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.served: Counter = Counter()
+        self.lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.statuses: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.thread: Optional[threading.Thread] = None
+        self.client = httpx.Client(timeout=600) if record else None
+        if not record and os.path.exists(cassette):
+            with open(cassette) as f:
+                for line in f:
+                    exchange = json.loads(line)
+                    self.recordings[exchange["key"]].append(exchange)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def forward(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+        """Send a request upstream and append the exchange to the cassette."""
+        started = time.perf_counter()
+        response = self.client.request(method, self.upstream + path, headers=headers, content=body)
+        exchange = {
+            "key": request_key(method, path, body),
+            "method": method,
+            "path": path,
+            "request": request_body(body),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "headers": {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            "body_base64": base64.b64encode(response.content).decode(),
+            "latency_s": round(time.perf_counter() - started, 4),
+        }
+        with self.lock:
+            os.makedirs(os.path.dirname(self.cassette) or ".", exist_ok=True)
+            with open(self.cassette, "a") as f:
+                f.write(json.dumps(exchange) + "\n")
+        return exchange
+
+    def lookup(self, method: str, path: str, body: bytes) -> Optional[Dict[str, Any]]:
+        """The next recording of this request, cycling if it's sent more often than it was recorded."""
+        key = request_key(method, path, body)
+        with self.lock:
+            recordings = self.recordings.get(key)
+            if not recordings:
+                self.misses += 1
+                return None
+            self.hits += 1
+            exchange = recordings[self.served[key] % len(recordings)]
+            self.served[key] += 1
+            return exchange
+
+    def record(self, endpoint: str, status: int):
+        with self.lock:
+            self.requests[endpoint] += 1
+            self.statuses[str(status)] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "requests": dict(self.requests),
+                "statuses": dict(self.statuses),
+                "total": sum(self.requests.values()),
+                "rate_limited": self.statuses.get("429", 0),
+                "replay_hits": self.hits,
+                "replay_misses": self.misses,
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests.clear()
+            self.statuses.clear()
+            self.hits = self.misses = 0
+
+
+class _ReplayProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: ReplayProviderServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        # Connection warm-up; answered locally in both modes
+        self._send(200, b'{"object": "list", "data": []}', "application/json", "GET " + self.path.split("?")[0])
+
+    def do_HEAD(self):
+        self.server.record("HEAD", 200)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        endpoint = self.path.split("?")[0]
+        if self.server.recording:
+            headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+            try:
+                exchange = self.server.forward("POST", self.path, headers, body)
+            except httpx.HTTPError as e:
+                self._send(502, json.dumps({"error": {"message": f"Upstream failed: {e}"}}).encode(), "application/json", endpoint)
+                return
+        else:
+            exchange = self.server.lookup("POST", self.path, body)
+            if exchange is None:
+                message = f"No recording for {self.path} with this body ({request_key('POST', self.path, body)[:12]})"
+                self._send(404, json.dumps({"error": {"type": "not_found_error", "message": message}}).encode(),
+                           "application/json", endpoint)
+                return
+            time.sleep(exchange["latency_s"] * self.server.latency_scale)
+        self._send(exchange["status"], base64.b64decode(exchange["body_base64"]), exchange["content_type"],
+                   endpoint, exchange["headers"])
+
+    def _send(self, status: int, data: bytes, content_type: str, endpoint: str, headers: Optional[Dict[str, str]] = None):
+        self.server.record(endpoint, status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class ReplayProviders:
+    """The four running record or replay servers."""
+
+    def __init__(self, servers: Dict[str, ReplayProviderServer], record: bool):
+        self.servers = servers
+        self.recording = record
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that point the app's clients at the servers."""
+        env = {
+            "OPENAI_BASE_URL": f"{self.servers['openai'].url}/v1",
+            "ANTHROPIC_BASE_URL": self.servers["anthropic"].url,
+            "ELEVENLABS_BASE_URL": self.servers["elevenlabs"].url,
+            "RETRODIFFUSION_URL": f"{self.servers['retrodiffusion'].url}/v1/inferences",
+        }
+        if not self.recording:
+            # Replays need no keys, but the app refuses to start a call without one
+            env.update({f"{name.upper()}_API_KEY": f"replay-{name}-key" for name in PROVIDERS})
+        return env
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: server.stats() for name, server in self.servers.items()}
+
+    def reset_stats(self):
+        for server in self.servers.values():
+            server.reset_stats()
+
+    def stop(self):
+        for server in self.servers.values():
+            server.shutdown()
+            server.server_close()
+            if server.client is not None:
+                server.client.close()
+
+
+def start_replay_providers(directory: str, record: bool = False, latency_scale: float = 1.0,
+                           upstreams: Optional[Dict[str, str]] = None) -> ReplayProviders:
+    """Record into or replay from `directory`; `upstreams` overrides where recordings are forwarded."""
+    directory = os.path.abspath(directory)
+    servers = {}
+    for name in PROVIDERS:
+        server = ReplayProviderServer(name, os.path.join(directory, f"{name}.jsonl"), record, latency_scale,
+                                      upstream=(upstreams or {}).get(name))
+        server.thread = threading.Thread(target=server.serve_forever, name=f"replay-{name}", daemon=True)
+        server.thread.start()
+        servers[name] = server
+    return ReplayProviders(servers, record)
+
+
+def add_replay_arguments(parser: argparse.ArgumentParser):
+    """CLI flags shared by the benchmark tools."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR", help="Forward to the real APIs and record every exchange here")
+    group.add_argument("--replay", metavar="DIR", help="Answer from the exchanges recorded here instead of fake providers")
+    parser.add_argument("--replay-latency-scale", type=float, default=1.0,
+                        help="Multiply recorded latencies when replaying (0 answers at once)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run record or replay provider servers until interrupted")
+    add_replay_arguments(parser)
+    args = parser.parse_args()
+    if not (args.record or args.replay):
+        parser.error("one of --record or --replay is required")
+    providers = start_replay_providers(args.record or args.replay, record=bool(args.record),
+                                       latency_scale=args.replay_latency_scale)
+    for key, value in providers.env().items():
+        print(f"{key}={value}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        providers.stop()
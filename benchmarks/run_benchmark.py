@@ -0,0 +1,432 @@
+"""
+End-to-end benchmark of /api/v1/write-article-stream against the fake providers.
+
+Starts the fake OpenAI/Anthropic/ElevenLabs/Retro-Diffusion servers, boots the
+app under uvicorn in a scratch directory, streams one article per scenario
+(every ArticleLength, with and without audio) and writes a JSON report:
+
+    python -m benchmarks.run_benchmark --output bench.json
+    python -m benchmarks.run_benchmark --output after.json --compare bench.json
+    python -m benchmarks.run_benchmark --concurrency 8 --rate-limit-rpm 60
+    python -m benchmarks.run_benchmark --replay recordings --output replay.json
+
+Per run the report records total time, time to first event and to each event
+type, LLM/image/audio calls per pipeline stage (from the trace), requests and
+status codes seen by each fake provider, and peak Python memory. With
+--concurrency N each scenario instead streams N articles at once and records
+throughput, per-article latency, 429s and the app's rate limiter counters.
+With --record DIR the app talks to the real APIs and every exchange is
+recorded; --replay DIR then serves those exchanges instead of the fakes (see
+benchmarks/replay_providers.py).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_providers import add_config_arguments, config_from_args, start_fake_providers
+from benchmarks.replay_providers import add_replay_arguments, start_replay_providers
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_workdir() -> str:
+    """Scratch directory so generated images, audio and the database stay out of the repo."""
+    workdir = tempfile.mkdtemp(prefix="longslop-bench-")
+    os.makedirs(os.path.join(workdir, "frontend"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "static"), exist_ok=True)
+    os.environ["ARTICLES_DB_PATH"] = os.path.join(workdir, "articles.db")
+    os.chdir(workdir)
+    return workdir
+
+
+def start_app(port: int):
+    """Import the app and serve it from a background thread. Returns (server, import_seconds)."""
+    import uvicorn
+
+    sys.path.insert(0, str(REPO_ROOT))
+    started = time.perf_counter()
+    import main as app_main
+    import_seconds = time.perf_counter() - started
+
+    server = uvicorn.Server(uvicorn.Config(app_main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, import_seconds
+
+
+def stream_article(base_url: str, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Stream one article and time every SSE event."""
+    events: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    first_event: Optional[float] = None
+    with httpx.Client(timeout=timeout) as client:
+        with client.stream("GET", f"{base_url}/api/v1/write-article-stream", params=params) as response:
+            for line in response.iter_lines():
+                if not line.startswith("data: ") or line == "data: ":
+                    continue
+                now = time.perf_counter() - started
+                if first_event is None:
+                    first_event = now
+                message = json.loads(line[len("data: "):])
+                events.append({"type": message.get("type"), "at_s": round(now, 4), "content": message.get("content")})
+    return {
+        "total_s": round(time.perf_counter() - started, 4),
+        "time_to_first_event_s": round(first_event, 4) if first_event is not None else None,
+        "events": events,
+    }
+
+
+def stage_calls(trace_id: Optional[str]) -> Dict[str, int]:
+    """Count spans by name for one article's trace."""
+    if not trace_id:
+        return {}
+    from app.services.tracing_service import tracer
+
+    return dict(Counter(span.name for span in tracer.get_trace(trace_id) or []))
+
+
+def stage_ms(trace_id: Optional[str]) -> Dict[str, float]:
+    """Total span time by name for one article's trace (parallel spans add up)."""
+    if not trace_id:
+        return {}
+    from app.services.tracing_service import tracer
+
+    totals: Dict[str, float] = {}
+    for span in tracer.get_trace(trace_id) or []:
+        totals[span.name] = round(totals.get(span.name, 0.0) + span.duration_ms, 1)
+    return totals
+
+
+def hedging_stats(before: Dict[str, int]) -> Dict[str, int]:
+    """Hedging/failover counters accumulated since `before` (all zero unless LLM_HEDGING=true)."""
+    from app.services.hedging_service import provider_health
+
+    return {key: value - before.get(key, 0) for key, value in provider_health.snapshot()["stats"].items()}
+
+
+def regenerate_scenes(base_url: str, providers, article_id: int, path: str, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Regenerate part of a finished article and time it against the full write."""
+    providers.reset_stats()
+    regenerate_params = {key: value for key, value in params.items() if key not in ("topic", "style", "length")}
+    started = time.perf_counter()
+    response = httpx.post(f"{base_url}/api/v1/articles/{article_id}/regenerate",
+                          params={**regenerate_params, "path": path}, timeout=timeout)
+    elapsed = time.perf_counter() - started
+    body = response.json()
+    return {
+        "path": path,
+        "status": response.status_code,
+        "total_s": round(elapsed, 4),
+        "scenes": len(body.get("regenerated", [])) if response.status_code == 200 else 0,
+        "stage_calls": stage_calls(body.get("trace_id")) if response.status_code == 200 else {},
+        "provider_requests": providers.stats(),
+        "error": None if response.status_code == 200 else body.get("detail"),
+    }
+
+
+def run_scenario(base_url: str, providers, length: str, include_audio: bool, provider: str, timeout: float,
+                 extra_params: Dict[str, str], regenerate: Optional[str] = None) -> Dict[str, Any]:
+    from app.services.model_routing_service import model_router
+
+    providers.reset_stats()
+    model_router.metrics.reset()
+    hedging_before = hedging_stats({})
+    tracemalloc.reset_peak()
+    params = {
+        "topic": "A lighthouse keeper who stops answering the radio",
+        "style": "hemingway",
+        "length": length,
+        "provider": provider,
+        "includeHeaders": "true",
+        "includeAudio": str(include_audio).lower(),
+        **extra_params,
+    }
+    result = stream_article(base_url, params, timeout)
+    _, peak = tracemalloc.get_traced_memory()
+
+    event_times: Dict[str, float] = {}
+    trace_id = None
+    error = None
+    audio_error = None
+    generation_stats = None
+    article_id = None
+    degraded = None
+    for event in result["events"]:
+        event_times.setdefault(event["type"], event["at_s"])
+        if event["type"] == "trace":
+            trace_id = event["content"]["trace_id"]
+        elif event["type"] == "error":
+            error = event["content"]
+        elif event["type"] == "complete_content":
+            audio_error = event["content"].get("audio_error")
+            generation_stats = event["content"].get("stats")
+            article_id = event["content"].get("article_id")
+        elif event["type"] == "degraded":
+            degraded = event["content"]["degraded"]
+
+    run = {
+        "scenario": f"{length}{'+audio' if include_audio else ''}",
+        "length": length,
+        "include_audio": include_audio,
+        "total_s": result["total_s"],
+        "time_to_first_event_s": result["time_to_first_event_s"],
+        "event_times_s": event_times,
+        "stage_calls": stage_calls(trace_id),
+        "stage_ms": stage_ms(trace_id),
+        "provider_requests": providers.stats(),
+        "hedging": hedging_stats(hedging_before),
+        "model_stages": model_router.metrics.snapshot(),
+        "generation_stats": generation_stats,
+        "degraded": degraded,
+        "peak_python_memory_mb": round(peak / 1024 / 1024, 2),
+        "error": error,
+        "audio_error": audio_error,
+        "trace_id": trace_id,
+    }
+    if regenerate and article_id is not None:
+        run["regenerate"] = regenerate_scenes(base_url, providers, article_id, regenerate, params, timeout)
+    return run
+
+
+def run_concurrent_scenario(base_url: str, providers, length: str, include_audio: bool, provider: str, timeout: float,
+                            extra_params: Dict[str, str], concurrency: int, identical: bool = False) -> Dict[str, Any]:
+    """
+    Stream `concurrency` articles at once and measure throughput under the
+    providers' rate limits. Each gets its own topic unless `identical`, when
+    the requests coalesce into one run.
+    """
+    from app.services.coalescing_service import coalescer
+    from app.services.rate_limit_service import rate_limiter
+
+    providers.reset_stats()
+    before = dict(rate_limiter.stats)
+    coalescing_before = coalescer.snapshot()
+    params = {
+        "topic": "A lighthouse keeper who stops answering the radio",
+        "style": "hemingway",
+        "length": length,
+        "provider": provider,
+        "includeHeaders": "true",
+        "includeAudio": str(include_audio).lower(),
+        **extra_params,
+    }
+    def article_params(index: int) -> Dict[str, Any]:
+        return params if identical else {**params, "topic": f"{params['topic']} ({index + 1})"}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda index: stream_article(base_url, article_params(index), timeout), range(concurrency)))
+    wall = time.perf_counter() - started
+    coalescing = coalescer.snapshot()
+
+    errors = [
+        event["content"] for result in results for event in result["events"] if event["type"] == "error"
+    ]
+    totals = sorted(result["total_s"] for result in results)
+    snapshot = rate_limiter.snapshot()
+    return {
+        "scenario": f"{length}{'+audio' if include_audio else ''}x{concurrency}{' identical' if identical else ''}",
+        "length": length,
+        "include_audio": include_audio,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 4),
+        "articles_per_minute": round((concurrency - len(errors)) / wall * 60, 2),
+        "total_s": round(sum(totals) / len(totals), 4),
+        "max_total_s": totals[-1],
+        "time_to_first_event_s": round(
+            sum(result["time_to_first_event_s"] or 0 for result in results) / len(results), 4
+        ),
+        "provider_requests": providers.stats(),
+        "rate_limiter": {
+            **{key: snapshot[key] - before.get(key, 0) for key in before},
+            "concurrency": snapshot["concurrency"],
+        },
+        "coalescing": {
+            key: coalescing[key] - coalescing_before[key] for key in ("requests", "leaders", "joined", "reused")
+        },
+        "peak_python_memory_mb": round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2),
+        "error": errors[0] if errors else None,
+        "errors": len(errors),
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    for scenario in dict.fromkeys(run["scenario"] for run in runs):
+        scenario_runs = [run for run in runs if run["scenario"] == scenario]
+        totals = sorted(run["total_s"] for run in scenario_runs)
+        summary[scenario] = {
+            "runs": len(scenario_runs),
+            "mean_total_s": round(sum(totals) / len(totals), 4),
+            "min_total_s": totals[0],
+            "max_total_s": totals[-1],
+            "mean_time_to_first_event_s": round(
+                sum(run["time_to_first_event_s"] or 0 for run in scenario_runs) / len(scenario_runs), 4
+            ),
+            "mean_llm_calls": round(
+                sum(
+                    run["provider_requests"]["openai"]["total"] + run["provider_requests"]["anthropic"]["total"]
+                    for run in scenario_runs
+                ) / len(scenario_runs), 1
+            ),
+            "rate_limited": sum(
+                stats["rate_limited"] for run in scenario_runs for stats in run["provider_requests"].values()
+            ),
+            "max_peak_python_memory_mb": max(run["peak_python_memory_mb"] for run in scenario_runs),
+            "errors": sum(run.get("errors", 1 if run["error"] else 0) for run in scenario_runs),
+        }
+        if "concurrency" in scenario_runs[0]:
+            summary[scenario]["mean_articles_per_minute"] = round(
+                sum(run["articles_per_minute"] for run in scenario_runs) / len(scenario_runs), 2
+            )
+    return summary
+
+
+def compare(current: Dict[str, Any], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nComparison against {baseline_path} (commit {baseline.get('commit')}):")
+    for scenario, stats in current["summary"].items():
+        previous = baseline.get("summary", {}).get(scenario)
+        if not previous:
+            print(f"  {scenario:<14} no baseline")
+            continue
+        delta = stats["mean_total_s"] - previous["mean_total_s"]
+        percent = delta / previous["mean_total_s"] * 100 if previous["mean_total_s"] else 0.0
+        print(
+            f"  {scenario:<14} {previous['mean_total_s']:>8.2f}s -> {stats['mean_total_s']:>8.2f}s "
+            f"({percent:+.1f}%)  llm calls {previous['mean_llm_calls']} -> {stats['mean_llm_calls']}"
+        )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", nargs="+", default=["short", "medium", "long"], choices=["short", "medium", "long"])
+    parser.add_argument("--audio", choices=["off", "on", "both"], default="both")
+    parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Articles streamed at once per run")
+    parser.add_argument("--identical", action="store_true",
+                        help="Send the concurrent articles as identical requests, which coalesce into one run")
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--param", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra query parameter for the stream endpoint (repeatable)")
+    parser.add_argument("--regenerate", metavar="PATH",
+                        help="After each article, regenerate the scene or section at PATH (e.g. intro/0, headings/0) and time it")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    add_config_arguments(parser)
+    add_replay_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    extra_params = dict(param.split("=", 1) for param in args.param)
+
+    if args.record or args.replay:
+        providers = start_replay_providers(args.record or args.replay, record=bool(args.record),
+                                           latency_scale=args.replay_latency_scale)
+    else:
+        providers = start_fake_providers(config_from_args(args))
+    os.environ.update(providers.env())
+    # Match the app's client-side rate limits to the fakes unless set explicitly
+    for name in ("OPENAI", "ANTHROPIC", "ELEVENLABS", "RETRODIFFUSION"):
+        os.environ.setdefault(f"{name}_RPM", str(args.rate_limit_rpm))
+        os.environ.setdefault(f"{name}_TPM", "0")
+    if args.rate_limit_rpm:
+        os.environ.setdefault("RATE_LIMITS_ENABLED", "true")
+    # Repeated runs write the article again instead of replaying the last one
+    os.environ.setdefault("COALESCE_TTL_SECONDS", "0")
+    workdir = prepare_workdir()
+    tracemalloc.start()
+
+    port = free_port()
+    server, import_seconds = start_app(port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    audio_modes = {"off": [False], "on": [True], "both": [False, True]}[args.audio]
+    runs = []
+    try:
+        for length in args.lengths:
+            for include_audio in audio_modes:
+                for _ in range(args.repeat):
+                    if args.concurrency > 1:
+                        run = run_concurrent_scenario(base_url, providers, length, include_audio, args.provider,
+                                                      args.timeout, extra_params, args.concurrency, args.identical)
+                    else:
+                        run = run_scenario(base_url, providers, length, include_audio, args.provider, args.timeout,
+                                           extra_params, args.regenerate)
+                    runs.append(run)
+                    print(
+                        f"{run['scenario']:<14} total={run['total_s']:.2f}s first_event={run['time_to_first_event_s']}s "
+                        f"llm_calls={run['provider_requests']['openai']['total'] + run['provider_requests']['anthropic']['total']} "
+                        f"peak_mem={run['peak_python_memory_mb']}MB" + (f" error={run['error']}" if run["error"] else "")
+                    )
+                    if run.get("regenerate"):
+                        regenerated = run["regenerate"]
+                        print(f"{'':<14} regenerate {regenerated['path']}: {regenerated['scenes']} scenes in {regenerated['total_s']:.2f}s"
+                              + (f" error={regenerated['error']}" if regenerated["error"] else ""))
+                    if run.get("hedging", {}).get("calls"):
+                        print(f"{'':<14} hedging={run['hedging']}")
+                    if args.concurrency > 1:
+                        print(
+                            f"{'':<14} wall={run['wall_s']:.2f}s throughput={run['articles_per_minute']}/min "
+                            f"retries={run['rate_limiter']['retries']} throttled={run['rate_limiter']['throttled']} "
+                            f"coalesced={run['coalescing']['joined'] + run['coalescing']['reused']}/{run['coalescing']['requests']}"
+                        )
+    finally:
+        server.should_exit = True
+        providers.stop()
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "workdir": workdir,
+        "import_seconds": round(import_seconds, 4),
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {output}")
+    if baseline:
+        compare(report, baseline)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+CPU time spent serializing, parsing and rendering scenes while a long article
+is written, with scripts stored as JSON in `Scene.text` (the old layout)
+versus typed `Scene.script` with memoized prose:
+
+    python -m benchmarks.scene_storage_benchmark --headings 6 --repeat 5
+
+Replays the write loop without any LLM calls: before each scene the whole
+article so far is formatted for the drafting prompt (as build_scene_prompt
+does), then the scene is stored. At the end the article is formatted once
+more for the complete_content event and dumped as the SSE payload. Scene
+scripts come from the parser benchmark's generator, so they are the size and
+shape the app produces.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import List, Optional
+
+from app.schemas import ArticleLength, ArticleStructure, LongArticleStructure, MainHeading, Scene, SubHeading, SubSubHeading
+from app.services.llm_service import format_written_content
+from benchmarks.script_parser_benchmark import generate_scene
+
+
+def outline(headings: int) -> ArticleStructure:
+    """A long-article outline: intro, `headings` headings each with two subheadings and one sub-subheading each."""
+    def scenes(count: int) -> List[Scene]:
+        return [Scene(scene_description=f"Scene {i}", must_include="") for i in range(count)]
+
+    return ArticleStructure(length=ArticleLength.LONG, content=LongArticleStructure(
+        title="Benchmark",
+        intro_paragraphs=scenes(2),
+        main_headings=[
+            MainHeading(title=f"Heading {h}", scenes=scenes(2), sub_headings=[
+                SubHeading(title=f"Sub {h}.{s}", scenes=scenes(2), sub_headings=[
+                    SubSubHeading(title=f"Subsub {h}.{s}", scenes=scenes(1)),
+                ])
+                for s in range(2)
+            ])
+            for h in range(headings)
+        ],
+        conclusion_paragraphs=scenes(2),
+    ))
+
+
+def all_scenes(article: ArticleStructure) -> List[Scene]:
+    content = article.content
+    found = list(content.intro_paragraphs)
+    for heading in content.main_headings:
+        found += heading.scenes
+        for sub in heading.sub_headings:
+            found += sub.scenes
+            for subsub in sub.sub_headings:
+                found += subsub.scenes
+    return found + list(content.conclusion_paragraphs)
+
+
+def write_article(headings: int, seed: int, layout: str) -> float:
+    """CPU seconds for one simulated write with the given storage layout."""
+    rng = random.Random(seed)
+    article = outline(headings)
+    scripts = [generate_scene(rng, i) for i in range(len(all_scenes(article)))]
+
+    started = time.process_time()
+    for scene, script in zip(all_scenes(article), scripts):
+        format_written_content(article)  # the drafting prompt's "written so far"
+        if layout == "json_text":
+            scene.text = script.model_dump_json()
+        else:
+            scene.script = script
+    format_written_content(article)
+    json.dumps({"type": "complete_content", "content": {"structure": article.model_dump(mode="json", exclude_none=True)}})
+    return time.process_time() - started
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headings", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = {"scenes": len(all_scenes(outline(args.headings)))}
+    for layout in ("json_text", "script"):
+        times = [write_article(args.headings, args.seed + run, layout) for run in range(args.repeat)]
+        report[f"{layout}_cpu_ms"] = round(statistics.median(times) * 1000, 1)
+    report["cpu_saved"] = round(1 - report["script_cpu_ms"] / report["json_text_cpu_ms"], 3)
+    for key, value in report.items():
+        print(f"{key:<18} {value}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
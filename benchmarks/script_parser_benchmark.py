@@ -0,0 +1,180 @@
+"""
+Accuracy and speed of the rule-based scene-script parser.
+
+Builds a seeded corpus of scene scripts in the style of
+app/constants/sample_scene_script.py (named tags before and after quotes,
+pronoun tags, untagged turn-taking, narration-only paragraphs and
+multi-speaker exchanges like the sample's), renders each
+to prose the way the app does, parses it back and compares:
+
+    python -m benchmarks.script_parser_benchmark --scenes 500
+
+Reports exact-match and line accuracy for all scenes and for those above the
+confidence threshold (the ones that would skip the LLM call), how many of the
+deliberately unparseable scenes (single-quoted dialogue) are sent to the LLM,
+and parse time.
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from app.schemas import Paragraph, SceneLine, SceneScript
+from app.services.llm_service import LOCAL_SCRIPT_MIN_CONFIDENCE, scene_script_to_prose
+from app.services.script_parser_service import parse_scene_script
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "app" / "constants" / "sample_scene_script.py"
+
+CHARACTERS = [("John", "he"), ("Jane", "she"), ("Danny", "he"), ("Maria", "she"), ("Old Tom", "he"), ("Ines", "she")]
+DIALOGUE = [
+    "Net's caught again,", "Hello, how are you?", "I'm fine, thank you.", "We don't have time.",
+    "Did you hear the radio?", "Get down!", "Then cut it,", "I love you.", "It's only the wind,",
+    "Where were you last night?", "Nobody comes out here anymore,", "Hand me the lamp.",
+]
+ACTIONS = [
+    "turned to {other} and said,", "set down the rope and said,", "looked at the water and asked,",
+    "blushed and said,", "leaned closer and whispered,",
+]
+NARRATION = [
+    "They continued to talk as they walked down the street.", "The tide came in slow over the flats.",
+    "His neck was tight and the tendons showed.", "Rain ticked against the lighthouse glass.",
+    "They shared a kiss and continued to walk.", "Somewhere below, a gull complained.",
+]
+
+
+def load_sample() -> SceneScript:
+    return SceneScript.model_validate(json.loads(SAMPLE_PATH.read_text()))
+
+
+def tagged_turn(rng: random.Random, speaker: str, other: str, pronoun: str, style: str) -> List[SceneLine]:
+    """One quote from `speaker` with its dialogue tag (if any) in the given style."""
+    if style == "untagged":
+        quote = rng.choice([line for line in DIALOGUE if not line.endswith(",")])
+    else:
+        quote = rng.choice(DIALOGUE)
+    if style == "before":
+        return [
+            SceneLine(speaker="Narrator", text=f"{speaker} {rng.choice(ACTIONS).format(other=other)}"),
+            SceneLine(speaker=speaker, text=quote),
+        ]
+    lines = [SceneLine(speaker=speaker, text=quote)]
+    if style == "after":
+        lines.append(SceneLine(speaker="Narrator", text=f"said {speaker}."))
+    elif style == "after_name_first":
+        lines.append(SceneLine(speaker="Narrator", text=f"{speaker} said. {rng.choice(NARRATION)}"))
+    elif style == "pronoun":
+        lines.append(SceneLine(speaker="Narrator", text=f"{pronoun} said."))
+    return lines
+
+
+def generate_scene(rng: random.Random, index: int) -> SceneScript:
+    """
+    One scene between two characters. Most paragraphs are a single speaker's
+    turn (the usual prose convention) with any tag style, some are
+    narration only, and some are sample-style exchanges with every quote tagged.
+    """
+    (first, first_pronoun), (second, second_pronoun) = rng.sample(CHARACTERS, 2)
+    pronouns = {first: first_pronoun, second: second_pronoun}
+    speaker, other = first, second
+    spoken = set()
+    paragraphs = []
+    for _ in range(rng.randint(1, 5)):
+        kind = rng.random()
+        lines: List[SceneLine] = []
+        if kind < 0.2:
+            lines.append(SceneLine(speaker="Narrator", text=rng.choice(NARRATION)))
+        elif kind < 0.35:
+            for _ in range(rng.randint(2, 4)):
+                lines += tagged_turn(rng, speaker, other, pronouns[speaker], rng.choice(["after", "before"]))
+                spoken.add(speaker)
+                speaker, other = other, speaker
+        else:
+            style = rng.choice(["after", "after_name_first", "before", "pronoun", "untagged"])
+            if style in ("pronoun", "untagged") and len(spoken) < 2:
+                style = "after"  # turn-taking only identifies speakers once both have spoken
+            lines += tagged_turn(rng, speaker, other, pronouns[speaker], style)
+            if rng.random() < 0.3:
+                lines.append(SceneLine(speaker="Narrator", text=rng.choice(NARRATION)))
+                lines += tagged_turn(rng, speaker, other, pronouns[speaker], "untagged")
+            spoken.add(speaker)
+            speaker, other = other, speaker
+        paragraphs.append(Paragraph(lines=lines))
+    return SceneScript(scene_title=f"Scene {index}", paragraphs=paragraphs)
+
+
+def merged_lines(script: SceneScript) -> List[Tuple[str, str]]:
+    """Lines with consecutive narrator lines joined, since prose can't say where they were split."""
+    merged: List[Tuple[str, str]] = []
+    for paragraph in script.paragraphs:
+        for line in paragraph.lines:
+            if merged and line.speaker == "Narrator" and merged[-1][0] == "Narrator":
+                merged[-1] = ("Narrator", f"{merged[-1][1]} {line.text}")
+            else:
+                merged.append((line.speaker, line.text.strip()))
+    return merged
+
+
+def score(expected: SceneScript, actual: SceneScript) -> Tuple[bool, float]:
+    expected_lines, actual_lines = merged_lines(expected), merged_lines(actual)
+    matches = sum(1 for e, a in zip(expected_lines, actual_lines) if e == a)
+    return expected_lines == actual_lines, matches / max(len(expected_lines), len(actual_lines), 1)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hard-rate", type=float, default=0.1,
+                        help="Fraction of scenes rendered with single-quoted dialogue, which should fall back to the LLM")
+    parser.add_argument("--min-confidence", type=float, default=LOCAL_SCRIPT_MIN_CONFIDENCE)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus = [load_sample()] + [generate_scene(rng, index) for index in range(1, args.scenes)]
+
+    results = []
+    for index, script in enumerate(corpus):
+        prose = scene_script_to_prose(script)
+        hard = index > 0 and rng.random() < args.hard_rate and '"' in prose
+        if hard:
+            prose = prose.replace('"', "'")
+        started = time.perf_counter()
+        parsed = parse_scene_script(prose, script.scene_title)
+        elapsed = time.perf_counter() - started
+        exact, line_accuracy = score(script, parsed.script)
+        results.append({
+            "hard": hard, "exact": exact, "line_accuracy": line_accuracy,
+            "confidence": parsed.confidence, "seconds": elapsed,
+        })
+
+    accepted = [result for result in results if result["confidence"] >= args.min_confidence]
+    hard = [result for result in results if result["hard"]]
+    times = sorted(result["seconds"] for result in results)
+    report = {
+        "scenes": len(results),
+        "min_confidence": args.min_confidence,
+        "exact_match": round(sum(r["exact"] for r in results) / len(results), 4),
+        "line_accuracy": round(statistics.mean(r["line_accuracy"] for r in results), 4),
+        "mean_confidence": round(statistics.mean(r["confidence"] for r in results), 4),
+        "accepted_locally": round(len(accepted) / len(results), 4),
+        "accepted_exact_match": round(sum(r["exact"] for r in accepted) / len(accepted), 4) if accepted else None,
+        "accepted_line_accuracy": round(statistics.mean(r["line_accuracy"] for r in accepted), 4) if accepted else None,
+        "hard_scenes": len(hard),
+        "hard_sent_to_llm": round(sum(r["confidence"] < args.min_confidence for r in hard) / len(hard), 4) if hard else None,
+        "parse_us_p50": round(times[len(times) // 2] * 1e6, 1),
+        "parse_us_p95": round(times[int(len(times) * 0.95)] * 1e6, 1),
+    }
+    for key, value in report.items():
+        print(f"{key:<24} {value}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
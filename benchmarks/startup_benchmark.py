@@ -0,0 +1,91 @@
+"""
+Import time and cold start to first request, with no API keys configured.
+
+    python -m benchmarks.startup_benchmark --repeat 5 --output startup.json
+
+Each measurement runs in a fresh interpreter so module caches don't hide the
+cost of eager imports or client construction.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+import httpx
+
+from benchmarks.run_benchmark import REPO_ROOT, free_port, git_commit
+
+KEY_VARIABLES = ["OPENAI_API_KEY", "ANTHROPIC_API_KEY", "ELEVENLABS_API_KEY", "RETRODIFFUSION_API_KEY"]
+
+
+def clean_env(workdir: str) -> dict:
+    env = {key: value for key, value in os.environ.items() if key not in KEY_VARIABLES}
+    env["PYTHONPATH"] = str(REPO_ROOT)
+    env["ARTICLES_DB_PATH"] = os.path.join(workdir, "articles.db")
+    return env
+
+
+def measure_import(workdir: str) -> float:
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    output = subprocess.check_output([sys.executable, "-c", code], cwd=workdir, env=clean_env(workdir), stderr=subprocess.DEVNULL, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_cold_start(workdir: str, timeout: float = 30.0) -> float:
+    """Seconds from launching uvicorn to the first successful response."""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=clean_env(workdir), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode} before serving a request")
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/v1/styles", timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"Server did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="longslop-startup-")
+    os.symlink(REPO_ROOT / "frontend", os.path.join(workdir, "frontend"))
+
+    imports = [measure_import(workdir) for _ in range(args.repeat)]
+    cold_starts = [measure_cold_start(workdir) for _ in range(args.repeat)]
+    report = {
+        "commit": git_commit(),
+        "import_s": {"median": round(statistics.median(imports), 4), "min": round(min(imports), 4), "max": round(max(imports), 4)},
+        "cold_start_to_first_request_s": {
+            "median": round(statistics.median(cold_starts), 4),
+            "min": round(min(cold_starts), 4),
+            "max": round(max(cold_starts), 4),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
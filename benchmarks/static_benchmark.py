@@ -0,0 +1,159 @@
+"""
+Bytes transferred and load time for the frontend and generated media, served
+by plain StaticFiles versus CachedStaticFiles:
+
+    python -m benchmarks.static_benchmark --images 12 --audio-mb 4
+
+Copies frontend/ into a scratch directory, adds `--images` generated PNGs and
+a generated MP3 under content-hashed names, then simulates a browser with an
+HTTP cache loading the article page:
+
+- first view: every asset with an empty cache;
+- repeat view: fresh immutable responses are reused without a request, the
+  rest are revalidated with If-None-Match / If-Modified-Since;
+- seeks: `--seeks` Range requests of 256 KiB into the MP3, as an audio
+  element makes when the listener scrubs.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+from starlette.testclient import TestClient
+
+from app.static_files import CachedStaticFiles, content_digest, precompress_directory
+from benchmarks.run_benchmark import REPO_ROOT
+
+ACCEPT_ENCODING = "br, gzip"
+
+
+def build_site(workdir: str, images: int, audio_mb: float, seed: int) -> Dict[str, List[str]]:
+    """Lay out a frontend/ and static/ tree like a running app's. Returns the URLs one article page loads."""
+    rng = random.Random(seed)
+    frontend = os.path.join(workdir, "frontend")
+    shutil.copytree(REPO_ROOT / "frontend", frontend, ignore=shutil.ignore_patterns("*.gz", "*.br", "output"))
+    os.makedirs(os.path.join(frontend, "output"))
+    os.makedirs(os.path.join(workdir, "static", "images"))
+
+    audio = rng.randbytes(int(audio_mb * 1024 * 1024))
+    audio_name = f"story-{content_digest(audio)}.mp3"
+    with open(os.path.join(frontend, "output", audio_name), "wb") as f:
+        f.write(audio)
+
+    image_urls = []
+    for _ in range(images):
+        image = rng.randbytes(60 * 1024)  # a 256x256 PNG is roughly this size
+        name = f"{rng.getrandbits(128):032x}-{content_digest(image)}.png"
+        with open(os.path.join(workdir, "static", "images", name), "wb") as f:
+            f.write(image)
+        image_urls.append(f"/static/images/{name}")
+
+    return {
+        "page": ["/frontend/", "/frontend/script.js", "/frontend/style.css", "/frontend/assets/banner.png", *image_urls],
+        "audio": [f"/frontend/output/{audio_name}"],
+    }
+
+
+def make_app(workdir: str, cached: bool) -> Starlette:
+    static_class = CachedStaticFiles if cached else StaticFiles
+    return Starlette(routes=[
+        Mount("/frontend", static_class(directory=os.path.join(workdir, "frontend"), html=True)),
+        Mount("/static", static_class(directory=os.path.join(workdir, "static"))),
+    ])
+
+
+class BrowserCache:
+    """Just enough of an HTTP cache: fresh immutable entries, and validators for the rest."""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, str]] = {}
+
+    def fetch(self, client: TestClient, url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        entry = self.entries.get(url) if not headers else None  # range requests aren't cached here
+        if entry and "immutable" in entry.get("cache-control", ""):
+            return {"requests": 0, "bytes": 0, "seconds": 0.0}
+        request_headers = {"accept-encoding": ACCEPT_ENCODING, **(headers or {})}
+        if entry and "etag" in entry:
+            request_headers["if-none-match"] = entry["etag"]
+        if entry and "last-modified" in entry:
+            request_headers["if-modified-since"] = entry["last-modified"]
+        started = time.perf_counter()
+        with client.stream("GET", url, headers=request_headers) as response:
+            # Count what went over the wire, before any content decoding
+            size = sum(len(chunk) for chunk in response.iter_raw())
+        elapsed = time.perf_counter() - started
+        if response.status_code == 200 and not headers:
+            self.entries[url] = dict(response.headers)
+        return {"requests": 1, "bytes": size, "seconds": elapsed, "status": response.status_code}
+
+
+def load(cache: BrowserCache, client: TestClient, urls: List[str]) -> Dict[str, float]:
+    results = [cache.fetch(client, url) for url in urls]
+    return {
+        "requests": sum(r["requests"] for r in results),
+        "bytes": sum(r["bytes"] for r in results),
+        "ms": round(sum(r["seconds"] for r in results) * 1000, 2),
+    }
+
+
+def run(workdir: str, urls: Dict[str, List[str]], cached: bool, seeks: int, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    cache = BrowserCache()
+    with TestClient(make_app(workdir, cached)) as client:
+        first = load(cache, client, urls["page"] + urls["audio"])
+        repeat = load(cache, client, urls["page"] + urls["audio"])
+
+        audio_url = urls["audio"][0]
+        size = int(client.head(audio_url).headers["content-length"])
+        seek_results = []
+        for _ in range(seeks):
+            start = rng.randrange(0, size - 256 * 1024)
+            seek_results.append(cache.fetch(client, audio_url, {"range": f"bytes={start}-{start + 256 * 1024 - 1}"}))
+    return {
+        "first_view": first,
+        "repeat_view": repeat,
+        "seeks": {
+            "requests": seeks,
+            "statuses": sorted({r["status"] for r in seek_results}),
+            "bytes": sum(r["bytes"] for r in seek_results),
+            "ms_p50": round(statistics.median(r["seconds"] for r in seek_results) * 1000, 2),
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--audio-mb", type=float, default=4.0)
+    parser.add_argument("--seeks", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        urls = build_site(workdir, args.images, args.audio_mb, args.seed)
+        baseline = run(workdir, urls, cached=False, seeks=args.seeks, seed=args.seed)
+        precompress_directory(os.path.join(workdir, "frontend"))
+        cached = run(workdir, urls, cached=True, seeks=args.seeks, seed=args.seed)
+
+    report = {"generated_at": formatdate(usegmt=True), "StaticFiles": baseline, "CachedStaticFiles": cached}
+    for name in ("StaticFiles", "CachedStaticFiles"):
+        for phase, values in report[name].items():
+            print(f"{name:<18} {phase:<12} {json.dumps(values)}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
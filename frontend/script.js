@@ -1,5 +1,6 @@
 document.addEventListener("DOMContentLoaded", async () => {
     const styleSelect = document.getElementById('style');
+    const presetSelect = document.getElementById('preset');
     const form = document.getElementById('generateForm');
     const outputSection = document.getElementById('outputSection');
     const statusMessage = document.getElementById('statusMessage');
@@ -19,6 +20,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
     
     let sseSource = null;
+    let jobId = null;
     let rawDataVisible = false;
     let cumulativeData = [];
   
@@ -40,7 +42,27 @@ document.addEventListener("DOMContentLoaded", async () => {
       }
     }
   
+    // Fetch pipeline presets (draft, standard, full) and populate the mode dropdown
+    async function fetchPresets() {
+      try {
+        const res = await fetch('/api/v1/presets');
+        if (!res.ok) throw new Error('Failed to fetch presets');
+        const presets = await res.json();
+        Object.keys(presets).forEach(key => {
+          const opt = document.createElement('option');
+          opt.value = key;
+          opt.innerText = presets[key].name;
+          opt.title = presets[key].description;
+          opt.selected = key === 'standard';
+          presetSelect.appendChild(opt);
+        });
+      } catch (e) {
+        console.error(e);
+      }
+    }
+  
     await fetchStyles();
+    await fetchPresets();
   
     form.addEventListener('submit', (e) => {
       e.preventDefault();
@@ -68,11 +90,21 @@ document.addEventListener("DOMContentLoaded", async () => {
         style: style,
         length: length,
         provider: 'openai',
-        includeHeaders: includeHeaders,
-        includeAudio: includeAudio
+        includeHeaders: includeHeaders
       });
+      if (presetSelect.value) {
+        params.set('preset', presetSelect.value);
+      }
+      // Left empty, the preset decides whether the article is narrated
+      if (includeAudio) {
+        params.set('includeAudio', includeAudio);
+      }
   
-      sseSource = new EventSource(`/api/v1/write-article-stream?${params.toString()}`);
+      follow(`/api/v1/write-article-stream?${params.toString()}`);
+    }
+
+    function follow(url) {
+      sseSource = new EventSource(url);
   
       sseSource.onmessage = (event) => {
         if (event.data === "" && event.lastEventId === "end") {
@@ -95,6 +127,13 @@ document.addEventListener("DOMContentLoaded", async () => {
           console.error("Error parsing SSE message:", err);
         }
       };
+
+      // Sent when this tab fell too far behind the job; pick up again where it left off
+      sseSource.addEventListener('dropped', (event) => {
+        sseSource.close();
+        const offset = JSON.parse(event.data).offset;
+        follow(`/api/v1/jobs/${jobId}/events?offset=${offset}`);
+      });
   
       sseSource.onerror = (error) => {
         console.error("SSE error:", error);
@@ -125,6 +164,13 @@ document.addEventListener("DOMContentLoaded", async () => {
   
     function handleEvent(msg) {
       switch(msg.type) {
+        case 'trace':
+          // Waterfall is available at /api/v1/debug/traces/<trace_id>
+          console.log("Trace ID:", msg.content.trace_id);
+          // Anyone else can watch this article being written at /api/v1/jobs/<job_id>/events
+          jobId = msg.content.job_id;
+          console.log("Job ID:", jobId);
+          break;
         case 'plan':
           updateStep('plan', true);
           statusMessage.textContent = "Plan received.";
@@ -152,6 +198,9 @@ document.addEventListener("DOMContentLoaded", async () => {
           } else if (msg.content.audio_error) {
             updateStep('audio', false);
             statusMessage.textContent = "Error generating audio: " + msg.content.audio_error;
+          } else if (msg.content.audio_deferred) {
+            statusMessage.textContent = "Content generation complete. The narration will follow.";
+            pollAudio(msg.content.article_id);
           }
 
           // Display the article
@@ -169,6 +218,11 @@ document.addEventListener("DOMContentLoaded", async () => {
           mainContainer.appendChild(progressSection);
           
           break;
+        case 'degraded':
+          // The article was cut back to finish inside its deadline
+          statusMessage.textContent = "Short on time, skipped: " +
+            Object.keys(msg.content.degraded).join(", ").replaceAll("_", " ") + ".";
+          break;
         case 'error':
           statusMessage.textContent = "An error occurred: " + msg.content;
           console.error("Error from server:", msg.content);
@@ -223,8 +277,9 @@ document.addEventListener("DOMContentLoaded", async () => {
                 let html = '';
                 
                 // Add the scene description/text
-                if (scene.text) {
-                    const sceneText = JSON.parse(scene.text);
+                // Scenes carry their script as an object; older ones stored it as JSON in text
+                const sceneText = scene.script || (scene.text ? JSON.parse(scene.text) : null);
+                if (sceneText) {
                     html += `<div class="scene">`;
                     sceneText.paragraphs.forEach(paragraph => {
                         paragraph.lines.forEach(line => {
@@ -307,6 +362,27 @@ document.addEventListener("DOMContentLoaded", async () => {
       articleAudio.src = fullPath;
     }
   
+    // Narration deferred past the deadline is made after the response; wait for it
+    async function pollAudio(articleId) {
+      try {
+        const res = await fetch(`/api/v1/articles/${articleId}/audio`);
+        if (!res.ok) throw new Error('Failed to fetch audio status');
+        const audio = await res.json();
+        if (audio.status === "pending") {
+          setTimeout(() => pollAudio(articleId), 5000);
+        } else if (audio.status === "ready") {
+          updateStep('audio', true);
+          displayAudio(audio.audio_path);
+          mainContainer.insertBefore(audioSection, mainContainer.firstChild);
+        } else {
+          updateStep('audio', false);
+          statusMessage.textContent = "Error generating audio: " + (audio.audio_error || "no audio was made");
+        }
+      } catch (err) {
+        console.error("Error polling for audio:", err);
+      }
+    }
+
     window.toggleRawData = function() {
       rawDataVisible = !rawDataVisible;
       if (rawDataVisible) {
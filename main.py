@@ -1,17 +1,32 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
+from contextlib import asynccontextmanager
 from app.routes.article_routes import router as article_router
-from app.database import ArticleDB
+from app.services.service_container import services
+from app.static_files import (
+    IMAGE_CACHE_DIR, IMAGE_CACHE_URL, STATIC_DIR, STATIC_URL, CachedStaticFiles, precompress_directory, static_url
+)
 import logging
+import os
+import threading
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-db = ArticleDB()  # Initialize the database
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ensure the database is connected and tables are created; API clients
+    # are created lazily on first use and shared across requests
+    services.db
+    app.state.services = services
+    # Open provider connections in the background so startup isn't delayed
+    threading.Thread(target=services.warm_up, name="connection-warm-up", daemon=True).start()
+    yield
+    services.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -26,11 +41,19 @@ app.add_middleware(
 # Include the article routes
 app.include_router(article_router)
 
-# Mount the frontend directory
-app.mount("/frontend", StaticFiles(directory="frontend", html=True), name="frontend")
+# Mount the frontend directory, with gzip/brotli copies of its text assets
+# refreshed whenever a source file is newer than its copy
+logger.info(f"Precompressed {precompress_directory('frontend')} frontend assets")
+app.mount("/frontend", CachedStaticFiles(directory="frontend", html=True), name="frontend")
 
-# Mount the static directory for images
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount the static directory for images (created on demand by the image service)
+os.makedirs(STATIC_DIR, exist_ok=True)
+app.mount(STATIC_URL, CachedStaticFiles(directory=STATIC_DIR), name="static")
+
+# An image cache configured outside the static directory gets a mount of its own
+if static_url(IMAGE_CACHE_DIR) is None:
+    os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+    app.mount(IMAGE_CACHE_URL, CachedStaticFiles(directory=IMAGE_CACHE_DIR), name="image-cache")
 
 # Add root redirect to frontend
 @app.get("/")
@@ -43,11 +66,6 @@ async def internal_error_handler(request, exc):
     logger.error(f"Internal Server Error: {str(exc)}", exc_info=True)
     return {"detail": str(exc)}, 500
 
-@app.on_event("startup")
-async def startup_event():
-    # Ensure the database is connected and tables are created
-    db.create_tables()
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
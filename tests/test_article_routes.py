@@ -0,0 +1,67 @@
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import article_routes
+from app.schemas import ArticleLength, ArticleStructure, Paragraph, Scene, SceneLine, SceneScript, ShortArticleStructure
+from app.services import llm_service
+from app.services.event_bus_service import EventBus
+from app.services.service_container import services
+
+
+class ArticleStore:
+    def save_article(self, *args):
+        return 7
+
+
+def outline():
+    return ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="Harbor", scenes=[Scene(scene_description=f"Scene {i}", must_include="") for i in range(2)]
+    ))
+
+
+def events(response):
+    return [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: {")]
+
+
+def test_critique_is_skipped_once_the_deadline_has_run_out(monkeypatch, tmp_path):
+    real_sleep = asyncio.sleep
+    critiqued = []
+    written = []
+
+    def slow_plan(*args):
+        # The whole one-second budget goes on the plan
+        time.sleep(1.1)
+        return "A keeper and a radio."
+
+    def write_scene(*args, style_attempts=3, brief=False, **kwargs):
+        written.append((style_attempts, brief))
+        return SceneScript(scene_title="Harbor", paragraphs=[
+            Paragraph(lines=[SceneLine(speaker="Narrator", text="The tide turned.")])
+        ])
+
+    monkeypatch.setattr(article_routes.asyncio, "sleep", lambda seconds: real_sleep(0))
+    monkeypatch.setattr(article_routes, "COALESCE_REQUESTS", False)
+    monkeypatch.setattr(article_routes, "event_bus", EventBus(directory=str(tmp_path)))
+    monkeypatch.setattr(article_routes, "generate_article_plan", slow_plan)
+    monkeypatch.setattr(article_routes, "structure_article_plan", lambda *args: outline())
+    monkeypatch.setattr(article_routes, "critique_and_elaborate_article_plan", lambda *args: critiqued.append(args))
+    monkeypatch.setattr(llm_service, "write_scene", write_scene)
+    monkeypatch.setitem(services._instances, "db", ArticleStore())
+    app = FastAPI()
+    app.include_router(article_routes.router)
+
+    with TestClient(app).stream("GET", "/api/v1/write-article-stream", params={
+        "topic": "tides", "length": "short", "deadlineSeconds": 1,
+    }) as response:
+        received = events(response)
+
+    assert critiqued == []
+    assert [event["type"] for event in received] == ["trace", "plan", "outline", "degraded", "complete_content"]
+    assert set(received[3]["content"]["degraded"]) == {"critique", "style_retries", "images", "short_scenes"}
+    # Every scene was still written, each degraded
+    assert written == [(1, True), (1, True)]
+    assert received[4]["content"]["article_id"] == 7
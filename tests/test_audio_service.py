@@ -75,6 +75,45 @@ def test_voice_assignment():
     assert len(voice_mapping) == len(test_speakers), "Not all speakers were assigned voices"
     assert "Narrator" in voice_mapping, "Narrator must be assigned a voice"
 
+def test_concurrent_narration_of_one_segment_publishes_whole_files(tmp_path, monkeypatch):
+    """Two threads caching the same segment each write their own temp file"""
+    import threading
+    from types import SimpleNamespace
+    from app.services import audio_service as audio_module
+    from app.services.service_container import services
+
+    audio = b"ID3" + bytes(range(256)) * 16
+    both_written = threading.Barrier(2, timeout=5)
+    replace = os.replace
+
+    def replace_together(source, target):
+        # Neither thread publishes until both have written their temp file
+        both_written.wait()
+        replace(source, target)
+
+    def convert(**kwargs):
+        yield audio
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(audio_module, "AUDIO_SEGMENT_CACHE", True)
+    monkeypatch.setattr(audio_module, "AUDIO_SEGMENT_CACHE_DIR", str(tmp_path / "segments"))
+    monkeypatch.setattr(audio_module.os, "replace", replace_together)
+    monkeypatch.setitem(services._instances, "elevenlabs_client", SimpleNamespace(text_to_speech=SimpleNamespace(convert=convert)))
+    audio_service = AudioService()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(audio_service.generate_audio_for_text("The tide turned.", "voice")))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [audio, audio]
+    (cached,) = os.listdir(tmp_path / "segments")
+    assert (tmp_path / "segments" / cached).read_bytes() == audio
+
 def main():
     # Load environment variables
     load_dotenv()
@@ -0,0 +1,73 @@
+import asyncio
+
+from app.services.coalescing_service import RequestCoalescer
+from app.services.event_bus_service import END_EVENT, EventBus
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def collect(job):
+    return [event async for event in job.subscribe()]
+
+
+def test_identical_requests_share_one_run_and_replay_it_within_the_ttl():
+    async def scenario():
+        clock = Clock()
+        coalescer = RequestCoalescer(ttl_seconds=60, bus=EventBus(directory=None, clock=clock))
+        runs = []
+        release = asyncio.Event()
+
+        async def pipeline(job_id):
+            runs.append(job_id)
+            yield "data: plan\n\n"
+            await release.wait()
+            yield "data: article\n\n"
+            yield END_EVENT
+
+        key = coalescer.key(topic="tides", length="short")
+        leader_role, leader = coalescer.job(key, pipeline)
+        leader_task = asyncio.ensure_future(collect(leader))
+        await asyncio.sleep(0)
+        # Joins after the first event was sent, and is replayed it
+        joined_role, joined = coalescer.job(key, pipeline)
+        joined_task = asyncio.ensure_future(collect(joined))
+        release.set()
+        expected = ["id: 0\ndata: plan\n\n", "id: 1\ndata: article\n\n", f"id: 2\n{END_EVENT}"]
+        assert await leader_task == expected
+        assert await joined_task == expected
+
+        clock.now = 30
+        reused_role, reused = coalescer.job(key, pipeline)
+        assert await collect(reused) == expected
+        clock.now = 100
+        expired_role, expired = coalescer.job(key, pipeline)
+        await collect(expired)
+
+        assert (leader_role, joined_role, reused_role, expired_role) == ("leader", "joined", "reused", "leader")
+        assert len(set(runs)) == 2
+        snapshot = coalescer.snapshot()
+        assert (snapshot["requests"], snapshot["coalescing_ratio"]) == (4, 0.5)
+
+    asyncio.run(scenario())
+
+
+def test_failed_runs_are_not_replayed():
+    async def scenario():
+        coalescer = RequestCoalescer(ttl_seconds=60, bus=EventBus(directory=None))
+
+        async def pipeline(job_id):
+            yield 'data: {"type": "error"}\n\n'
+
+        key = coalescer.key(topic="tides")
+        _, first = coalescer.job(key, pipeline)
+        await collect(first)
+        role, _ = coalescer.job(key, pipeline)
+        assert role == "leader"
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+from app.database import ArticleDB
+from app.schemas import (
+    ArticleLength,
+    ArticleStructure,
+    LongArticleStructure,
+    MainHeading,
+    Paragraph,
+    Scene,
+    SceneLine,
+    SceneScript,
+    ShortArticleStructure,
+    SubHeading,
+    SubSubHeading,
+)
+
+
+def written_scene(description):
+    scene = Scene(scene_description=description, must_include="")
+    scene.script = SceneScript(scene_title=description, paragraphs=[Paragraph(lines=[
+        SceneLine(speaker="Danny", text="Net's caught again,"),
+        SceneLine(speaker="Narrator", text="Danny said."),
+    ])])
+    return scene
+
+
+def db_at(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTICLES_DB_PATH", str(tmp_path / "articles.db"))
+    db = ArticleDB()
+    db.create_tables()
+    return db
+
+
+def test_long_article_round_trip(tmp_path, monkeypatch):
+    db = db_at(tmp_path, monkeypatch)
+    article = ArticleStructure(length=ArticleLength.LONG, content=LongArticleStructure(
+        title="The Flats",
+        intro_paragraphs=[written_scene("intro")],
+        main_headings=[MainHeading(
+            title="Low Tide",
+            scenes=[written_scene("heading")],
+            sub_headings=[SubHeading(
+                title="The Net",
+                scenes=[written_scene("sub")],
+                sub_headings=[SubSubHeading(title="Knots", scenes=[written_scene("subsub")])],
+            )],
+        )],
+        conclusion_paragraphs=[written_scene("conclusion")],
+    ))
+
+    saved = db.get_article(db.save_article("tides", "new_yorker", article))
+    heading = saved["main_headings"][0]
+    assert saved["intro_paragraphs"][0]["script"]["paragraphs"][0]["lines"][0]["speaker"] == "Danny"
+    assert heading["paragraphs"][0]["scene_description"] == "heading"
+    assert heading["sub_headings"][0]["sub_headings"][0]["paragraphs"][0]["scene_description"] == "subsub"
+    restored = Scene.model_validate(saved["conclusion_paragraphs"][0])
+    assert restored.prose == "\"Net's caught again,\" Danny said."
+
+
+def test_short_article_scenes_are_saved(tmp_path, monkeypatch):
+    db = db_at(tmp_path, monkeypatch)
+    article = ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="Harbor", scenes=[written_scene("one"), written_scene("two")],
+    ))
+    saved = db.get_article(db.save_article("harbor", "new_yorker", article))
+    assert [scene["scene_description"] for scene in saved["scenes"]] == ["one", "two"]
+
+
+def test_prose_is_memoized_per_script():
+    scene = written_scene("memo")
+    prose = scene.prose
+    assert scene.prose is prose
+    scene.script = SceneScript(scene_title="memo", paragraphs=[])
+    assert scene.prose == ""
+    legacy = Scene(scene_description="old", must_include="", text=written_scene("old").script.model_dump_json())
+    assert legacy.prose == prose
+
+
+def test_preset_latency_is_grouped_by_preset_and_length(tmp_path, monkeypatch):
+    db = db_at(tmp_path, monkeypatch)
+    article = ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="Harbor", scenes=[written_scene("one")],
+    ))
+    for preset, duration_ms in (("draft", 20000), ("draft", 40000), ("full", 600000)):
+        db.save_article("harbor", "new_yorker", article, preset=preset, duration_ms=duration_ms)
+    db.save_article("harbor", "new_yorker", article)
+
+    latency = db.get_preset_latency()
+    assert latency["draft"]["short"] == {"articles": 2, "median_ms": 30000, "mean_ms": 30000, "max_ms": 40000}
+    assert latency["full"]["short"]["articles"] == 1
+    assert set(latency) == {"draft", "full"}
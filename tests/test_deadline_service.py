@@ -0,0 +1,81 @@
+from app.schemas import (
+    ArticleLength, ArticleStructure, Degradation, Paragraph, Scene, SceneLine, SceneScript, ShortArticleStructure
+)
+from app.services import llm_service
+from app.services.deadline_service import Deadline
+from app.services.service_container import services
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def script(lines):
+    return SceneScript(scene_title="Harbor", paragraphs=[
+        Paragraph(lines=[SceneLine(speaker="Narrator", text="The tide turned.")] * lines)
+    ])
+
+
+def test_degrades_in_order_as_the_budget_runs_out():
+    clock = Clock()
+    deadline = Deadline(100, reserve=10, clock=clock)
+    assert deadline.schedule(3, 20) == set()
+
+    clock.now = 50  # 40s before the reserve, 60s of scenes to go
+    assert deadline.schedule(3, 20) == {Degradation.STYLE_RETRIES, Degradation.IMAGES}
+
+    clock.now = 70
+    assert Degradation.SHORT_SCENES in deadline.schedule(3, 20)
+    # Degradations stay on even if the projection recovers
+    assert deadline.schedule(1, 1) == {Degradation.STYLE_RETRIES, Degradation.IMAGES, Degradation.SHORT_SCENES}
+
+    assert deadline.fits_audio(script(30))
+    assert not deadline.fits_audio(script(31))
+
+
+def test_write_full_article_degrades_the_scenes_after_the_overrun(monkeypatch):
+    clock = Clock()
+    deadline = Deadline(60, clock=clock)
+    calls = []
+
+    def write_scene(*args, style_attempts=3, brief=False, **kwargs):
+        calls.append((style_attempts, brief))
+        clock.now += 60
+        return script(1)
+
+    class Images:
+        def generate_scene_image(self, scene_script):
+            return "output/image.png"
+
+    monkeypatch.setattr(llm_service, "write_scene", write_scene)
+    monkeypatch.setitem(services._instances, "image_service", Images())
+    plan = ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="Harbor", scenes=[Scene(scene_description=f"Scene {i}", must_include="") for i in range(3)]
+    ))
+
+    article, _ = llm_service.write_full_article("tides", "plan", plan, include_audio=False, deadline=deadline)
+
+    assert calls == [(3, False), (1, True), (1, True)]
+    assert [scene.image_url for scene in article.content.scenes] == ["output/image.png", None, None]
+    assert deadline.summary()["degraded"] == {
+        "style_retries": {"scenes": [1, 2]},
+        "short_scenes": {"scenes": [1, 2]},
+        "images": {"scenes": [1, 2]},
+    }
+
+
+def test_critique_only_runs_while_the_write_still_fits_after_it(monkeypatch):
+    from app.services import deadline_service
+
+    monkeypatch.setattr(deadline_service, "DEADLINE_CRITIQUE_SECONDS", 30)
+    monkeypatch.setattr(deadline_service, "DEADLINE_SCENE_SECONDS", 10)
+    clock = Clock()
+    deadline = Deadline(100, reserve=10, clock=clock)
+    assert deadline.fits_critique(6)
+    assert not deadline.fits_critique(7)
+    clock.now = 20
+    assert not deadline.fits_critique(6)
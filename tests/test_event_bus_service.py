@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+from app.services.event_bus_service import EventBus
+
+
+async def collect(job):
+    return [event async for event in job.subscribe()]
+
+
+def test_late_subscribers_catch_up_from_the_log_on_disk(tmp_path):
+    async def scenario():
+        bus = EventBus(buffer_size=2, directory=str(tmp_path))
+
+        async def pipeline(job_id):
+            for i in range(5):
+                yield f"data: {i}\n\n"
+
+        job = bus.start(pipeline)
+        while not job.done:
+            await asyncio.sleep(0)
+
+        events = [event async for event in job.subscribe(offset=1)]
+        assert events == [f"id: {i}\ndata: {i}\n\n" for i in range(1, 5)]
+        assert job.status()["buffered_from"] == 3
+        assert bus.get(job.job_id) is job
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscribers_are_dropped_without_holding_up_the_job(tmp_path):
+    async def scenario():
+        bus = EventBus(buffer_size=2, directory=str(tmp_path))
+        steps = [asyncio.Event(), asyncio.Event()]
+
+        async def pipeline(job_id):
+            yield "data: 0\n\n"
+            await steps[0].wait()
+            yield "data: 1\n\n"
+            await steps[1].wait()
+            for i in range(2, 6):
+                yield f"data: {i}\n\n"
+
+        job = bus.start(pipeline)
+        slow = job.subscribe()
+        assert await slow.__anext__() == "id: 0\ndata: 0\n\n"
+        # Caught up, so it now waits on the job as a live subscriber
+        waiting = asyncio.ensure_future(slow.__anext__())
+        await asyncio.sleep(0)
+        steps[0].set()
+        assert await waiting == "id: 1\ndata: 1\n\n"
+        # The job runs to the end while the subscriber doesn't read
+        steps[1].set()
+        while not job.done:
+            await asyncio.sleep(0)
+
+        dropped = await slow.__anext__()
+        assert dropped.startswith("event: dropped\n")
+        offset = json.loads(dropped.split("data: ")[1])["offset"]
+        assert offset == 2
+        resumed = [event async for event in job.subscribe(offset)]
+        assert resumed == [f"id: {i}\ndata: {i}\n\n" for i in range(2, 6)]
+        assert bus.snapshot()["dropped_subscribers"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_a_waiting_subscriber_reads_a_burst_from_the_log(tmp_path):
+    async def scenario():
+        bus = EventBus(buffer_size=2, directory=str(tmp_path))
+        release = asyncio.Event()
+
+        async def pipeline(job_id):
+            await release.wait()
+            for i in range(5):
+                yield f"data: {i}\n\n"
+
+        job = bus.start(pipeline)
+        events = asyncio.ensure_future(collect(job))
+        await asyncio.sleep(0)
+        release.set()
+        assert await events == [f"id: {i}\ndata: {i}\n\n" for i in range(5)]
+        assert job.dropped == 0
+
+    asyncio.run(scenario())
+
+
+def test_log_writes_run_off_the_event_loop(tmp_path, monkeypatch):
+    from app.services import event_bus_service
+
+    threads = []
+    append = event_bus_service.JobEvents._append
+
+    def recording_append(self, lines):
+        threads.append(threading.get_ident())
+        append(self, lines)
+
+    monkeypatch.setattr(event_bus_service.JobEvents, "_append", recording_append)
+
+    async def scenario():
+        bus = EventBus(buffer_size=2, directory=str(tmp_path))
+
+        async def pipeline(job_id):
+            for i in range(5):
+                yield f"data: {i}\n\n"
+
+        job = bus.start(pipeline)
+        # Reads from before the buffer include events still queued for the log
+        events = [event async for event in job.subscribe(offset=0)]
+        assert events == [f"id: {i}\ndata: {i}\n\n" for i in range(5)]
+        while job.status()["logged"] < 5 or job._log is not None:
+            await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(scenario())
+    assert threads and threading.get_ident() not in threads
+    with open(job.path, encoding="utf-8") as log:
+        assert [json.loads(line) for line in log] == [f"data: {i}\n\n" for i in range(5)]
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from app.services.hedging_service import CircuitBreaker, HedgedProvider, LatencyTracker, ProviderHealth
+from app.services.provider_service import Provider
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class FakeProvider(Provider):
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def chat(self, messages, model=None, max_tokens=None, system=None, temperature=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"{self.name}:{model}"
+
+
+def hedged(primary, fallback, **health_options):
+    health = ProviderHealth(**health_options)
+    return HedgedProvider(primary, lambda: fallback, health), health
+
+
+def test_latency_tracker_percentiles():
+    tracker = LatencyTracker(min_samples=5)
+    for seconds in [0.1, 0.2, 0.3, 0.4]:
+        tracker.record("write_paragraph", "openai", seconds)
+    assert tracker.percentile("write_paragraph", "openai", 95) is None
+    tracker.record("write_paragraph", "openai", 5.0)
+    assert tracker.percentile("write_paragraph", "openai", 95) == 5.0
+    assert tracker.percentile("write_paragraph", "openai", 50) == 0.3
+
+
+def test_slow_primary_is_hedged():
+    provider, health = hedged(FakeProvider("openai", delay=0.5), FakeProvider("anthropic"), default_hedge_after=0.05)
+    assert provider.chat([{"role": "user", "content": "hi"}], model="gpt-4o") == "anthropic:None"
+    assert health.stats["hedged"] == 1
+    assert health.stats["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    fallback = FakeProvider("anthropic")
+    provider, health = hedged(FakeProvider("openai"), fallback, default_hedge_after=1.0)
+    assert provider.chat([{"role": "user", "content": "hi"}], model="gpt-4o") == "openai:gpt-4o"
+    assert fallback.calls == 0
+    assert health.latency.snapshot()["chat"]["openai"]["count"] == 1
+
+
+def test_server_errors_fail_over_and_open_breaker():
+    primary = FakeProvider("openai", error=ServerError("unavailable"))
+    provider, health = hedged(primary, FakeProvider("anthropic"), failure_threshold=2)
+    for _ in range(3):
+        assert provider.chat([{"role": "user", "content": "hi"}]) == "anthropic:None"
+    # The third call skipped the primary entirely
+    assert primary.calls == 2
+    assert health.stats["failovers"] == 2
+    assert health.stats["breaker_rejections"] == 1
+    assert health.snapshot()["breakers"]["openai"] == "open"
+
+
+def test_client_errors_do_not_fail_over():
+    provider, _ = hedged(FakeProvider("openai", error=ValueError("bad request")), FakeProvider("anthropic"))
+    with pytest.raises(ValueError):
+        provider.chat([{"role": "user", "content": "hi"}])
+
+
+def test_breaker_half_opens_after_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_hedge_delay_follows_the_routing_stage(monkeypatch):
+    from app.services import model_routing_service
+    from app.services.model_routing_service import ModelRouter
+
+    primary = FakeProvider("openai", delay=0.2)
+    fallback = FakeProvider("anthropic")
+    provider, health = hedged(primary, fallback)
+    for _ in range(10):
+        health.latency.record("outline", "openai", 0.01)
+        health.latency.record("scene_draft", "openai", 1.0)
+    monkeypatch.setattr(model_routing_service.services, "provider", lambda name: provider)
+    router = ModelRouter({})
+    messages = [{"role": "user", "content": "hi"}]
+
+    # Slower than the outline stage's p95, so it is hedged...
+    assert router.chat("outline", "openai", messages) == "anthropic:None"
+    # ...but well inside the scene_draft stage's, so it is not
+    assert router.chat("scene_draft", "openai", messages) == "openai:None"
+    assert health.stats["hedged"] == 1
+    assert health.latency.snapshot()["scene_draft"]["openai"]["count"] == 11
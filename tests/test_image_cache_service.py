@@ -0,0 +1,64 @@
+import os
+
+from app.services.image_cache_service import ImageCache, image_cache_key
+
+
+def test_same_prompt_hits_cache(tmp_path):
+    cache = ImageCache(directory=str(tmp_path))
+    key = image_cache_key("RD_FLUX", 256, 256, "a lighthouse in the rain")
+    assert key == image_cache_key("RD_FLUX", 256, 256, " a lighthouse in the rain ")
+    assert key != image_cache_key("RD_FLUX", 128, 128, "a lighthouse in the rain")
+
+    assert cache.get(key) is None
+    url = cache.put(key, b"png bytes")
+    assert url.endswith(".png") or url.endswith(".webp")
+    assert f"/{key}-" in url
+    assert cache.get(key) == url
+    assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ImageCache(directory=str(tmp_path), max_bytes=250)
+    keys = [image_cache_key("RD_FLUX", 256, 256, f"scene {i}") for i in range(3)]
+    cache.put(keys[0], b"x" * 100)
+    cache.put(keys[1], b"x" * 100)
+    cache.get(keys[0])
+    cache.put(keys[2], b"x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert not any(name.startswith(keys[1]) for name in os.listdir(tmp_path))
+    assert cache.get(keys[0]) and cache.get(keys[2])
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_entries_survive_restart(tmp_path):
+    key = image_cache_key("RD_FLUX", 256, 256, "harbor at dusk")
+    ImageCache(directory=str(tmp_path)).put(key, b"png bytes")
+    (tmp_path / "generated_1234.png").write_bytes(b"legacy")
+
+    cache = ImageCache(directory=str(tmp_path))
+    assert cache.get(key)
+    assert cache.snapshot()["entries"] == 1
+
+
+def test_urls_follow_the_static_mount_wherever_the_cache_is(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    key = image_cache_key("RD_FLUX", 256, 256, "harbor at dusk")
+
+    nested = ImageCache(directory=str(tmp_path / "static" / "art" / "scenes")).put(key, b"png bytes")
+    assert nested.startswith("/static/art/scenes/")
+    assert ImageCache(directory="static").put(key, b"png bytes").startswith(f"/static/{key}-")
+
+    outside = ImageCache(directory=str(tmp_path / "cache" / "images"))
+    assert outside.url_prefix == "/image-cache"
+    url = outside.put(key, b"png bytes")
+    assert url.startswith(f"/image-cache/{key}-")
+    assert os.path.exists(tmp_path / "cache" / "images" / url.rsplit("/", 1)[1])
+
+
+def test_no_thumbnails_are_kept(tmp_path):
+    key = image_cache_key("RD_FLUX", 256, 256, "harbor at dusk")
+    (tmp_path / f"{key}-0123456789abcdef.thumb.webp").write_bytes(b"old thumbnail")
+    cache = ImageCache(directory=str(tmp_path))
+    cache.put(key, b"png bytes")
+    assert not any(name.endswith(".thumb.webp") for name in os.listdir(tmp_path))
@@ -56,6 +56,50 @@ def test_direct_api_call(prompt: str):
         print("Failed to parse response as JSON:")
         print(response.text[:200] + "... (truncated)")
 
+def test_generate_scene_images_keeps_order(monkeypatch):
+    """Batched prompts fan out to images in scene order; a failed image is an empty path"""
+    image_service = ImageService.__new__(ImageService)
+    scripts = [create_sample_scene_script() for _ in range(3)]
+    monkeypatch.setattr(image_service, "generate_image_prompts", lambda batch: [f"prompt {i}" for i in range(len(batch))])
+
+    def create_image(prompt):
+        if prompt == "prompt 1":
+            raise Exception("inference failed")
+        return f"/static/images/{prompt}.png"
+
+    monkeypatch.setattr(image_service, "create_image", create_image)
+    assert image_service.generate_scene_images(scripts) == ["/static/images/prompt 0.png", "", "/static/images/prompt 2.png"]
+
+def test_generate_scene_images_starts_each_batch_as_it_returns(monkeypatch):
+    """A batch's images start while earlier batches are still being prompted"""
+    import threading
+    from app.services import image_service as image_module
+
+    monkeypatch.setattr(image_module, "IMAGE_PROMPT_BATCH_SIZE", 2)
+    image_service = ImageService.__new__(ImageService)
+    scripts = [create_sample_scene_script() for _ in range(3)]
+    late_batch_image_started = threading.Event()
+    first_batch_waited = []
+
+    def generate_image_prompts(batch):
+        if len(batch) == 2:
+            # The first batch only returns once the second batch's image is under way
+            first_batch_waited.append(late_batch_image_started.wait(timeout=5))
+            return ["first 0", "first 1"]
+        return ["second 0"]
+
+    def create_image(prompt):
+        if prompt == "second 0":
+            late_batch_image_started.set()
+        return f"/static/images/{prompt}.png"
+
+    monkeypatch.setattr(image_service, "generate_image_prompts", generate_image_prompts)
+    monkeypatch.setattr(image_service, "create_image", create_image)
+    assert image_service.generate_scene_images(scripts, concurrency=2) == [
+        "/static/images/first 0.png", "/static/images/first 1.png", "/static/images/second 0.png"
+    ]
+    assert first_batch_waited == [True]
+
 def test_service_style_api_call():
     """Test API call with exact same parameters as the service"""
     api_key = os.getenv("RETRODIFFUSION_API_KEY")
@@ -0,0 +1,301 @@
+import threading
+
+from app.schemas import (
+    ArticleLength, ArticleStructure, DraftFormat, GenerationStats, ImageMode, LongArticleStructure, MainHeading,
+    Paragraph, PlanReconciliation, RevisedShortArticlePlan, Scene, SceneLine, SceneScript, ShortArticleStructure,
+    StyleMode, SubHeading
+)
+from app.services import llm_service
+from app.services.service_container import services
+
+
+class CallLog:
+    def save_llm_call_log(self, input_text, output_text):
+        pass
+
+
+class SectionRouter:
+    def __init__(self, sections):
+        self.stages = []
+        self.barrier = threading.Barrier(sections, timeout=5)
+
+    def chat(self, stage, provider, messages, system=None):
+        self.stages.append(stage)
+        prompt = messages[0]["content"]
+        # Every section waits here until all of them are in flight
+        self.barrier.wait()
+        title = prompt.split("Section to Revise")[1].split('"')[1]
+        assert "1.1. The Net" in prompt and "Scene in Two" not in prompt.split("Section to Revise")[0]
+        return f"Revised {title}."
+
+    def parse(self, stage, provider, messages, response_model, system=None):
+        self.stages.append(stage)
+        assert "Revised Low Tide." in messages[0]["content"] and "Revised High Tide." in messages[0]["content"]
+        return PlanReconciliation(opening="The keeper stops answering.", section_notes=["None", "Name the boat."], closing="The light goes out.")
+
+
+def test_map_reduce_critique_revises_sections_in_parallel_then_reconciles(monkeypatch):
+    def scenes(name):
+        return [Scene(scene_description=f"Scene in {name}", must_include="")]
+
+    plan = ArticleStructure(length=ArticleLength.LONG, content=LongArticleStructure(
+        title="The Flats",
+        intro_paragraphs=scenes("intro"),
+        main_headings=[
+            MainHeading(title="Low Tide", scenes=scenes("One"), sub_headings=[
+                SubHeading(title="The Net", scenes=scenes("One A"), sub_headings=[]),
+            ]),
+            MainHeading(title="High Tide", scenes=scenes("Two"), sub_headings=[]),
+        ],
+        conclusion_paragraphs=scenes("end"),
+    ))
+    router = SectionRouter(sections=2)
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+
+    revised = llm_service.critique_article_plan_by_section("tides", "A keeper and a radio.", plan, concurrency=2)
+
+    assert sorted(router.stages) == ["critique_reduce", "critique_section", "critique_section"]
+    assert revised == (
+        "Introduction:\nThe keeper stops answering.\n\n"
+        "Low Tide:\nRevised Low Tide.\n\n"
+        "High Tide:\nRevised High Tide.\n\nContinuity: Name the boat.\n\n"
+        "Conclusion:\nThe light goes out."
+    )
+
+
+class DraftRouter:
+    def __init__(self):
+        self.stages = []
+
+    def chat(self, stage, provider, messages, system=None):
+        self.stages.append(stage)
+        return "The keeper climbed the stairs."
+
+
+class BatchedImages:
+    def __init__(self):
+        self.calls = []
+
+    def generate_scene_images(self, scene_scripts, concurrency=None):
+        self.calls.append((len(scene_scripts), concurrency))
+        return [f"/static/images/{i}.webp" for i in range(len(scene_scripts))]
+
+
+def test_regenerate_section_with_batched_images(monkeypatch):
+    def scenes(name, count):
+        return [Scene(scene_description=f"{name} {i}", must_include="", text="Old text.") for i in range(count)]
+
+    article = ArticleStructure(length=ArticleLength.LONG, content=LongArticleStructure(
+        title="The Flats",
+        intro_paragraphs=scenes("intro", 1),
+        main_headings=[MainHeading(title="Low Tide", scenes=scenes("low", 2), sub_headings=[])],
+        conclusion_paragraphs=scenes("end", 1),
+    ))
+    router = DraftRouter()
+    images = BatchedImages()
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    monkeypatch.setitem(services._instances, "image_service", images)
+
+    paths, _ = llm_service.regenerate_scenes(
+        "tides", "A plan.", article, "headings/0", style_mode=StyleMode.SINGLE_PASS,
+        image_mode=ImageMode.BATCHED, image_concurrency=3
+    )
+
+    assert paths == ["headings/0/scenes/0", "headings/0/scenes/1"]
+    assert router.stages == ["scene_draft", "scene_draft"]
+    assert images.calls == [(2, 3)]
+    rewritten = article.content.main_headings[0].scenes
+    assert [scene.image_url for scene in rewritten] == ["/static/images/0.webp", "/static/images/1.webp"]
+    assert [scene.prose for scene in rewritten] == ["The keeper climbed the stairs."] * 2
+    assert article.content.intro_paragraphs[0].prose == "Old text."
+
+
+class CritiqueRouter:
+    def __init__(self, fused_fails=False):
+        self.fused_fails = fused_fails
+        self.stages = []
+
+    def chat(self, stage, provider, messages, system=None):
+        self.stages.append(stage)
+        assert "Only the net." in messages[0]["content"]
+        return "Revised: the net, then the storm."
+
+    def parse(self, stage, provider, messages, response_model, system=None):
+        self.stages.append(stage)
+        assert system is not None
+        outline = ShortArticleStructure(title="The Net", scenes=[Scene(scene_description="The storm", must_include="")])
+        if stage == "critique_restructure":
+            if self.fused_fails:
+                raise ValueError("outline did not match the schema")
+            assert response_model is RevisedShortArticlePlan and "Only the net." in messages[0]["content"]
+            return RevisedShortArticlePlan(revised_plan="Fused: the net, then the storm.", outline=outline)
+        assert stage == "outline" and messages[0]["content"] == "Revised: the net, then the storm."
+        return outline
+
+
+def short_plan():
+    return ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="The Net", scenes=[Scene(scene_description="The net", must_include="")]
+    ))
+
+
+def test_fused_critique_returns_plan_and_outline_from_one_call(monkeypatch):
+    router = CritiqueRouter()
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+
+    revised_plan, revised_outline = llm_service.critique_and_restructure_article_plan(
+        "nets", "Only the net.", short_plan(), length=ArticleLength.SHORT
+    )
+
+    assert router.stages == ["critique_restructure"]
+    assert revised_plan == "Fused: the net, then the storm."
+    assert revised_outline.length == ArticleLength.SHORT
+    assert [scene.scene_description for scene in revised_outline.content.scenes] == ["The storm"]
+
+
+def test_fused_critique_falls_back_to_critique_then_restructure(monkeypatch):
+    router = CritiqueRouter(fused_fails=True)
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+
+    revised_plan, revised_outline = llm_service.critique_and_restructure_article_plan(
+        "nets", "Only the net.", short_plan(), length=ArticleLength.SHORT
+    )
+
+    assert router.stages == ["critique_restructure", "critique", "outline"]
+    assert revised_plan == "Revised: the net, then the storm."
+    assert [scene.scene_description for scene in revised_outline.content.scenes] == ["The storm"]
+
+
+class StageRouter:
+    """Answers each stage with its next scripted response, recording the stage order."""
+
+    def __init__(self, **responses):
+        self.responses = {stage: list(answers) for stage, answers in responses.items()}
+        self.stages = []
+
+    def answer(self, stage):
+        self.stages.append(stage)
+        return self.responses[stage].pop(0)
+
+    def chat(self, stage, provider, messages, system=None):
+        return self.answer(stage)
+
+    def parse(self, stage, provider, messages, response_model, system=None):
+        return self.answer(stage)
+
+
+def scene_to_write():
+    plan = ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="The Net", scenes=[Scene(scene_description="Danny mends the net", must_include="the net")]
+    ))
+    article = ArticleStructure(length=plan.length, content=plan.content.model_copy(deep=True))
+    return plan, article, article.content.scenes[0]
+
+
+def test_single_pass_keeps_a_clean_draft_without_style_transfer(monkeypatch):
+    router = StageRouter(scene_draft=["Danny mended the net by the lamp."])
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+    stats = GenerationStats()
+
+    script = llm_service.write_scene(
+        "nets", "A plan.", plan, article, scene, style="hemingway",
+        style_mode=StyleMode.SINGLE_PASS, stats=stats, include_audio=False
+    )
+
+    assert router.stages == ["scene_draft"]
+    assert scene.script is script and scene.prose == "Danny mended the net by the lamp."
+    assert (stats.style_transfer_calls_avoided, stats.style_transfer_fallbacks, stats.script_extractions_avoided) == (1, 0, 1)
+
+
+def test_single_pass_restyles_a_draft_with_forbidden_words(monkeypatch):
+    router = StageRouter(
+        scene_draft=["The net was a rich tapestry of knots."],
+        style_transfer=["The net was all knots."],
+    )
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+    stats = GenerationStats()
+
+    llm_service.write_scene(
+        "nets", "A plan.", plan, article, scene, style="hemingway",
+        style_mode=StyleMode.SINGLE_PASS, stats=stats, include_audio=False
+    )
+
+    assert router.stages == ["scene_draft", "style_transfer"]
+    assert scene.prose == "The net was all knots."
+    assert (stats.style_transfer_calls_avoided, stats.style_transfer_fallbacks) == (0, 1)
+
+
+def test_two_pass_always_restyles(monkeypatch):
+    router = StageRouter(scene_draft=["Danny mended the net."], style_transfer=["Danny mended it."])
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+
+    llm_service.write_scene("nets", "A plan.", plan, article, scene, style_mode=StyleMode.TWO_PASS, include_audio=False)
+
+    assert router.stages == ["scene_draft", "style_transfer"]
+    assert scene.prose == "Danny mended it."
+
+
+def test_script_draft_format_takes_the_script_from_the_writer(monkeypatch):
+    drafted = SceneScript(scene_title="The Net", paragraphs=[Paragraph(lines=[
+        SceneLine(speaker="Danny", text="Net's caught again,"),
+        SceneLine(speaker="Narrator", text="Danny said."),
+    ])])
+    router = StageRouter(scene_script=[drafted])
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+    stats = GenerationStats()
+
+    script = llm_service.write_scene(
+        "nets", "A plan.", plan, article, scene, stats=stats, include_audio=True, draft_format=DraftFormat.SCRIPT
+    )
+
+    assert router.stages == ["scene_script"]
+    assert script is drafted and scene.script is drafted
+    assert scene.prose == '"Net\'s caught again," Danny said.'
+    assert (stats.style_transfer_calls_avoided, stats.script_extractions_avoided) == (1, 1)
+
+
+def test_script_draft_with_forbidden_words_is_restyled_and_parsed_locally(monkeypatch):
+    drafted = SceneScript(scene_title="The Net", paragraphs=[Paragraph(lines=[
+        SceneLine(speaker="Narrator", text="The net was a rich tapestry of knots."),
+    ])])
+    router = StageRouter(scene_script=[drafted], style_transfer=['"Net\'s caught again," Danny said.'])
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+    stats = GenerationStats()
+
+    script = llm_service.write_scene(
+        "nets", "A plan.", plan, article, scene, stats=stats, include_audio=True, draft_format=DraftFormat.SCRIPT
+    )
+
+    assert router.stages == ["scene_script", "style_transfer"]
+    assert [(line.speaker, line.text) for line in script.paragraphs[0].lines] == [
+        ("Danny", "Net's caught again,"), ("Narrator", "Danny said."),
+    ]
+    assert (stats.style_transfer_fallbacks, stats.script_extractions_avoided) == (1, 1)
+
+
+def test_script_draft_format_without_audio_drafts_prose(monkeypatch):
+    router = StageRouter(scene_draft=["Danny mended the net."], style_transfer=["Danny mended it."])
+    monkeypatch.setattr(llm_service, "model_router", router)
+    monkeypatch.setitem(services._instances, "db", CallLog())
+    plan, article, scene = scene_to_write()
+
+    script = llm_service.write_scene(
+        "nets", "A plan.", plan, article, scene, include_audio=False, draft_format=DraftFormat.SCRIPT
+    )
+
+    assert router.stages == ["scene_draft", "style_transfer"]
+    assert [(line.speaker, line.text) for line in script.paragraphs[0].lines] == [("Narrator", "Danny mended it.")]
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from benchmarks.load_test import latency_summary, percentile, read_events
+
+
+class FakeStream:
+    def __init__(self, lines):
+        self.lines = lines
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            yield line
+
+
+def parse(lines):
+    async def scenario():
+        return [event async for event in read_events(FakeStream(lines))]
+
+    return asyncio.run(scenario())
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [float(value) for value in range(1, 11)]
+    assert percentile(values, 50) == pytest.approx(5.5)
+    assert percentile(values, 95) == pytest.approx(9.55)
+    assert percentile(values, 99) == pytest.approx(9.91)
+    assert percentile(values, 100) == 10.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_latency_summary_sorts_and_handles_no_samples():
+    summary = latency_summary([0.3, 0.1, 0.2])
+    assert summary["count"] == 3
+    assert summary["p50_s"] == 0.2
+    assert summary["max_s"] == 0.3
+    assert summary["mean_s"] == 0.2
+    assert latency_summary([]) == {"count": 0}
+
+
+def test_sse_frames_are_dispatched_on_blank_lines():
+    events = parse([
+        "id: 0",
+        'data: {"type": "plan"}',
+        "",
+        ": keep-alive comment",
+        "",
+        "id: 1",
+        "data: first line",
+        "data:second line",
+        "",
+        "event: end",
+        "data: ",
+        "",
+    ])
+    assert events == [
+        ("message", '{"type": "plan"}'),
+        ("message", "first line\nsecond line"),
+        ("end", ""),
+    ]
+
+
+def test_sse_frame_without_trailing_blank_line_is_still_read():
+    assert parse(["event: dropped", 'data: {"offset": 4}']) == [("dropped", '{"offset": 4}')]
@@ -0,0 +1,73 @@
+import json
+
+from app.constants.model_routing import StageRoute
+from app.schemas import ImagePromptBatch, ModelTier
+from app.services import model_routing_service
+from app.services.model_routing_service import ModelRouter, load_model_routes
+from app.services.provider_service import Provider, _record_usage
+
+
+class RecordingProvider(Provider):
+    name = "openai"
+    chat_model = "big"
+    structured_model = "big-structured"
+    fast_chat_model = "small"
+    fast_structured_model = "small-structured"
+
+    def __init__(self):
+        self.calls = []
+
+    def chat(self, messages, model=None, max_tokens=None, system=None, temperature=None):
+        self.calls.append({"model": model or self.default_model(), "max_tokens": max_tokens, "temperature": temperature})
+        _record_usage(None, 120, 30)
+        return "a lighthouse at dusk"
+
+    def parse(self, messages, response_model, model=None, max_tokens=None, system=None, temperature=None):
+        self.calls.append({"model": model or self.default_model(structured=True), "max_tokens": max_tokens})
+        return response_model(prompts=["a net", "a boat"])
+
+
+def router_with(monkeypatch, routes):
+    provider = RecordingProvider()
+    monkeypatch.setattr(model_routing_service.services, "provider", lambda name: provider)
+    return ModelRouter(routes), provider
+
+
+def test_routes_pick_tier_model_and_limits(monkeypatch):
+    router, provider = router_with(monkeypatch, {
+        "scene_draft": StageRoute(max_tokens=50, temperature=0.7),
+        "style_repair": StageRoute(tier=ModelTier.FAST),
+        "pinned": StageRoute(model="pinned-model"),
+    })
+    router.chat("scene_draft", "openai", [{"role": "user", "content": "write"}])
+    router.chat("style_repair", "openai", [{"role": "user", "content": "fix"}])
+    router.chat("pinned", "openai", [{"role": "user", "content": "hi"}])
+    router.parse("image_prompts", "openai", [{"role": "user", "content": "scenes"}], ImagePromptBatch)
+    assert provider.calls == [
+        {"model": "big", "max_tokens": 50, "temperature": 0.7},
+        {"model": "small", "max_tokens": None, "temperature": None},
+        {"model": "pinned-model", "max_tokens": None, "temperature": None},
+        {"model": "big-structured", "max_tokens": None},
+    ]
+
+
+def test_metrics_use_reported_usage_or_estimate(monkeypatch):
+    router, _ = router_with(monkeypatch, {"style_repair": StageRoute(tier=ModelTier.FAST)})
+    router.chat("style_repair", "openai", [{"role": "user", "content": "fix"}])
+    router.parse("image_prompts", "openai", [{"role": "user", "content": "x" * 400}], ImagePromptBatch)
+
+    stages = router.snapshot()["stages"]
+    assert stages["style_repair"]["models"] == {"openai/small": 1}
+    assert (stages["style_repair"]["input_tokens"], stages["style_repair"]["output_tokens"]) == (120, 30)
+    assert stages["image_prompts"]["estimated_token_calls"] == 1
+    assert stages["image_prompts"]["input_tokens"] == 100
+    assert stages["image_prompts"]["latency"]["openai/big-structured"]["count"] == 1
+
+
+def test_routing_file_overrides_fields(tmp_path):
+    path = tmp_path / "routes.json"
+    path.write_text(json.dumps({"outline": {"tier": "default"}, "critique": {"provider": "anthropic", "max_tokens": 4000}}))
+    routes = load_model_routes(str(path))
+    assert routes["outline"].tier == ModelTier.DEFAULT
+    assert (routes["critique"].provider, routes["critique"].max_tokens) == ("anthropic", 4000)
+    assert routes["style_repair"].max_tokens == 50
@@ -0,0 +1,169 @@
+import json
+
+import httpx
+import pytest
+
+from app.schemas import ImagePromptBatch
+from app.services.provider_service import collect_usage
+from app.services.rate_limit_service import rate_limiter
+from app.services.service_container import ServiceContainer
+
+MESSAGES = [{"role": "user", "content": "Describe the harbor."}]
+
+
+class FakeAPI:
+    """Serves canned responses and keeps each request's path and JSON body."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.url.path, json.loads(request.content)))
+        return self.responses.pop(0)
+
+
+def provider_for(name, api, monkeypatch):
+    monkeypatch.setenv(f"{name.upper()}_API_KEY", "test-key")
+    # A canned response that doesn't fit fails the test instead of being retried
+    monkeypatch.setattr(rate_limiter, "max_attempts", 1)
+    container = ServiceContainer()
+    container._instances[f"http_client.{name}"] = httpx.Client(transport=httpx.MockTransport(api))
+    return container._base_provider(name)
+
+
+def sse(*events):
+    body = "".join(
+        (f"event: {name}\n" if name else "") + f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+        for name, data in events
+    )
+    return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+
+def openai_completion(message, usage=True):
+    return httpx.Response(200, json={
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "refusal": None, **message}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17} if usage else None,
+    })
+
+
+def openai_chunk(content):
+    return None, {
+        "id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+
+
+def anthropic_message(content):
+    return httpx.Response(200, json={
+        "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-3-5-sonnet-latest",
+        "content": content, "stop_reason": "end_turn", "stop_sequence": None,
+        "usage": {"input_tokens": 20, "output_tokens": 7},
+    })
+
+
+def test_openai_chat_sends_the_system_prompt_first_and_reports_usage(monkeypatch):
+    api = FakeAPI(openai_completion({"content": "  A grey harbor.\n"}))
+    provider = provider_for("openai", api, monkeypatch)
+    with collect_usage() as usage:
+        assert provider.chat(MESSAGES, system="Be brief.", max_tokens=50, temperature=0.2) == "A grey harbor."
+
+    path, body = api.requests[0]
+    assert path == "/v1/chat/completions"
+    assert body["model"] == provider.chat_model
+    assert body["messages"] == [{"role": "system", "content": "Be brief."}] + MESSAGES
+    assert (body["max_tokens"], body["temperature"]) == (50, 0.2)
+    assert usage == {"reported": 1, "input_tokens": 12, "output_tokens": 5}
+
+
+def test_openai_parse_uses_structured_outputs_and_reports_usage(monkeypatch):
+    api = FakeAPI(openai_completion({"content": json.dumps({"prompts": ["a lighthouse", "a net"]})}))
+    provider = provider_for("openai", api, monkeypatch)
+    with collect_usage() as usage:
+        parsed = provider.parse(MESSAGES, ImagePromptBatch, model="gpt-4o-mini")
+
+    assert parsed == ImagePromptBatch(prompts=["a lighthouse", "a net"])
+    body = api.requests[0][1]
+    assert body["model"] == "gpt-4o-mini"
+    assert body["response_format"]["type"] == "json_schema"
+    assert body["response_format"]["json_schema"]["name"] == "ImagePromptBatch"
+    assert "max_tokens" not in body and "temperature" not in body
+    assert usage == {"reported": 1, "input_tokens": 12, "output_tokens": 5}
+
+
+def test_openai_parse_refusals_raise(monkeypatch):
+    api = FakeAPI(openai_completion({"content": None, "refusal": "I can't help with that."}))
+    provider = provider_for("openai", api, monkeypatch)
+    with pytest.raises(Exception, match="refused"):
+        provider.parse(MESSAGES, ImagePromptBatch)
+
+
+def test_openai_stream_yields_deltas_without_reporting_usage(monkeypatch):
+    api = FakeAPI(sse(openai_chunk("A grey "), openai_chunk(""), openai_chunk("harbor."), (None, "[DONE]")))
+    provider = provider_for("openai", api, monkeypatch)
+    with collect_usage() as usage:
+        assert list(provider.stream(MESSAGES, system="Be brief.")) == ["A grey ", "harbor."]
+
+    body = api.requests[0][1]
+    assert body["stream"] is True
+    assert body["messages"][0] == {"role": "system", "content": "Be brief."}
+    assert usage["reported"] == 0
+
+
+def test_anthropic_chat_passes_system_and_default_max_tokens_and_reports_usage(monkeypatch):
+    api = FakeAPI(anthropic_message([{"type": "text", "text": " A grey harbor. "}]))
+    provider = provider_for("anthropic", api, monkeypatch)
+    with collect_usage() as usage:
+        assert provider.chat(MESSAGES, system="Be brief.") == "A grey harbor."
+
+    path, body = api.requests[0]
+    assert path == "/v1/messages"
+    assert body["model"] == provider.chat_model
+    assert body["messages"] == MESSAGES
+    assert (body["system"], body["max_tokens"]) == ("Be brief.", provider.default_max_tokens)
+    assert "temperature" not in body
+    assert usage == {"reported": 1, "input_tokens": 20, "output_tokens": 7}
+
+
+def test_anthropic_parse_goes_through_instructor_without_reporting_usage(monkeypatch):
+    api = FakeAPI(anthropic_message([{"type": "text", "text": json.dumps({"prompts": ["a lighthouse", "a net"]})}]))
+    provider = provider_for("anthropic", api, monkeypatch)
+    with collect_usage() as usage:
+        parsed = provider.parse(MESSAGES, ImagePromptBatch, system="Be brief.", max_tokens=300, temperature=0.0)
+
+    assert isinstance(parsed, ImagePromptBatch)
+    assert parsed.prompts == ["a lighthouse", "a net"]
+    body = api.requests[0][1]
+    # instructor appends the response model's JSON schema to the system prompt
+    assert body["system"].startswith("Be brief.") and '"title": "ImagePromptBatch"' in body["system"]
+    assert (body["max_tokens"], body["temperature"]) == (300, 0.0)
+    # instructor hands back only the parsed model, so the usage is left to estimates
+    assert usage["reported"] == 0
+
+
+def test_anthropic_stream_yields_text_deltas_without_reporting_usage(monkeypatch):
+    def delta(text):
+        return "content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}}
+
+    api = FakeAPI(sse(
+        ("message_start", {"type": "message_start", "message": {
+            "id": "msg_1", "type": "message", "role": "assistant", "model": "claude-3-5-sonnet-latest",
+            "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": 20, "output_tokens": 1},
+        }}),
+        ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+        delta("A grey "),
+        delta("harbor."),
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None}, "usage": {"output_tokens": 7}}),
+        ("message_stop", {"type": "message_stop"}),
+    ))
+    provider = provider_for("anthropic", api, monkeypatch)
+    with collect_usage() as usage:
+        assert list(provider.stream(MESSAGES, model="claude-3-5-haiku-latest")) == ["A grey ", "harbor."]
+
+    body = api.requests[0][1]
+    assert body["stream"] is True
+    assert body["model"] == "claude-3-5-haiku-latest"
+    assert usage["reported"] == 0
@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services import rate_limit_service
+from app.services.rate_limit_service import (
+    AdaptiveConcurrencyLimiter,
+    ProviderRateLimiter,
+    RateLimits,
+    RetryableError,
+    SQLiteTokenBucket,
+    TokenBucket,
+    is_retryable,
+    retry_after_seconds,
+)
+from app.services.service_container import ServiceContainer
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def test_token_bucket_waits_once_budget_is_spent():
+    bucket = TokenBucket(RateLimits(requests_per_minute=60, tokens_per_minute=600))
+    assert bucket.reserve(100) == 0
+    # The bucket refills at 10 tokens per second, so 600 more tokens means waiting ~10s
+    assert bucket.reserve(600) == pytest.approx(10, abs=0.1)
+
+
+def test_sqlite_bucket_is_shared_between_instances(tmp_path):
+    limits = RateLimits(requests_per_minute=2)
+    first = SQLiteTokenBucket(limits, str(tmp_path / "limits.db"), "openai:gpt-4o")
+    second = SQLiteTokenBucket(limits, str(tmp_path / "limits.db"), "openai:gpt-4o")
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() == pytest.approx(30, abs=0.5)
+
+
+def test_concurrency_limit_is_aimd():
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8, initial_limit=4)
+    limiter.acquire()
+    limiter.release(latency=1.0)
+    assert limiter.limit == pytest.approx(4.25)
+    limiter.acquire()
+    limiter.release(latency=1.0, throttled=True)
+    assert limiter.limit == pytest.approx(2.125)
+    limiter.acquire()
+    limiter.release(latency=10.0)
+    assert limiter.limit == pytest.approx(2.125 * 0.9)
+
+
+def test_retry_after_and_retryable_errors():
+    assert retry_after_seconds(FakeStatusError(429, {"retry-after": "3"})) == 3
+    assert retry_after_seconds(FakeStatusError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(FakeStatusError(429)) is None
+    assert is_retryable(FakeStatusError(429))
+    assert is_retryable(FakeStatusError(503))
+    assert not is_retryable(FakeStatusError(400))
+    assert is_retryable(RetryableError("no images"))
+    assert not is_retryable(ValueError("bad input"))
+
+
+def test_call_retries_with_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rate_limit_service.time, "sleep", sleeps.append)
+    limiter = ProviderRateLimiter(max_attempts=3)
+    failures = [FakeStatusError(429, {"retry-after": "2"}), FakeStatusError(500)]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert limiter.call("openai", "gpt-4o", flaky) == "ok"
+    assert sleeps[0] >= 2
+    assert limiter.stats["retries"] == 2
+    assert limiter.stats["throttled"] == 1
+
+    with pytest.raises(FakeStatusError):
+        limiter.call("openai", "gpt-4o", lambda: (_ for _ in ()).throw(FakeStatusError(400)))
+
+
+def test_failed_calls_do_not_grow_the_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(rate_limit_service.time, "sleep", lambda seconds: None)
+    limiter = ProviderRateLimiter(max_attempts=5)
+    concurrency = limiter.concurrency("openai")
+    before = concurrency.limit
+
+    def failing():
+        raise FakeStatusError(503)
+
+    with pytest.raises(FakeStatusError):
+        limiter.call("openai", "gpt-4o", failing)
+    assert limiter.stats["retries"] == 4
+    assert concurrency.limit == before
+    assert concurrency.in_flight == 0
+
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+def test_persistent_failures_reach_the_provider_max_attempts_times(provider, monkeypatch):
+    monkeypatch.setattr(rate_limit_service.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(rate_limit_service.rate_limiter, "max_attempts", 3)
+    monkeypatch.setenv(f"{provider.upper()}_API_KEY", "test-key")
+    monkeypatch.delenv("LLM_HEDGING", raising=False)
+    requests = []
+
+    def unavailable(request):
+        requests.append(request)
+        return httpx.Response(503, json={"error": {"message": "overloaded"}})
+
+    container = ServiceContainer()
+    container._instances[f"http_client.{provider}"] = httpx.Client(transport=httpx.MockTransport(unavailable))
+    with pytest.raises(Exception) as raised:
+        container.provider(provider).chat([{"role": "user", "content": "Hello"}])
+    assert rate_limit_service.status_code_of(raised.value) == 503
+    # The SDK clients don't retry on their own, so only the limiter's attempts go out
+    assert len(requests) == 3
+
+
+def test_models_on_one_provider_share_its_budget(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(rate_limit_service.time, "sleep", sleeps.append)
+    monkeypatch.setenv("OPENAI_RPM", "2")
+    limiter = ProviderRateLimiter(enabled=True)
+    limiter.call("openai", "gpt-4o", lambda: "ok")
+    limiter.call("openai", "gpt-4o-mini", lambda: "ok")
+    assert sleeps == []
+    limiter.call("openai", "o1", lambda: "ok")
+    assert sleeps[0] == pytest.approx(30, abs=0.5)
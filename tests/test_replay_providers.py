@@ -0,0 +1,76 @@
+import json
+import os
+import time
+
+import pytest
+
+from app.schemas import ImagePromptBatch
+from app.services.service_container import ServiceContainer
+from benchmarks.fake_providers import FakeProviderConfig, FakeProvidersConfig, LatencyConfig, start_fake_providers
+from benchmarks.replay_providers import start_replay_providers
+
+HARBOR = [{"role": "user", "content": "Describe the harbor."}]
+
+
+def run(monkeypatch, env):
+    """A short run through the app's providers: each call's output and how long it took."""
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
+    container = ServiceContainer()
+    # Built up front, so the SDK imports aren't timed as part of the first call
+    openai, anthropic = container.provider("openai"), container.provider("anthropic")
+    calls = [
+        lambda: openai.chat(HARBOR),
+        # Asked twice; the fake answers differently each time
+        lambda: openai.chat(HARBOR),
+        lambda: openai.parse(HARBOR, ImagePromptBatch).prompts,
+        lambda: anthropic.chat(HARBOR, system="Be brief."),
+    ]
+    results = []
+    try:
+        for call in calls:
+            started = time.perf_counter()
+            output = call()
+            results.append((output, time.perf_counter() - started))
+    finally:
+        container.close()
+    return results
+
+
+def test_a_recorded_run_replays_with_the_same_outputs_and_timings(monkeypatch, tmp_path):
+    monkeypatch.delenv("LLM_HEDGING", raising=False)
+    llm = FakeProviderConfig(latency=LatencyConfig(median_ms=150, sigma=0.5))
+    fake = start_fake_providers(FakeProvidersConfig(openai=llm, anthropic=llm, seed=7))
+    recorder = start_replay_providers(str(tmp_path), record=True, upstreams={
+        name: server.url for name, server in fake.servers.items()
+    })
+    try:
+        recorded = run(monkeypatch, {**fake.env(), **recorder.env()})
+    finally:
+        recorder.stop()
+        fake.stop()
+
+    with open(tmp_path / "openai.jsonl") as f:
+        cassette = [json.loads(line) for line in f]
+    assert len(cassette) == 3
+    assert "fake-openai-key" not in json.dumps(cassette)
+    assert recorded[0][0] != recorded[1][0]
+
+    replayer = start_replay_providers(str(tmp_path))
+    try:
+        replayed = run(monkeypatch, replayer.env())
+        assert replayer.stats()["openai"]["replay_hits"] == 3
+        assert replayer.stats()["anthropic"]["replay_hits"] == 1
+
+        # The fake providers are gone, so anything not recorded is a miss
+        with pytest.raises(Exception, match="No recording"):
+            run(monkeypatch, {**replayer.env(), "OPENAI_BASE_URL": f"{replayer.servers['openai'].url}/v2"})
+    finally:
+        replayer.stop()
+
+    assert [output for output, _ in replayed] == [output for output, _ in recorded]
+    upstream_latencies = [exchange["latency_s"] for exchange in cassette]
+    for (_, recorded_seconds), (_, replayed_seconds), upstream in zip(recorded, replayed, upstream_latencies):
+        # Each replay waits out what the upstream took when it was recorded
+        assert replayed_seconds >= upstream
+        assert replayed_seconds == pytest.approx(recorded_seconds, abs=0.1)
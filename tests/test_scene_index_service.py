@@ -0,0 +1,80 @@
+import pytest
+
+from app.schemas import (
+    ArticleLength,
+    ArticleStructure,
+    LongArticleStructure,
+    MainHeading,
+    MediumArticleStructure,
+    Scene,
+    SubHeading,
+    SubSubHeading,
+)
+from app.services.scene_index_service import index_scenes, outline_of, select_scenes
+
+
+def scenes(*names):
+    return [Scene(scene_description=name, must_include="", text=f"{name} text") for name in names]
+
+
+def long_article():
+    return ArticleStructure(length=ArticleLength.LONG, content=LongArticleStructure(
+        title="Tides",
+        intro_paragraphs=scenes("intro"),
+        main_headings=[
+            MainHeading(title="One", scenes=scenes("one"), sub_headings=[
+                SubHeading(title="One A", scenes=scenes("one a"), sub_headings=[
+                    SubSubHeading(title="One A i", scenes=scenes("one a i", "one a ii")),
+                ]),
+            ]),
+            MainHeading(title="Two", scenes=scenes("two"), sub_headings=[]),
+        ],
+        conclusion_paragraphs=scenes("end"),
+    ))
+
+
+def test_paths_follow_reading_order():
+    refs = index_scenes(long_article())
+    assert [ref.path for ref in refs] == [
+        "intro/0",
+        "headings/0/scenes/0",
+        "headings/0/sub_headings/0/scenes/0",
+        "headings/0/sub_headings/0/sub_headings/0/scenes/0",
+        "headings/0/sub_headings/0/sub_headings/0/scenes/1",
+        "headings/1/scenes/0",
+        "conclusion/0",
+    ]
+    assert refs[3].headings == ["One", "One A", "One A i"]
+    assert refs[3].previous.path == "headings/0/sub_headings/0/scenes/0"
+    assert refs[-1].next is None
+    assert refs[5].summary()["next"] == "conclusion/0"
+
+
+def test_select_scene_or_subtree():
+    article = long_article()
+    assert [ref.scene.scene_description for ref in select_scenes(article, "headings/0/sub_headings/0")] == [
+        "one a", "one a i", "one a ii",
+    ]
+    assert len(select_scenes(article, "/headings/1/")) == 1
+    assert select_scenes(article, "conclusion/0")[0].scene.scene_description == "end"
+    with pytest.raises(ValueError):
+        select_scenes(article, "headings/9")
+
+
+def test_medium_sub_headings_are_not_indexed():
+    article = ArticleStructure(length=ArticleLength.MEDIUM, content=MediumArticleStructure(
+        title="Harbor",
+        intro_paragraphs=[],
+        main_headings=[MainHeading(title="One", scenes=scenes("one"), sub_headings=[
+            SubHeading(title="Unused", scenes=scenes("unused"), sub_headings=[]),
+        ])],
+        conclusion_paragraphs=[],
+    ))
+    assert [ref.path for ref in index_scenes(article)] == ["headings/0/scenes/0"]
+
+
+def test_outline_drops_written_content():
+    article = long_article()
+    outline = outline_of(article)
+    assert all(ref.scene.text is None for ref in index_scenes(outline))
+    assert index_scenes(article)[0].scene.text == "intro text"
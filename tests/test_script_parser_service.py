@@ -0,0 +1,40 @@
+from app.services.script_parser_service import parse_scene_script
+
+
+def lines(result):
+    return [(line.speaker, line.text) for paragraph in result.script.paragraphs for line in paragraph.lines]
+
+
+def test_tags_after_and_before_quotes():
+    result = parse_scene_script(
+        '"Hello, how are you?" said John. "I\'m fine, thank you." said Jane. '
+        'John turned to Jane and said, "I love you." Jane blushed and said, "I love you too."'
+    )
+    assert result.confidence == 1.0
+    assert [speaker for speaker, _ in lines(result) if speaker != "Narrator"] == ["John", "Jane", "John", "Jane"]
+    assert lines(result)[:2] == [("John", "Hello, how are you?"), ("Narrator", "said John.")]
+
+
+def test_pronouns_and_untagged_quotes_use_turn_taking():
+    result = parse_scene_script(
+        '"Net\'s caught again," Danny said. His neck was tight.\n\n'
+        '"Then cut it," said Maria.\n\n'
+        '"I can\'t," he said. The rope creaked. "It\'s tangled."'
+    )
+    speakers = [speaker for speaker, _ in lines(result) if speaker != "Narrator"]
+    assert speakers == ["Danny", "Maria", "Danny", "Danny"]
+    assert 0.75 <= result.confidence < 1.0
+    assert len(result.script.paragraphs) == 3
+
+
+def test_narration_only_is_fully_confident():
+    result = parse_scene_script("The tide came in slow over the flats.\n\nThey continued to talk.")
+    assert result.confidence == 1.0
+    assert result.quotes == 0
+    assert all(speaker == "Narrator" for speaker, _ in lines(result))
+
+
+def test_unparseable_dialogue_has_low_confidence():
+    assert parse_scene_script('"Wait," she said. "Don\'t go.\n\nThe door shut.').confidence == 0.0
+    assert parse_scene_script("'Wait,' she said.").confidence <= 0.5
+    assert parse_scene_script('"Wait."').script.paragraphs[0].lines[0].speaker == "Unknown"
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import openai
+from fastapi.testclient import TestClient
+
+from app.services.service_container import ServiceContainer
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class Closable:
+    def __init__(self, closed, name):
+        self.closed = closed
+        self.name = name
+
+    def close(self):
+        self.closed.append(self.name)
+
+
+def test_importing_the_app_builds_no_clients():
+    script = (
+        "import json, sys, main\n"
+        "from app.services.service_container import services\n"
+        "sdks = [name for name in ('openai', 'anthropic', 'instructor', 'elevenlabs') if name in sys.modules]\n"
+        "print(json.dumps({'instances': sorted(services._instances), 'sdks': sdks}))\n"
+    )
+    env = {key: value for key, value in os.environ.items() if not key.endswith("_API_KEY")}
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == {"instances": [], "sdks": []}
+
+
+def test_first_access_builds_a_client_once(monkeypatch):
+    built = []
+
+    class FakeOpenAI:
+        def __init__(self, **options):
+            built.append(options)
+
+    monkeypatch.setattr(openai, "OpenAI", FakeOpenAI)
+    container = ServiceContainer()
+    assert not container.is_created("openai_client")
+    start = threading.Barrier(8, timeout=5)
+    clients = []
+
+    def first_access():
+        start.wait()
+        clients.append(container.openai_client)
+
+    threads = [threading.Thread(target=first_access) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(client is clients[0] for client in clients)
+    # The SDK client shares the pooled http client, built along with it
+    assert built[0]["http_client"] is container.http_client("openai")
+    assert container.is_created("openai_client") and container.is_created("http_client.openai")
+
+
+def test_lifespan_creates_the_database_and_closes_clients_at_shutdown(monkeypatch, tmp_path):
+    import main
+
+    closed = []
+    container = ServiceContainer()
+    monkeypatch.setattr(container, "warm_up", lambda: None)
+    monkeypatch.setattr(main, "services", container)
+    monkeypatch.setenv("ARTICLES_DB_PATH", str(tmp_path / "articles.db"))
+
+    with TestClient(main.app):
+        assert container.is_created("db")
+        container._instances["openai_client"] = Closable(closed, "openai_client")
+        container._instances["http_client.openai"] = Closable(closed, "http_client.openai")
+
+    # SDK clients close before the http clients they share
+    assert closed == ["openai_client", "http_client.openai"]
+    assert container._instances == {}
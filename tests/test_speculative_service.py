@@ -0,0 +1,69 @@
+from app.schemas import ArticleLength, ArticleStructure, GenerationStats, Scene, SceneScript, ShortArticleStructure
+from app.services.speculative_service import SpeculativeDraft, accept
+
+
+def outline(*scenes):
+    return ArticleStructure(length=ArticleLength.SHORT, content=ShortArticleStructure(
+        title="Harbor",
+        scenes=[Scene(scene_description=description, must_include=must_include) for description, must_include in scenes],
+    ))
+
+
+def draft(position, description, must_include="the net"):
+    return SpeculativeDraft(
+        path=f"scenes/{position}",
+        scene_description=description,
+        must_include=must_include,
+        script=SceneScript(scene_title=description, paragraphs=[]),
+        seconds=0.5,
+    )
+
+
+def test_keeps_unchanged_and_lightly_edited_opening_scenes():
+    drafts = [draft(0, "Danny mends the net at dawn."), draft(1, "The boats come back empty.")]
+    revised = outline(
+        ("Danny mends the net at dawn.", "the net"),
+        ("The boats come back  empty", "The net"),
+        ("Night falls over the harbor.", ""),
+    )
+    stats = GenerationStats()
+    kept = accept(drafts, revised, stats)
+    assert [script.scene_title for script in kept] == ["Danny mends the net at dawn.", "The boats come back empty."]
+    assert (stats.speculative_drafts, stats.speculative_hits, stats.speculative_ms_saved) == (2, 2, 1000)
+
+
+def test_drafts_after_a_rewritten_scene_are_discarded():
+    drafts = [draft(0, "Danny mends the net at dawn."), draft(1, "The boats come back empty.")]
+    revised = outline(
+        ("A storm warning is read over the radio.", "the net"),
+        ("The boats come back empty.", "the net"),
+    )
+    stats = GenerationStats()
+    assert accept(drafts, revised, stats) == []
+    assert (stats.speculative_drafts, stats.speculative_hits) == (2, 0)
+    assert accept(drafts, outline(("Danny mends the net at dawn.", "the net")), min_similarity=1.0)[0].scene_title == "Danny mends the net at dawn."
+
+
+def test_kept_drafts_bring_their_writing_stats():
+    drafts = [draft(0, "Danny mends the net at dawn."), draft(1, "The boats come back empty.")]
+    for kept_draft in drafts:
+        kept_draft.stats = GenerationStats(scenes_written=1, style_transfer_fallbacks=1, style_transfer_calls_avoided=2)
+    stats = GenerationStats(scenes_written=4)
+    # Only the first draft survives the revision
+    accept(drafts, outline(("Danny mends the net at dawn.", "the net"), ("A storm warning.", "")), stats)
+    assert (stats.scenes_written, stats.style_transfer_fallbacks, stats.style_transfer_calls_avoided) == (5, 1, 2)
+    assert (stats.speculative_drafts, stats.speculative_hits) == (2, 1)
+
+
+def test_drafter_keeps_each_drafts_stats(monkeypatch):
+    from app.services import speculative_service
+
+    def write_scene(*args, stats=None, **kwargs):
+        stats.scenes_written += 1
+        stats.style_transfer_fallbacks += 1
+        return SceneScript(scene_title="Harbor", paragraphs=[])
+
+    monkeypatch.setattr(speculative_service, "write_scene", write_scene)
+    drafter = speculative_service.SpeculativeDrafter("tides", "plan", outline(("Dawn.", ""), ("Dusk.", "")), count=2)
+    drafter.run()
+    assert [(d.stats.scenes_written, d.stats.style_transfer_fallbacks) for d in drafter.stop()] == [(1, 1), (1, 1)]
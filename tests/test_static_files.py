@@ -0,0 +1,47 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.static_files import CachedStaticFiles, content_digest, precompress_directory
+
+
+def client_for(directory):
+    return TestClient(Starlette(routes=[Mount("/files", CachedStaticFiles(directory=str(directory)))]))
+
+
+def test_hashed_media_is_immutable_and_seekable(tmp_path):
+    audio = bytes(range(256)) * 64
+    name = f"story-{content_digest(audio)}.mp3"
+    (tmp_path / name).write_bytes(audio)
+    client = client_for(tmp_path)
+
+    response = client.get(f"/files/{name}")
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+    assert etag == f'"{content_digest(audio)}"'
+
+    assert client.get(f"/files/{name}", headers={"if-none-match": etag}).status_code == 304
+    partial = client.get(f"/files/{name}", headers={"range": "bytes=100-199", "if-range": etag})
+    assert partial.status_code == 206
+    assert partial.content == audio[100:200]
+
+
+def test_text_assets_use_precompressed_variants(tmp_path):
+    script = b"console.log('longslop');\n" * 100
+    (tmp_path / "script.js").write_bytes(script)
+    assert precompress_directory(str(tmp_path)) >= 1
+    assert precompress_directory(str(tmp_path)) == 0
+    client = client_for(tmp_path)
+
+    with client.stream("GET", "/files/script.js", headers={"accept-encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert gzip.decompress(raw) == script
+
+    plain = client.get("/files/script.js", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == script
@@ -0,0 +1,54 @@
+from app.services.tracing_service import Tracer, to_otlp_payload
+
+
+def test_spans_nest_under_trace():
+    tracer = Tracer()
+    with tracer.start_trace("write_article", topic="Test") as root:
+        with tracer.start_span("stage.plan"):
+            with tracer.start_span("llm_call", model="gpt-4o"):
+                pass
+        with tracer.start_span("stage.outline"):
+            pass
+
+    spans = tracer.get_trace(root.trace_id)
+    assert [span.name for span in spans] == ["write_article", "stage.plan", "llm_call", "stage.outline"]
+    assert spans[1].parent_span_id == root.span_id
+    assert spans[2].parent_span_id == spans[1].span_id
+    assert all(span.end_time_unix_nano is not None for span in spans)
+
+    waterfall = tracer.waterfall(root.trace_id)
+    assert [row["depth"] for row in waterfall] == [0, 1, 2, 1]
+
+
+def test_span_outside_trace_is_noop():
+    tracer = Tracer()
+    with tracer.start_span("orphan") as span:
+        assert span is None
+    assert tracer.list_traces() == []
+
+
+def test_errors_mark_span_and_export_otlp():
+    tracer = Tracer()
+    try:
+        with tracer.start_trace("write_article") as root:
+            with tracer.start_span("stage.plan"):
+                raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    spans = tracer.get_trace(root.trace_id)
+    assert spans[1].status == "ERROR"
+    payload = to_otlp_payload(spans)
+    otlp_spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert otlp_spans[1]["status"]["code"] == 2
+    assert otlp_spans[1]["parentSpanId"] == root.span_id
+
+
+def test_oldest_traces_are_evicted():
+    tracer = Tracer(max_traces=2)
+    ids = []
+    for i in range(3):
+        with tracer.start_trace(f"article_{i}") as root:
+            ids.append(root.trace_id)
+    assert tracer.get_trace(ids[0]) is None
+    assert tracer.get_trace(ids[2]) is not None